@@ -1,5 +1,6 @@
 # 목적: 운영 중 DB에 레시피 시드를 빠르게/안전하게 채우기 위한 관리용 API
 # 사용: POST /crawl/seed?q=감자&pages=2 → {"ok": true, "inserted": N}
+#       GET/POST /crawl/vocab → 재료 어휘(동의어/slug/불용어) 조회·수정 (재배포 없이 반영)
 
 from fastapi import APIRouter, HTTPException, Query, Depends
 from app.db.init import get_db
@@ -7,6 +8,8 @@ from app.db.init import get_db
 from app.services.crawl10000.crawler import crawl_query
 from app.services.crawl10000.seed_ing import ensure_indexes, upsert_recipe
 from app.services.crawl10000.embeddings import upsert_vector_for_recipe
+from app.services.crawl10000.vocab import get_vocabulary
+from app.services.crawl10000.vocab_store import get_vocab_watcher, update_entries
 
 router = APIRouter(prefix="/crawl", tags=["crawl"])
 
@@ -38,3 +41,26 @@ async def crawl_seed(
         return {"ok": True, "inserted": inserted}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/vocab")
+async def vocab_get(entries: bool = Query(False, description="항목 전체 포함 여부")):
+    # 이 프로세스에 로드된 어휘 버전/재정규화 상태 (DB 조회 없음)
+    out = get_vocab_watcher().snapshot()
+    if entries:
+        out["items"] = [{"term": t, **e} for t, e in sorted(get_vocabulary().entries.items())]
+    return out
+
+@router.post("/vocab")
+async def vocab_update(body: dict, db = Depends(get_db)):
+
+    # body: {"upsert": [{"term": "주키니", "label": "호박", "slug": "pumpkin", "stop": false}], "delete": ["..."]}
+    # 저장 후 version +1 → 이 프로세스는 바로, 다른 프로세스는 VOCAB_POLL_SEC 안에 교체 + 재정규화 시작
+
+    try:
+        version = await update_entries(db, body.get("upsert") or [], body.get("delete") or [])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    watcher = get_vocab_watcher()
+    if watcher.running:
+        await watcher.check()
+    return {"ok": True, "version": version, "loaded": watcher.snapshot()}
@@ -2,9 +2,11 @@
 # 레시피 추천/검색 — 지용 담당
 
 from __future__ import annotations
+import math
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.requests import ClientDisconnect
 
 from app.core.deps import get_or_set_anon_id
 from app.db.init import get_db
@@ -12,29 +14,43 @@ from app.db.models.schemas import (
     RecipeRecommendationOut,
     RecipeRecommendIn,
 )
+from app.services.crawl10000.recommender import RANKINGS
 from app.services.reco import find_recipes_by_ingredients
+from app.services.upload_stream import UploadRejected, read_images
 from app.services.vision_openai import (
-    extract_ingredients_from_files,
+    extract_ingredient_names,
+    VisionCallFailed,
     VisionNotReady,
+    VisionUnavailable,
 )
 
 
 router = APIRouter(prefix="/photo", tags=["photo"])
 
 
+def _check_ranking(ranking: str) -> str:
+    # ?ranking=auto|index|scan|agg|coverage|bm25 (routes_recipes 와 같은 엔진 선택)
+    ranking = (ranking or "auto").strip().lower()
+    if ranking not in RANKINGS:
+        raise HTTPException(status_code=400, detail=f"ranking must be one of {list(RANKINGS)}")
+    return ranking
+
+
 # 텍스트(재료) 기반 추천 — 프론트 엔드포인트
 @router.post("/recommend", response_model=List[RecipeRecommendationOut])
 async def recommend_by_ingredients(
     payload: RecipeRecommendIn,
+    ranking: str = "auto",
     anon_id: str = Depends(get_or_set_anon_id),  # 쿠키 유지
 ):
+    ranking = _check_ranking(ranking)
     # 입력 정리: 공백/빈값 제거
     ings = [s.strip() for s in (payload.ingredients or []) if isinstance(s, str) and s.strip()]
     if not ings:
         raise HTTPException(status_code=400, detail="ingredients required")
 
     db = get_db()
-    docs = await find_recipes_by_ingredients(db, ings, limit=12)
+    docs = await find_recipes_by_ingredients(db, ings, limit=12, ranking=ranking)
 
     # 프론트 카드 스키마에 맞춰 변환
     return [
@@ -51,20 +67,37 @@ async def recommend_by_ingredients(
     ]
 
 
-# 사진 업로드 기반 추천 — 가변 파일 리스트 
+# 사진 업로드 기반 추천 — 가변 파일 리스트 (files=[...] 또는 image_0~8)
 @router.post("/recommend/upload", response_model=List[RecipeRecommendationOut])
 async def recommend_from_images(
-    files: List[UploadFile] = File(...),          # image_0~8 개별 필드 대신 한 번에
+    request: Request,
+    ranking: str = "auto",
     anon_id: str = Depends(get_or_set_anon_id),
 ):
-    if not files:
+    ranking = _check_ranking(ranking)
+    # 본문을 스트리밍으로 읽으며 용량/장수 상한 적용(초과 시 413), 형식은 실제 바이트로 판정
+    try:
+        images = await read_images(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="upload interrupted")
+    if not images:
         raise HTTPException(status_code=400, detail="no files uploaded")
 
-    # Vision 준비 미완이어도 앱은 살리고 503만 반환
+    # Vision 준비 미완/장애여도 앱은 살리고 503(타임아웃은 504)만 반환
     try:
-        raw_ings = await extract_ingredients_from_files(files)
+        raw_ings = await extract_ingredient_names(images)
+    except VisionUnavailable as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"msg": "vision temporarily unavailable", "retry_after": round(e.retry_after, 1)},
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        ) from e
     except VisionNotReady as e:
-        raise HTTPException(status_code=503, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except VisionCallFailed as e:
+        raise HTTPException(status_code=504 if e.timeout else 503, detail=f"vision_error: {e}") from e
 
     # 추출 재료 정리: 공백 제거 + 중복 제거 + 정렬(디버깅 편의)
     ings = sorted({s.strip() for s in (raw_ings or []) if isinstance(s, str) and s.strip()})
@@ -72,7 +105,7 @@ async def recommend_from_images(
         return []
 
     db = get_db()
-    docs = await find_recipes_by_ingredients(db, ings, limit=12)
+    docs = await find_recipes_by_ingredients(db, ings, limit=12, ranking=ranking)
 
     return [
         RecipeRecommendationOut(
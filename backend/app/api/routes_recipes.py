@@ -2,24 +2,45 @@
 # 사진 업로드 → LLM으로 재료 추출 → 재료 정규화 → DB 검색 → 카드 배열 반환
 
 from __future__ import annotations
-from typing import List, Dict, Any, Optional, Mapping
+from typing import Callable, List, Dict, Any, Optional, Mapping
+import asyncio
+import json
+import math
 import re
 import logging
-from fastapi import APIRouter, UploadFile, Request, HTTPException, Depends
+from datetime import datetime
+from fastapi import APIRouter, Request, Response, HTTPException, Depends, Query
+from starlette.requests import ClientDisconnect
 from bson import ObjectId
 
 from app.db.init import get_db
+from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
 from app.core.deps import get_or_set_anon_id
 from app.db.models.schemas import RecipeRecommendationOut
-from app.services.crawl10000.recommender import hybrid_recommend
-from app.services.vision_openai import extract_ingredients_from_images, VisionNotReady
+from app.services.crawl10000.recommender import RANKINGS, hybrid_recommend
+from app.services.crawl10000.card_index import build_search_fields, refresh_cards
+from app.services.crawl10000.reco_cache import get_reco_cache
+from app.services.crawl10000.speculative import SpeculativeRecommend
+from app.services.analysis_jobs import JobFailed, JobRetry, get_analysis_queue
+from app.services.upload_stream import MAX_FILES as UPLOAD_MAX_FILES, UploadRejected, read_images
+from app.services.vision_openai import (
+    VISION_MODES, VisionCallFailed, VisionNotReady, VisionUnavailable, extract_ingredients_from_images,
+    extract_ingredients_streaming, vision_timings,
+)
 from app.services.crawl10000.seed_ing import normalize_ingredients_ko
+from app.services.crawl10000.fuzzy import correct_tokens
+from app.services.crawl10000.suggest import get_suggest_index
+from app.services.crawl10000.text_search import search_recipes
 
 # 카드 스키마 (표시용 3~4 태그/요약/단계 컷)
 from app.models.schemas import RecipeCardStrict, to_strict_card
 
 log = logging.getLogger(__name__)
 
+RECOMMEND_BUDGET_SEC = float(getattr(settings, "RECOMMEND_BUDGET_SEC", 20.0) or 20.0)
+SEARCH_RESERVE_SEC = float(getattr(settings, "RECOMMEND_SEARCH_RESERVE_SEC", 2.0) or 0.0)   # Vision 뒤 DB 검색 몫
+
 # 메인 라우터
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
@@ -265,47 +286,41 @@ async def _collect_uploads(request: Request) -> List[bytes]:
     """
     - image_0..image_8 필드 또는
     - files=[UploadFile,...] 배열
-    모두 지원. 이미지 MIME만 통과.
+    모두 지원. 본문을 스트리밍으로 읽으며 파일별/요청별 용량 상한 적용(초과 시 413),
+    실제 바이트로 판정한 JPEG/PNG/WebP 만 최대 UPLOAD_MAX_FILES 장 통과.
     """
-    imgs: List[bytes] = []
     try:
-        form = await request.form()
-    except Exception:
-        form = None
-
-    if form:
-        for _, v in form.multi_items():
-            if not v:
-                continue
-            ct = getattr(v, "content_type", None)
-            if not ct:
-                continue
-            ct = ct.lower()
-            if ct in ("image/jpeg", "image/jpg", "image/png", "image/webp"):
-                try:
-                    data = await v.read()
-                except Exception:
-                    continue
-                if data:
-                    imgs.append(data)
-    return imgs
-
-async def _detect_tokens_from_bytes(imgs: List[bytes]) -> tuple[List[str], List[str]]:
-    try:
-        items = await extract_ingredients_from_images(imgs)
-    except VisionNotReady as e:
-        raise HTTPException(status_code=503, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"vision_error: {e}")
-
-    raw_names = [x.get("name", "") for x in items if isinstance(x, dict)]
-    raw_names = [n for n in raw_names if n]
-    tokens = normalize_ingredients_ko(raw_names)
-    return tokens, raw_names
-
-async def _search_recipes(db, tokens: List[str]) -> List[RecipeRecommendationOut]:
-    # NOTE: recommender.hybrid_recommend(db, ingredients, limit=30) 시그니처에 맞춤
-    cards = await hybrid_recommend(db, tokens, limit=30)
+        return await read_images(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="upload interrupted")
+
+def _check_ranking(ranking: str) -> str:
+    # 요청 단위 랭킹 엔진 선택 (벤치/비교용)
+    ranking = (ranking or "auto").strip().lower()
+    if ranking not in RANKINGS:
+        raise HTTPException(status_code=400, detail=f"ranking must be one of {list(RANKINGS)}")
+    return ranking
+
+def _check_vision(vision: Optional[str]) -> Optional[str]:
+    # 요청 단위 Vision 모드 선택 (없으면 설정 기본값)
+    if not vision:
+        return None
+    vision = vision.strip().lower()
+    if vision not in VISION_MODES:
+        raise HTTPException(status_code=400, detail=f"vision must be one of {list(VISION_MODES)}")
+    return vision
+
+async def _search_recipes(
+    db, tokens: List[str], ranking: str = "auto", spec: Optional[SpeculativeRecommend] = None,
+) -> List[RecipeRecommendationOut]:
+    # NOTE: recommender.hybrid_recommend(db, ingredients, limit=30, ranking) 시그니처에 맞춤
+    # spec: 스트리밍 중 미리 받아 둔 후보가 있으면 최종 토큰으로 재랭킹만
+    if spec is not None:
+        cards = await spec.result(tokens)
+    else:
+        cards = await hybrid_recommend(db, tokens, limit=30, ranking=ranking)
 
     out: List[RecipeRecommendationOut] = []
     for c in cards:
@@ -351,47 +366,138 @@ def _to_dict(x: Any) -> Any:
         except Exception:
             return x
 
-async def _recommend_from_imgs(img_bytes: list[bytes], db) -> list[RecipeRecommendationOut]:
+def _deadline(budget_ms: Optional[int]) -> Deadline:
+    # 요청 지연 예산: 기본 RECOMMEND_BUDGET_SEC, ?budget_ms 로 더 짧게만 조정 가능
+    sec = RECOMMEND_BUDGET_SEC
+    if budget_ms:
+        sec = min(sec, max(0.1, budget_ms / 1000))
+    return Deadline(sec)
+
+def _deadline_http(e: DeadlineExceeded) -> HTTPException:
+    # 업로드가 느린 건 클라이언트 쪽(408), 그 뒤 단계는 상류 지연(504)
+    return HTTPException(
+        status_code=408 if e.stage == "upload" else 504,
+        detail={"msg": "처리 시간 예산을 초과했습니다.", "stage": e.stage, "budget_sec": e.budget},
+    )
+
+def _split_tokens(tokens: Optional[str]) -> List[str]:
+    return [t.strip() for t in re.split(r"[,\n]", tokens or "") if t.strip()]
+
+async def _collect_uploads_within(request: Request, deadline: Deadline) -> List[bytes]:
+    try:
+        return await deadline.run(_collect_uploads(request), "upload")
+    except DeadlineExceeded as e:
+        raise _deadline_http(e)
+
+def _consume(task: "asyncio.Future[Any]") -> None:
+    # 예산 초과로 버린 Vision 작업의 결과/예외 회수 (성공하면 캐시에 남아 재시도 때 적중)
+    if not task.cancelled():
+        task.exception()
+
+async def _vision_items(
+    img_bytes: list[bytes], vision: Optional[str], deadline: Optional[Deadline],
+    on_name: Optional[Callable[[str], None]] = None,
+) -> list[Dict[str, Any]]:
+    if on_name is not None:
+        call = extract_ingredients_streaming(img_bytes, on_name, mode=vision)
+    else:
+        call = extract_ingredients_from_images(img_bytes, mode=vision)
+    if deadline is None:
+        return await call
+    # 상류 호출은 shield 로 계속 진행(같은 사진 동시 요청/재시도가 결과 공유), 이 요청만 예산에서 끊는다
+    task = asyncio.ensure_future(call)
+    try:
+        return await deadline.run(asyncio.shield(task), "vision", reserve=SEARCH_RESERVE_SEC)
+    except DeadlineExceeded:
+        task.add_done_callback(_consume)
+        raise
+
+async def _recommend_from_imgs(
+    img_bytes: list[bytes], db, ranking: str = "auto", vision: Optional[str] = None,
+    deadline: Optional[Deadline] = None, fallback: Optional[List[str]] = None,
+    response: Optional[Response] = None,
+) -> list[RecipeRecommendationOut]:
+    # vision=stream: 재료명이 나오는 대로 후보 조회를 미리 시작 (Vision 생성 시간과 DB 조회를 겹침)
+    spec: Optional[SpeculativeRecommend] = None
+    on_name = None
+    if vision == "stream":
+        spec = SpeculativeRecommend(db, limit=30, ranking=ranking)
+        seen: List[str] = []
+
+        def on_name(name: str) -> None:
+            seen.append(name)
+            spec.feed(normalize_ingredients_ko(seen))
+
+    try:
+        items, tokens = await _detect_from_imgs(img_bytes, vision, deadline, on_name)
+    except HTTPException as e:
+        if spec is not None:
+            spec.close()
+            spec = None
+        # 저하 모드: Vision 장애/예산 초과 시 클라이언트가 함께 보낸 토큰으로 추천
+        tokens = normalize_ingredients_ko(fallback or []) if e.status_code >= 500 else []
+        if not tokens:
+            raise
+        log.warning("recommend degraded (vision %s) -> fallback tokens=%s", e.status_code, tokens)
+        if response is not None:
+            response.headers["X-Degraded"] = f"vision_{e.status_code}"
+    try:
+        search = _search_recipes(db, tokens, ranking, spec)
+        if deadline is None:
+            return await search
+        return await deadline.run(search, "search")
+    except DeadlineExceeded as e:
+        raise _deadline_http(e)
+    except Exception as e:
+        log.exception("hybrid_recommend failed")
+        raise HTTPException(status_code=500, detail=f"recommend_error: {e}")
+    finally:
+        if spec is not None:
+            spec.close()
+            log.info("recommend speculative: %s", spec.stats)
+
+async def _detect_from_imgs(
+    img_bytes: list[bytes], vision: Optional[str] = None, deadline: Optional[Deadline] = None,
+    on_name: Optional[Callable[[str], None]] = None,
+) -> tuple[list[Dict[str, Any]], List[str]]:
+    # Vision → (재료 항목들, 정규화 토큰). 토큰이 없으면 422
     if not img_bytes:
         raise HTTPException(status_code=400, detail="이미지 파일이 없습니다.")
 
     try:
         # Vision → 원재료명
-        items = await extract_ingredients_from_images(img_bytes)
+        items = await _vision_items(img_bytes, vision, deadline, on_name)
+    except VisionUnavailable as e:
+        # 서킷 open: 상류를 기다리지 않고 즉시 503 + Retry-After
+        raise HTTPException(
+            status_code=503,
+            detail={"msg": "vision temporarily unavailable", "retry_after": round(e.retry_after, 1)},
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        ) from e
     except VisionNotReady as e:
         log.warning("VisionNotReady: %s", e)
-        raise HTTPException(status_code=503, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except VisionCallFailed as e:
+        # 업스트림 장애/타임아웃: "재료 없음"(422)이 아니라 재시도할 수 있는 503/504 (토큰 폴백 대상)
+        raise HTTPException(status_code=504 if e.timeout else 503, detail=f"vision_error: {e}") from e
+    except DeadlineExceeded as e:
+        raise _deadline_http(e)
     except Exception as e:
         log.exception("Vision error")
         raise HTTPException(status_code=500, detail=f"vision_error: {e}")
 
     raw = [x.get("name", "") for x in items if isinstance(x, dict) and x.get("name")]
-    tokens = normalize_ingredients_ko(raw)
-    log.info("recommend raw=%s -> tokens=%s (n_images=%d)", raw, tokens, len(img_bytes))
+    tokens, fixes = correct_tokens(raw)   # Vision 표기 변형(모차렐라 등)은 어휘로 보정
+    conf = {x["name"]: x.get("confidence") for x in items if isinstance(x, dict) and x.get("name")}
+    log.info("recommend raw(conf)=%s -> tokens=%s fixes=%s (n_images=%d, vision=%s)",
+             conf, tokens, fixes, len(img_bytes), vision or "default")
 
     if not tokens:
         raise HTTPException(
             status_code=422,
             detail={"msg": "이미지에서 핵심 재료를 찾지 못했습니다.", "debug": {"raw": raw, "images": len(img_bytes)}},
         )
-
-    try:
-        return await _search_recipes(db, tokens)
-    except Exception as e:
-        log.exception("hybrid_recommend failed")
-        raise HTTPException(status_code=500, detail=f"recommend_error: {e}")
-
-async def _read_uploadfiles(uploads: list[UploadFile]) -> list[bytes]:
-    imgs: list[bytes] = []
-    for up in uploads:
-        if not up:
-            continue
-        if up.content_type not in ("image/jpeg", "image/jpg", "image/png", "image/webp"):
-            continue
-        data = await up.read()
-        if data:
-            imgs.append(data)
-    return imgs[:9]  # 최대 9장만 사용 (프리뷰/성능 보호)
+    return items, tokens
 
 # ------------------------------
 # 엔드포인트: 추천
@@ -400,6 +506,11 @@ async def _read_uploadfiles(uploads: list[UploadFile]) -> list[bytes]:
 @router.post("/recommend", response_model=List[RecipeRecommendationOut])
 async def recommend(
     request: Request,
+    response: Response,
+    ranking: str = "auto",
+    vision: Optional[str] = None,
+    budget_ms: Optional[int] = None,
+    tokens: Optional[str] = None,
     db=Depends(get_db),
     anon_id: str = Depends(get_or_set_anon_id),
 ):
@@ -408,37 +519,172 @@ async def recommend(
     - image_0..image_8 필드
     - files / files[] 배열
     - 기타 form-data 속 UploadFile 항목들
+    - ?ranking=auto|index|scan|agg|coverage|bm25 로 랭킹 엔진 선택
+    - ?vision=single|cascade|fanout|stream 로 Vision 모드 선택
+      (cascade: 저해상도 먼저, 모호한 사진만 고해상도 / fanout: 사진별 병렬 호출 후 병합
+       / stream: 스트리밍으로 받으며 재료가 보이는 즉시 후보 조회 시작, 최종 목록으로 재랭킹)
+    - 업로드~검색 전체에 지연 예산 적용 (기본 RECOMMEND_BUDGET_SEC, ?budget_ms 로 단축): 초과 시 408/504
+    - Vision 서킷 open 이면 즉시 503 + Retry-After
+    - ?tokens=감자,양파 를 함께 보내면 Vision 장애/예산 초과 시 그 토큰으로 추천 (응답 헤더 X-Degraded)
     """
-    img_bytes = await _collect_uploads(request)
+    ranking = _check_ranking(ranking)
+    vision = _check_vision(vision)
+    deadline = _deadline(budget_ms)
+    img_bytes = await _collect_uploads_within(request, deadline)
     if not img_bytes:
         raise HTTPException(status_code=400, detail="이미지 파일이 없습니다.")
-    items = await _recommend_from_imgs(img_bytes, db)
+    items = await _recommend_from_imgs(
+        img_bytes, db, ranking, vision, deadline=deadline, fallback=_split_tokens(tokens), response=response,
+    )
     return [_to_dict(it) for it in items]
 
 @router.post("/recommend/files")
 async def recommend_files(
     request: Request,
+    response: Response,
+    ranking: str = "auto",
+    vision: Optional[str] = None,
+    budget_ms: Optional[int] = None,
+    tokens: Optional[str] = None,
     db=Depends(get_db),
     _: str = Depends(get_or_set_anon_id),
 ):
     """
     일부 클라이언트가 필드명을 고정하지 않고 멀티파트로만 보낼 때 대응:
-    request.form()에서 UploadFile들을 긁어와 처리.
+    멀티파트의 파일 파트를 필드명과 무관하게 스트리밍으로 모아 처리.
+    (지연 예산/서킷/토큰 폴백은 /recommend 와 동일)
     """
-    img_bytes = await _collect_uploads(request)
+    ranking = _check_ranking(ranking)
+    vision = _check_vision(vision)
+    deadline = _deadline(budget_ms)
+    img_bytes = await _collect_uploads_within(request, deadline)
     if not img_bytes:
         raise HTTPException(status_code=400, detail="이미지 파일이 없습니다.")
-    items = await _recommend_from_imgs(img_bytes, db)
+    items = await _recommend_from_imgs(
+        img_bytes, db, ranking, vision, deadline=deadline, fallback=_split_tokens(tokens), response=response,
+    )
     return [_to_dict(it) for it in items]
 
+# ------------------------------
+# 엔드포인트: 비동기 사진 분석 (제출 → 폴링)
+# ------------------------------
+
+async def _run_analysis_job(db, img_bytes: List[bytes], job: Dict[str, Any]) -> Dict[str, Any]:
+    # 분석 워커가 호출: /recommend 와 같은 Vision → 정규화 → 추천 경로
+    params = job.get("params") or {}
+    try:
+        items, tokens = await _detect_from_imgs(img_bytes, params.get("vision"))
+    except HTTPException as e:
+        cause = e.__cause__
+        if isinstance(cause, (VisionUnavailable, VisionCallFailed)):
+            # 서킷 open/업스트림 장애·타임아웃: 실패시키지 않고 Retry-After(없으면 백오프) 뒤 대기열에서 다시
+            raise JobRetry(e.detail, retry_after=getattr(cause, "retry_after", None))
+        if isinstance(cause, VisionNotReady):
+            raise JobFailed(e.detail, code=e.status_code)   # 키/SDK 미설정: 기다려도 안 바뀜
+        if e.status_code >= 500:
+            raise RuntimeError(str(e.detail))   # 일시적 오류 → 재시도
+        raise JobFailed(e.detail, code=e.status_code)
+    cards = await _search_recipes(db, tokens, params.get("ranking") or "auto")
+    return {
+        "ingredients": [{"name": x["name"], "confidence": x.get("confidence")} for x in items if x.get("name")],
+        "tokens": tokens,
+        "recipes": [_to_dict(c) for c in cards],
+    }
+
+get_analysis_queue().set_handler(_run_analysis_job)
+
+def _job_out(job: Dict[str, Any]) -> Dict[str, Any]:
+    out = {
+        "jobId": str(job["_id"]),
+        "status": job.get("status"),
+        "createdAt": job.get("created_at"),
+        "startedAt": job.get("started_at"),
+        "finishedAt": job.get("finished_at"),
+        "ms": job.get("ms"),
+    }
+    if "position" in job:
+        out["position"] = job["position"]
+    if job.get("status") == "done":
+        out.update(job.get("result") or {})
+    elif job.get("status") == "failed":
+        out["error"] = job.get("error")
+        out["code"] = job.get("code")
+    return out
+
+@router.post("/recommend/jobs", status_code=202)
+async def submit_recommend_job(
+    request: Request,
+    ranking: str = "auto",
+    vision: Optional[str] = None,
+    db=Depends(get_db),
+    anon_id: str = Depends(get_or_set_anon_id),
+):
+    """
+    /recommend 와 같은 업로드 형식을 받아 분석 작업만 등록하고 바로 202 + jobId 반환.
+    결과는 GET /recipes/recommend/jobs/{jobId} 로 폴링 (status: pending → running → done|failed).
+    """
+    ranking = _check_ranking(ranking)
+    vision = _check_vision(vision)
+    img_bytes = await _collect_uploads(request)
+    if not img_bytes:
+        raise HTTPException(status_code=400, detail="이미지 파일이 없습니다.")
+    queue = get_analysis_queue()
+    if not queue.running:
+        raise HTTPException(status_code=503, detail="analysis workers not running")
+    job_id = await queue.submit(db, img_bytes, anon_id, {"ranking": ranking, "vision": vision})
+    return {"jobId": job_id, "status": "pending"}
+
+@router.get("/recommend/jobs/{job_id}")
+async def get_recommend_job(
+    job_id: str,
+    db=Depends(get_db),
+    anon_id: str = Depends(get_or_set_anon_id),
+):
+    job = await get_analysis_queue().get(db, job_id, anon_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    return _job_out(job)
+
 @router.post("/recommend/tokens")     # 재료 배열 확인용
 async def recommend_from_tokens(
-    body: dict, db = Depends(get_db)
+    body: dict, response: Response, db = Depends(get_db)
 ):
-    tokens = normalize_ingredients_ko(body.get("tokens") or [])
-    cards = await hybrid_recommend(db, ingredients=tokens, limit=20)
+    # 오탈자/띄어쓰기 변형은 어휘로 보정하고 내역을 X-Token-Corrections(JSON)로 알려 줌 ("fuzzy": false 면 끔)
+    ranking = _check_ranking(body.get("ranking") or "auto")
+    if body.get("fuzzy", True):
+        tokens, fixes = correct_tokens(body.get("tokens") or [])
+    else:
+        tokens, fixes = normalize_ingredients_ko(body.get("tokens") or []), []
+    if fixes:
+        response.headers["X-Token-Corrections"] = json.dumps(fixes)
+        log.info("recommend tokens corrected: %s", fixes)
+    cards = await hybrid_recommend(db, ingredients=tokens, limit=20, ranking=ranking)
     return [to_recipe_recommendation(c) for c in cards]
 
+@router.get("/recommend/cache")      # 추천 결과 캐시 상태 확인용
+async def recommend_cache_stats():
+    return get_reco_cache().stats()
+
+@router.get("/recommend/vision")     # 서킷 상태 + fanout 호출별 타이밍 (튜닝용)
+async def recommend_vision_timings():
+    return vision_timings()
+
+@router.get("/search")               # 제목/요약 부분 문자열 검색 ("찌개" → 된장찌개, 김치찌개 ...)
+async def search_recipe_cards(
+    q: str = Query(..., description="검색어 (공백으로 나눈 단어가 모두 제목/요약에 있어야 함)"),
+    limit: int = Query(20, ge=1, le=100, description="결과 개수"),
+    db = Depends(get_db),
+):
+    docs = await search_recipes(db, q, limit=limit)
+    return [to_recipe_recommendation(d) for d in docs]
+
+@router.get("/ingredients/suggest")  # 재료 자동완성 (접두사/초성: "두" "ㄷㅂ" "두ㅂ" → 두부)
+async def suggest_ingredients(
+    q: str = Query(..., description="입력 중인 재료명 (음절/초성 혼용 가능)"),
+    limit: int = Query(10, ge=1, le=16, description="제안 개수"),
+):
+    return get_suggest_index().suggest(q, limit=limit)
+
 @router.get("/{rid}")
 async def get_recipe_full(rid: str, db=Depends(get_db)):
     q = {"_id": ObjectId(rid)} if ObjectId.is_valid(rid) else {"id": rid}
@@ -565,6 +811,7 @@ async def get_card_full(card_id: str, db=Depends(get_db)):
             "_id": 1, "id": 1, "title": 1, "imageUrl": 1, "tags": 1, "chips": 1, "source": 1,
             "steps_full": 1, "ingredients_full": 1, "variants": 1,
             "steps": 1, "ingredients": 1,   # top-level 폴백용
+            "summary": 1, "ingredients_clean": 1,   # 검색 필드 재계산용
         }
         card = None
         try:
@@ -610,7 +857,11 @@ async def get_card_full(card_id: str, db=Depends(get_db)):
                 if ingredients_full and not (card.get("ingredients_full") or []):
                     to_set["ingredients_full"] = ingredients_full
                 if to_set:
+                    to_set.update(build_search_fields({**card, **to_set}))
+                    to_set["updated_at"] = datetime.utcnow()
                     await db["recipe_cards"].update_one({"_id": card["_id"]}, {"$set": to_set})
+                    await refresh_cards(db, [card["_id"]])
+                    get_reco_cache().note_internal_write(to_set["updated_at"])
             except Exception:
                 pass
 
@@ -659,7 +910,7 @@ async def get_card_full(card_id: str, db=Depends(get_db)):
                 {
                     "_id": 1, "title": 1, "imageUrl": 1, "tags": 1, "chips": 1, "variants": 1,
                     "steps_full": 1, "ingredients_full": 1, "source": 1,
-                    "steps": 1, "ingredients": 1,
+                    "steps": 1, "ingredients": 1, "summary": 1, "ingredients_clean": 1,
                 }
             )
 
@@ -679,7 +930,11 @@ async def get_card_full(card_id: str, db=Depends(get_db)):
                         if filled:
                             to_set["ingredients_full"] = filled
                     if to_set:
+                        to_set.update(build_search_fields({**mc, **to_set}))
+                        to_set["updated_at"] = datetime.utcnow()
                         await db["recipe_cards"].update_one({"_id": mc["_id"]}, {"$set": to_set})
+                        await refresh_cards(db, [mc["_id"]])
+                        get_reco_cache().note_internal_write(to_set["updated_at"])
                 except Exception:
                     pass
 
@@ -5,6 +5,45 @@ class Settings(BaseSettings):
     MONGO_URI: str = "mongodb://localhost:27017"  # 필요 시 prod/staging로 분리
     MONGO_DB: str = "mydiet"
     OPENAI_API_KEY: str | None = None
+    VISION_MAX_CONCURRENCY: int = 4     # 동시에 진행 중인 Vision 호출 상한
+    VISION_TIMEOUT_SEC: float = 30.0    # Vision 호출 1회 타임아웃
+    VISION_CACHE_DIR: str = ".cache/vision"         # Vision 결과 디스크 캐시 위치
+    VISION_CACHE_MAX: int = 256                     # Vision 결과 메모리 LRU 항목 수
+    VISION_CACHE_TTL_SEC: float = 7 * 24 * 3600     # 디스크 캐시 유효 기간 (0이면 무기한)
+    VISION_MAX_EDGE: int = 1024         # 전송 전 축소 기준 (긴 변 px)
+    VISION_JPEG_QUALITY: int = 85       # 재인코딩 JPEG 품질
+    VISION_PREP_WORKERS: int = 0        # 전처리 스레드 수 (0이면 min(4, CPU))
+    VISION_BREAKER_FAILURES: int = 5            # 연속 실패 이만큼이면 서킷 open
+    VISION_BREAKER_COOLDOWN_SEC: float = 30.0   # open 유지 시간 (이후 탐침 1건)
+    VISION_BREAKER_SLOW_SEC: float = 15.0       # 이보다 느린 성공도 실패로 셈 (0이면 미적용)
+    RECOMMEND_BUDGET_SEC: float = 20.0          # 사진 추천 요청 전체 지연 예산 (업로드~검색)
+    RECOMMEND_SEARCH_RESERVE_SEC: float = 2.0   # 예산 중 Vision 뒤 DB 검색 몫으로 남길 시간
+    VISION_PROVIDER: str = "openai"     # openai | local (네트워크 없는 결정적 프로바이더, 부하 테스트용)
+    VISION_LOCAL_MAP: str = ""          # local: {sha256|파일명: [재료...]} JSON 경로 (없으면 해시로 어휘에서 선택)
+    VISION_LOCAL_LATENCY_MS: float = 800.0  # local: 호출 1회당 주입 지연
+    VISION_LOCAL_JITTER_MS: float = 200.0   # local: 지연 ± 범위 (사진 해시로 결정적)
+    VISION_LOCAL_VOCAB: str = ""        # local: 매핑 없는 사진용 재료 어휘 (공백/쉼표 구분, 비우면 기본값)
+    VISION_MODE: str = "single"         # single | cascade | fanout (요청별 ?vision= 으로 덮어쓰기)
+    VISION_CASCADE_MIN_CONF: float = 0.6  # 캐스케이드: 이 평균 confidence 미만 사진만 고해상도 재호출
+    VISION_FANOUT_GROUP: int = 1        # fanout: 호출 1회당 사진 수
+    VISION_FANOUT_MERGE: str = "max"    # fanout: 같은 재료 confidence 병합 (max | mean)
+    UPLOAD_MAX_FILES: int = 9                       # 요청당 이미지 수 상한 (초과분은 읽고 버림)
+    UPLOAD_MAX_FILE_BYTES: int = 10 * 1024 * 1024   # 이미지 1장 상한 (초과 시 413)
+    UPLOAD_MAX_TOTAL_BYTES: int = 50 * 1024 * 1024  # 요청 본문 전체 상한 (초과 시 413)
+    ANALYSIS_WORKERS: int = 2           # 비동기 사진 분석 워커 수 (프로세스당)
+    ANALYSIS_POLL_SEC: float = 2.0      # 다른 프로세스가 넣은 작업 확인 주기
+    ANALYSIS_STALE_SEC: float = 300.0   # 이보다 오래 running 인 작업은 시작 시 pending 복귀
+    ANALYSIS_MAX_ATTEMPTS: int = 2      # 일시적 오류 재시도 포함 최대 실행 횟수
+    ANALYSIS_RETRY_BACKOFF_SEC: float = 5.0    # 재시도 대기 기본값 (시도마다 2배)
+    ANALYSIS_RETRY_WINDOW_SEC: float = 900.0   # Vision 장애(503) 동안 대기열에서 기다려 주는 최대 시간
+    RECO_CACHE_MAX: int = 1024          # 재료 추천 결과 캐시 항목 수 (0이면 끔)
+    RECO_CACHE_TTL: float = 300.0       # 재료 추천 결과 캐시 유효 시간 (초)
+    NORMALIZE_WORD_CACHE: int = 50000   # 재료 정규화: 단어 → 라벨 메모 항목 수 (0이면 끔)
+    NORMALIZE_LINE_CACHE: int = 20000   # 재료 정규화: 재료 줄 → 토큰 메모 항목 수 (0이면 끔)
+    VOCAB_POLL_SEC: float = 10.0        # ingredient_vocab 버전 확인 주기 (바뀌면 다시 읽어 교체)
+    VOCAB_RENORMALIZE: bool = True      # 어휘 버전이 바뀌면 저장된 토큰 재정규화 작업 자동 실행
+    VOCAB_RENORM_BATCH: int = 500       # 재정규화 bulk_write 배치 크기
+    SUGGEST_MIN_DF: int = 2             # 재료 자동완성: 어휘에 없는 코퍼스 토큰은 이 카드 수 이상일 때만 제안
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,45 @@
+# 요청 단위 지연 예산(deadline) — 업로드 파싱 → Vision → 정규화 → DB 검색까지 같은 마감 시각을 넘겨 쓴다
+# - 단계마다 "남은 시간"만큼만 기다리고, 넘으면 어느 단계에서 끊겼는지 담아 DeadlineExceeded
+from __future__ import annotations
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str, budget: float) -> None:
+        super().__init__(f"deadline exceeded at {stage} ({budget:.1f}s budget)")
+        self.stage = stage
+        self.budget = budget
+
+
+class Deadline:
+    def __init__(self, seconds: float) -> None:
+        self.budget = float(seconds)
+        self.start = time.monotonic()
+        self.at = self.start + self.budget
+
+    def remaining(self, reserve: float = 0.0) -> float:
+        # reserve: 뒤 단계 몫으로 남겨 둘 시간
+        return max(0.0, self.at - time.monotonic() - reserve)
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.start) * 1000
+
+    def check(self, stage: str) -> None:
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(stage, self.budget)
+
+    async def run(self, aw: Awaitable[T], stage: str, reserve: float = 0.0) -> T:
+        """남은 시간(- reserve) 안에 끝나지 않으면 aw 를 취소하고 DeadlineExceeded."""
+        left = self.remaining(reserve)
+        if left <= 0:
+            if asyncio.iscoroutine(aw):
+                aw.close()   # 시작 안 한 코루틴 경고 방지 (이미 돌고 있는 task는 호출자가 정리)
+            raise DeadlineExceeded(stage, self.budget)
+        try:
+            return await asyncio.wait_for(aw, timeout=left)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(stage, self.budget)
@@ -10,6 +10,10 @@ async def ensure_recipe_card_indexes(db):
     await col.create_index("source.recipe_id", unique=True, sparse=True)
     await col.create_index([("title", 1)])
     await col.create_index([("tags", 1)])
+    # 정규화 재료 토큰 멀티키 인덱스 ($in/$all 후보 조회)
+    await col.create_index([("search_tokens", 1)])
+    # 인메모리 역색인 증분 동기화(updated_at 워터마크)용
+    await col.create_index([("updated_at", -1)])
 
 async def ensure_indexes():
     db = get_db()
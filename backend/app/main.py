@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 
-from asyncio import sleep
+from asyncio import sleep, create_task
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -30,6 +30,48 @@ except Exception:  # 초기 부팅 유연성
     close_db = None
     ensure_indexes = None
 
+try:
+    from app.services.crawl10000.vocab_store import start_vocab_watcher, stop_vocab_watcher
+except Exception:
+    start_vocab_watcher = None
+    stop_vocab_watcher = None
+
+try:
+    from app.services.crawl10000.card_index import build_card_index
+except Exception:
+    build_card_index = None
+
+try:
+    from app.services.crawl10000.coverage import build_coverage_index
+except Exception:
+    build_coverage_index = None
+
+try:
+    from app.services.crawl10000.bm25 import build_bm25_index
+except Exception:
+    build_bm25_index = None
+
+try:
+    from app.services.crawl10000.suggest import build_suggest_index
+except Exception:
+    build_suggest_index = None
+
+try:
+    from app.services.crawl10000.text_search import build_text_index
+except Exception:
+    build_text_index = None
+
+try:
+    from app.services.analysis_jobs import start_analysis_workers, stop_analysis_workers
+except Exception:
+    start_analysis_workers = None
+    stop_analysis_workers = None
+
+try:
+    from app.services.vision_openai import close_providers as close_vision_client
+except Exception:
+    close_vision_client = None
+
 app = FastAPI(title="My Diet Recipes - API", version="0.1.0")
 
 # CORS: 프론트 localhost:3000 허용 + 쿠키 전달
@@ -43,6 +85,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 브라우저 JS 가 읽어야 하는 응답 헤더 (재료 교정 내역, Vision 폴백 여부)
+    expose_headers=["X-Token-Corrections", "X-Degraded"],
 )
 
 # 앱 시작/종료 이벤트 핸들러
@@ -71,8 +115,80 @@ async def on_startup() -> None:
         except Exception as e:
             print(f"[startup] ensure_indexes failed: {e}")
 
+    # 2-1) 재료 어휘(ingredient_vocab) 로드 + 버전 감시 — 인덱스 빌드 전에 DB 어휘로 교체
+    if start_vocab_watcher and db is not None:
+        try:
+            vocab = await start_vocab_watcher(db)
+            print(f"[startup] vocab ready (version={vocab.version}, entries={len(vocab)})")
+        except Exception as e:
+            print(f"[startup] vocab load failed, using built-in defaults: {e}")
+
+    # 3) 레시피 카드 역색인 (백그라운드 빌드, 완료 전엔 추천이 정규식 스캔으로 폴백)
+    if build_card_index and db is not None:
+        async def _build() -> None:
+            try:
+                idx = await build_card_index(db)
+                print(f"[startup] card index ready (cards={len(idx)})")
+            except Exception as e:
+                print(f"[startup] card index build failed: {e}")
+            # 재료 커버리지 비트셋 (ranking=coverage)
+            if build_coverage_index:
+                try:
+                    cov = await build_coverage_index(db)
+                    print(f"[startup] coverage index ready (cards={len(cov)}, vocab={len(cov.vocab)})")
+                except Exception as e:
+                    print(f"[startup] coverage index build failed: {e}")
+            # BM25 통계 (ranking=bm25)
+            if build_bm25_index:
+                try:
+                    bm = await build_bm25_index(db)
+                    print(f"[startup] bm25 index ready (cards={len(bm)})")
+                except Exception as e:
+                    print(f"[startup] bm25 index build failed: {e}")
+            # 재료 자동완성 트라이 (/recipes/ingredients/suggest)
+            if build_suggest_index:
+                try:
+                    sg = await build_suggest_index(db)
+                    print(f"[startup] suggest index ready (texts={len(sg)})")
+                except Exception as e:
+                    print(f"[startup] suggest index build failed: {e}")
+            # 제목/요약 bigram 색인 (/recipes/search)
+            if build_text_index:
+                try:
+                    tx = await build_text_index(db)
+                    print(f"[startup] text index ready (cards={len(tx)})")
+                except Exception as e:
+                    print(f"[startup] text index build failed: {e}")
+        app.state.card_index_task = create_task(_build())
+
+    # 4) 비동기 사진 분석 워커 (POST /recipes/recommend/jobs)
+    if start_analysis_workers and db is not None:
+        try:
+            q = await start_analysis_workers(db)
+            print(f"[startup] analysis workers ready (workers={q.workers})")
+        except Exception as e:
+            print(f"[startup] analysis workers failed: {e}")
+
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
+    # 분석 워커 정지 (진행 중 작업은 pending 으로 되돌림)
+    if stop_analysis_workers:
+        try:
+            await stop_analysis_workers()
+        except Exception:
+            pass
+    # 어휘 감시/재정규화 작업 정지 (재정규화는 다음 기동 때 남은 문서부터 이어서)
+    if stop_vocab_watcher:
+        try:
+            await stop_vocab_watcher()
+        except Exception:
+            pass
+    # Vision 프로바이더(OpenAI 커넥션 풀 등) 정리
+    if close_vision_client:
+        try:
+            await close_vision_client()
+        except Exception:
+            pass
     # 몽고db 커넥션 정리
     if close_db:
         try:
@@ -65,6 +65,23 @@ _CANON_SYNONYMS = {
     "계란":"계란","달걀":"계란","egg":"계란","eggs":"계란",
 }
 
+# 한글/영문 재료명 → 내부 slug (norm_slug / 검색 대표키)
+# 기본값일 뿐, 운영 중 기준은 ingredient_vocab 컬렉션 (crawl10000/vocab.py 참고)
+_KOR2SLUG = {
+    "삼겹살":"porkbelly","돼지고기":"pork","감자":"potato","양파":"onion",
+    "대파":"scallion","쪽파":"scallion","파":"scallion","마늘":"garlic","소금":"salt",
+    "후추":"pepper","설탕":"sugar","간장":"soy_sauce","식용유":"oil",
+    "버터":"butter","닭가슴살":"chickenbreast","닭고기":"chicken",
+    "달걀":"egg","계란":"egg","고추장":"gochujang","된장":"doenjang",
+    "김치":"kimchi","두부":"tofu","파프리카":"bellpepper",
+    "고구마":"sweetpotato","당근":"carrot","오이":"cucumber",
+    "브로콜리":"broccoli","가지":"eggplant","버섯":"mushroom",
+    "호박":"pumpkin","단호박":"pumpkin","애호박":"pumpkin","zucchini":"pumpkin",
+}
+
+# 표준 재료 라벨 전체 (긴 것 우선) — 합성어("감자볶음")에서 재료명을 뽑아 검색 토큰을 보강할 때 사용
+CANON_LABELS = sorted(set(_CANON_SYNONYMS.values()) | set(CANON["main"]), key=len, reverse=True)
+
 # 정규식 보조(오탈자/복수형)
 _CANON_REGEX = [
     (re.compile(r"(단|애)?호박", re.I), "호박"),
@@ -1,11 +1,15 @@
 # app/scripts/backfill_recipe_cards.py
 import asyncio, re
+from datetime import datetime
 from urllib.parse import urlparse
 from typing import List, Any, Dict
 
 from app.db.init import init_db, get_db
 from app.models.schemas import RecipeCard, RecipeVariantCard
 from app.models.tags import build_display_tags, CANON
+from app.services.crawl10000.card_index import build_search_fields
+from app.services.crawl10000.vocab import set_vocabulary
+from app.services.crawl10000.vocab_store import load_vocabulary
 
 # norm → 한글 칩 매핑 테이블
 NORM2DISPLAY = {
@@ -327,6 +331,7 @@ def _gather_tags(src: dict, title: str, steps: List[str], ingredients: List[str]
 async def main(limit: int = 5000, only_10000: bool = True):
     await init_db()
     db = get_db()
+    set_vocabulary(await load_vocabulary(db))   # 토큰화는 ingredient_vocab 기준
 
     cur = db["recipes"].find({}, {"_id": 0}).limit(limit)
 
@@ -405,9 +410,11 @@ async def main(limit: int = 5000, only_10000: bool = True):
             imageUrl=_first_image(r),
         )
 
+        doc = card.model_dump()
+        doc.update(build_search_fields(doc))
         await db["recipe_cards"].update_one(
             {"id": card.id},
-            {"$set": card.model_dump()},
+            {"$set": {**doc, "updated_at": datetime.utcnow()}},
             upsert=True,
         )
         n += 1
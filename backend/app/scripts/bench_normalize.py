@@ -0,0 +1,88 @@
+# app/scripts/bench_normalize.py
+# 재료 정규화 처리량 벤치 (DB 불필요, 합성 재료 줄 사용) — 단위: lines/sec
+# - before: 기존 normalize_ingredients_ko (단어마다 동의어 → _CANON_REGEX 순회 → fullmatch → 불용어)
+# - cold  : normalizer.IngredientNormalizer 새로 만든 직후 (결합 정규식만, 메모 비어 있음)
+# - warm  : 같은 정규화기를 한 번 더 (단어/줄 메모 적중)
+# - batch : normalize_lines (카드 1건 = 줄 목록 1개 → 줄별 토큰)
+# 실행: python -m app.scripts.bench_normalize
+#   BENCH_LINES(기본 20000) / BENCH_PER_DOC(기본 12) / BENCH_UNIQUE(기본 0.3, 새로 만든 줄 비율)
+
+import os
+import random
+import time
+from typing import Callable, List
+
+from app.models.tags import canonicalize_token_ko, extract_words, is_stop
+from app.services.crawl10000.normalizer import IngredientNormalizer
+
+N_LINES = int(os.getenv("BENCH_LINES", "20000"))
+PER_DOC = int(os.getenv("BENCH_PER_DOC", "12"))
+UNIQUE = float(os.getenv("BENCH_UNIQUE", "0.3"))
+
+WORDS = (
+    "감자 양파 계란 두부 애호박 단호박 당근 소금 후추 간장 설탕 고추장 된장 버섯 마늘 대파 "
+    "돼지고기 닭가슴살 오이 고등어 김치 참치 토마토 방울토마토 브로콜리 양배추 치즈 베이컨 새우 "
+    "potato potatoes sweet potato zucchini zuchini onions carrots tomatoes chicken breast olive oil salt"
+).split()
+UNITS = ["1개", "2개", "약간", "적당량", "1큰술", "2작은술", "100g", "1/2컵", "(다진 것)", "한 줌", "1 tbsp", "2 cups"]
+
+
+# ---------------------------------------------------------------------------
+# 기존 구현 (비교 기준) — 개선 전 seed_ing.normalize_ingredients_ko 그대로
+# ---------------------------------------------------------------------------
+def _legacy_normalize(raws: List[str]) -> List[str]:
+    seen, out = set(), []
+    for line in raws or []:
+        for w in extract_words(line):
+            canon = canonicalize_token_ko(w)
+            if canon and canon not in seen and not is_stop(canon):
+                seen.add(canon); out.append(canon)
+    return out
+
+
+def _make_lines(rng: random.Random) -> List[str]:
+    # 크롤 데이터처럼 자주 나오는 줄(고정 풀)과 새 줄을 섞는다
+    pool = [f"{rng.choice(WORDS)} {rng.choice(UNITS)}" for _ in range(300)]
+    out: List[str] = []
+    for _ in range(N_LINES):
+        if rng.random() < UNIQUE:
+            out.append(f"{''.join(rng.sample(WORDS, 2))} {rng.choice(UNITS)} {rng.choice(WORDS)}")
+        else:
+            out.append(rng.choice(pool))
+    return out
+
+
+def _rate(fn: Callable[[List[str]], object], docs: List[List[str]]) -> float:
+    t0 = time.process_time()
+    for d in docs:
+        fn(d)
+    return N_LINES / max(time.process_time() - t0, 1e-9)
+
+
+def main() -> None:
+    rng = random.Random(42)
+    lines = _make_lines(rng)
+    docs = [lines[i:i + PER_DOC] for i in range(0, len(lines), PER_DOC)]
+
+    norm = IngredientNormalizer()
+    same = all(_legacy_normalize(d) == norm.normalize(d) for d in docs)
+    same = same and all(
+        norm.normalize_lines(d) == [_legacy_normalize([x]) for x in d] for d in docs[:200]
+    )
+
+    before = _rate(_legacy_normalize, docs)
+    fresh = IngredientNormalizer()
+    cold = _rate(fresh.normalize, docs)
+    warm = _rate(fresh.normalize, docs)
+    batch = _rate(fresh.normalize_lines, docs)
+    print(f"[bench] lines={N_LINES} per_doc={PER_DOC} unique={UNIQUE:.0%}")
+    print(f"[bench] before: {before:,.0f} lines/sec")
+    print(f"[bench] cold  : {cold:,.0f} lines/sec  (x{cold / before:.1f})")
+    print(f"[bench] warm  : {warm:,.0f} lines/sec  (x{warm / before:.1f})")
+    print(f"[bench] batch : {batch:,.0f} lines/sec  (normalize_lines)")
+    print(f"[bench] cache : {fresh.cache_info()}")
+    print(f"[bench] same tokens: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# app/scripts/bench_photo.py
+# 사진 → 재료 추출 → 정규화 → 추천 전체 경로 부하 벤치 (Vision은 local 프로바이더, 네트워크/과금 없음)
+# - 실제 recipe_cards 코퍼스 + 인메모리 역색인 사용 (Mongo 필요)
+# - 합성 사진 BENCH_IMAGES장(서로 다른 바이트)을 요청마다 1~3장씩 묶어 BENCH_CONCURRENCY개 동시 요청
+# - Vision 결과 캐시는 끄고 측정 (매 요청 프로바이더 지연이 실제로 들어가도록)
+# 실행: VISION_PROVIDER=local python -m app.scripts.bench_photo
+#   BENCH_REQUESTS(기본 500) / BENCH_CONCURRENCY(기본 50) / BENCH_IMAGES(기본 200)
+#   BENCH_VISION(기본 single, stream 이면 스트리밍 중 추측 조회로 DB 지연을 겹침)
+#   지연은 VISION_LOCAL_LATENCY_MS / VISION_LOCAL_JITTER_MS, 동시 Vision 상한은 VISION_MAX_CONCURRENCY
+
+import asyncio
+import io
+import os
+import random
+import time
+from typing import List
+
+from PIL import Image
+
+from app.core.config import settings
+from app.db.init import init_db, get_db
+from app.services.crawl10000.card_index import build_card_index
+from app.services import vision_cache
+from app.api.routes_recipes import _recommend_from_imgs
+
+N_REQUESTS = int(os.getenv("BENCH_REQUESTS", "500"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+N_IMAGES = int(os.getenv("BENCH_IMAGES", "200"))
+VISION = os.getenv("BENCH_VISION", "single")
+
+
+def _images(n: int) -> List[bytes]:
+    rng = random.Random(0)
+    out = []
+    for _ in range(n):
+        buf = io.BytesIO()
+        Image.new("RGB", (64, 48), tuple(rng.randrange(256) for _ in range(3))).save(buf, "JPEG")
+        out.append(buf.getvalue())
+    return out
+
+
+def _pct(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))] if xs else 0.0
+
+
+async def main():
+    if str(getattr(settings, "VISION_PROVIDER", "")).lower() != "local":
+        raise SystemExit("VISION_PROVIDER=local 로 실행하세요 (실제 OpenAI 호출 방지)")
+    await init_db()
+    db = get_db()
+    idx = await build_card_index(db)
+    vision_cache._cache = vision_cache.VisionCache(enabled=False)
+
+    pool = _images(N_IMAGES)
+    rng = random.Random(1)
+    reqs = [rng.sample(pool, rng.randint(1, 3)) for _ in range(N_REQUESTS)]
+    sem = asyncio.Semaphore(CONCURRENCY)
+    lat: List[float] = []
+    errors = 0
+
+    async def one(imgs: List[bytes]) -> None:
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await _recommend_from_imgs(imgs, db, "auto", VISION)
+            except Exception:
+                errors += 1   # 422(재료 없음) 등도 한 번의 요청으로 계산
+            lat.append((time.perf_counter() - t0) * 1000)
+
+    print(f"[bench] cards={len(idx)} requests={N_REQUESTS} concurrency={CONCURRENCY} "
+          f"vision={VISION} latency={settings.VISION_LOCAL_LATENCY_MS:.0f}±{settings.VISION_LOCAL_JITTER_MS:.0f}ms "
+          f"vision_concurrency={settings.VISION_MAX_CONCURRENCY}")
+    t0 = time.perf_counter()
+    await asyncio.gather(*[one(r) for r in reqs])
+    wall = time.perf_counter() - t0
+    print(f"[bench] {N_REQUESTS / wall:.1f} req/s  p50={_pct(lat, 0.5):.0f}ms  p95={_pct(lat, 0.95):.0f}ms  "
+          f"p99={_pct(lat, 0.99):.0f}ms  errors={errors}  wall={wall:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
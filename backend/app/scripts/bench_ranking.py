@@ -0,0 +1,52 @@
+# app/scripts/bench_ranking.py
+# 랭킹 엔진 비교 벤치 (실제 recipe_cards 코퍼스 사용, Mongo 필요)
+# - index: 인메모리 역색인 / scan: search_tokens 후보 + Python 점수화 / agg: Mongo 집계 파이프라인
+# - 같은 토큰 세트를 엔진별로 돌려 요청당 지연(ms)과 상위 결과 겹침 비율을 출력
+# 실행: python -m app.scripts.bench_ranking
+#   BENCH_QUERIES(기본 "감자,양파;계란;돼지고기,김치,두부;닭가슴살,브로콜리") / BENCH_REPEAT(기본 10)
+
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+from app.db.init import init_db, get_db
+from app.services.crawl10000.card_index import build_card_index
+from app.services.crawl10000.recommender import hybrid_recommend
+from app.services.crawl10000.seed_ing import normalize_ingredients_ko
+
+QUERIES = os.getenv("BENCH_QUERIES", "감자,양파;계란;돼지고기,김치,두부;닭가슴살,브로콜리")
+REPEAT = int(os.getenv("BENCH_REPEAT", "10"))
+ENGINES = ("index", "scan", "agg")
+LIMIT = 30
+
+async def _time(db, tokens: List[str], ranking: str) -> float:
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        await hybrid_recommend(db, tokens, limit=LIMIT, ranking=ranking)
+    return (time.perf_counter() - t0) / REPEAT * 1000
+
+async def main():
+    await init_db()
+    db = get_db()
+    idx = await build_card_index(db)
+    print(f"[bench] cards={len(idx)} repeat={REPEAT} limit={LIMIT}")
+
+    for q in QUERIES.split(";"):
+        tokens = normalize_ingredients_ko([t for t in q.split(",") if t.strip()])
+        if not tokens:
+            continue
+        top: Dict[str, List] = {}
+        for eng in ENGINES:
+            top[eng] = [d["_id"] for d in await hybrid_recommend(db, tokens, limit=LIMIT, ranking=eng)]
+        times = {eng: await _time(db, tokens, eng) for eng in ENGINES}
+
+        base = set(top["scan"])
+        line = "  ".join(
+            f"{eng}={times[eng]:.1f}ms(n={len(top[eng])}, ∩scan={len(base & set(top[eng]))})"
+            for eng in ENGINES
+        )
+        print(f"[bench] {tokens}: {line}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
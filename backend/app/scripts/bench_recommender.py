@@ -0,0 +1,129 @@
+# app/scripts/bench_recommender.py
+# 추천 점수화 마이크로벤치 (DB 불필요, 합성 카드 사용)
+# - before: 기존 _contains_all/_score (토큰마다 re.compile + 필드 텍스트 재조립)
+# - after : recommender._rank_docs (요청당 매처 1개, 필드당 1회 스캔)
+# 실행: python -m app.scripts.bench_recommender
+#   BENCH_DOCS(기본 800) / BENCH_TOKENS(기본 5) / BENCH_REPEAT(기본 20)
+
+import os
+import re
+import random
+import time
+from typing import Any, Dict, List
+
+from app.services.crawl10000.recommender import _rank_docs
+from app.services.crawl10000.matcher import _HAS_PYAC
+
+N_DOCS = int(os.getenv("BENCH_DOCS", "800"))
+N_TOKENS = int(os.getenv("BENCH_TOKENS", "5"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+
+WORDS = (
+    "감자 양파 계란 두부 애호박 당근 소금 후추 간장 설탕 고추장 된장 버섯 마늘 대파 "
+    "돼지고기 닭가슴살 오이 고등어 김치 참치 토마토 브로콜리 양배추 치즈 베이컨 새우"
+).split()
+
+# ---------------------------------------------------------------------------
+# 기존 구현 (비교 기준) — 개선 전 recommender.py 그대로
+# ---------------------------------------------------------------------------
+def _as_text(v: Any) -> str:
+    if isinstance(v, list):
+        return " ".join(str(x) for x in v if x)
+    if isinstance(v, dict):
+        parts: List[str] = []
+        for val in v.values():
+            if isinstance(val, list):
+                parts.extend(str(x) for x in val if x)
+            elif isinstance(val, str):
+                parts.append(val)
+        return " ".join(parts)
+    return str(v or "")
+
+def _ings_text(doc: Dict[str, Any]) -> str:
+    ing = doc.get("ingredients")
+    return " ".join([
+        _as_text(doc.get("ingredients_full")),
+        _as_text(doc.get("ingredients_clean")),
+        _as_text(ing),
+        _as_text(ing.get("raw") if isinstance(ing, dict) else None),
+        _as_text(ing.get("norm_ko") if isinstance(ing, dict) else None),
+        _as_text(ing.get("norm_slug") if isinstance(ing, dict) else None),
+    ])
+
+def _legacy_contains_all(doc: Dict[str, Any], tokens: List[str]) -> bool:
+    text = " ".join([doc.get("title") or "", _as_text(doc.get("tags")), _as_text(doc.get("chips")),
+                     _ings_text(doc), doc.get("summary") or ""])
+    return all(re.search(re.escape(t), text, re.I) for t in tokens)
+
+def _legacy_score(doc: Dict[str, Any], tokens: List[str]) -> float:
+    title = doc.get("title") or ""
+    tags, chips = _as_text(doc.get("tags")), _as_text(doc.get("chips"))
+    summ = doc.get("summary") or ""
+    ings_text = _ings_text(doc)
+    s = 0.0
+    for t in tokens:
+        pat = re.compile(re.escape(t), re.I)
+        if pat.search(title):             s += 2.0
+        if pat.search(f"{tags} {chips}"): s += 1.5
+        if pat.search(ings_text):         s += 1.2
+        if pat.search(summ):              s += 0.5
+    if doc.get("steps_full") or doc.get("ingredients_full"):
+        s += 0.2
+    return s
+
+def _legacy_rank(docs: List[Dict[str, Any]], tokens: List[str], limit: int) -> List[Dict[str, Any]]:
+    must = [d for d in docs if _legacy_contains_all(d, tokens)]
+    must_ids = {id(d) for d in must}
+    rest = [d for d in docs if id(d) not in must_ids]
+    must = sorted(must, key=lambda d: _legacy_score(d, tokens), reverse=True)
+    rest = sorted(rest, key=lambda d: _legacy_score(d, tokens), reverse=True)
+    return (must + rest)[:limit]
+
+# ---------------------------------------------------------------------------
+# 합성 카드 (실제 스키마 혼합: list / {raw,norm_ko} / ingredients_full)
+# ---------------------------------------------------------------------------
+def _make_doc(rng: random.Random) -> Dict[str, Any]:
+    pick = lambda k: rng.sample(WORDS, k)
+    doc: Dict[str, Any] = {
+        "title": "".join(pick(2)) + rng.choice(["볶음", "조림", "찌개", "전"]),
+        "summary": " ".join(pick(8)),
+        "tags": pick(3),
+        "chips": pick(2),
+    }
+    shape = rng.randrange(3)
+    lines = [f"{w} {rng.randint(1, 3)}개" for w in pick(10)]
+    if shape == 0:
+        doc["ingredients"] = lines
+    elif shape == 1:
+        doc["ingredients"] = {"raw": lines, "norm_ko": pick(5)}
+    else:
+        doc["ingredients_full"] = lines
+        doc["steps_full"] = ["재료를 손질한다.", "볶는다.", "담는다."]
+    return doc
+
+def _bench(fn, docs, tokens) -> float:
+    t0 = time.process_time()
+    for _ in range(REPEAT):
+        fn(docs, tokens, 30)
+    return (time.process_time() - t0) / REPEAT * 1000
+
+def main() -> None:
+    rng = random.Random(42)
+    docs = [_make_doc(rng) for _ in range(N_DOCS)]
+    tokens = rng.sample(WORDS[:12], N_TOKENS)
+
+    # 동점 순서는 부동소수 합산 순서에 따라 달라질 수 있어 (AND 여부, 점수) 열로 비교
+    def _sig(ranked):
+        return [(_legacy_contains_all(d, tokens), round(_legacy_score(d, tokens), 6)) for d in ranked]
+    same = _sig(_legacy_rank(docs, tokens, 30)) == _sig(_rank_docs(docs, tokens, 30))
+
+    before = _bench(_legacy_rank, docs, tokens)
+    after = _bench(_rank_docs, docs, tokens)
+    engine = "pyahocorasick" if _HAS_PYAC else "regex lookahead"
+    print(f"[bench] docs={N_DOCS} tokens={tokens} repeat={REPEAT} matcher={engine}")
+    print(f"[bench] before: {before:.2f} ms CPU/request")
+    print(f"[bench] after : {after:.2f} ms CPU/request  (x{before / max(after, 1e-9):.1f})")
+    print(f"[bench] same top-30 ranking: {same}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# app/scripts/bench_topk.py
+# CardIndex.search 조기 종료(top-k) 마이크로벤치 (DB 불필요, 합성 카드 사용)
+# - before: 전체 후보 점수 계산 후 정렬 → [:limit] (개선 전 CardIndex.search 그대로)
+# - after : CardIndex.search (임팩트 정렬 포스팅 + Threshold Algorithm)
+# 코퍼스 크기를 늘려가며 요청당 지연이 limit 근처에서 평평하게 유지되는지 본다
+# 실행: python -m app.scripts.bench_topk
+#   BENCH_SIZES(기본 "10000,50000,100000") / BENCH_LIMIT(기본 30) / BENCH_REPEAT(기본 20)
+
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from app.services.crawl10000.card_index import CardIndex, FULL_BONUS, mask_score
+
+SIZES = [int(x) for x in os.getenv("BENCH_SIZES", "10000,50000,100000").split(",")]
+LIMIT = int(os.getenv("BENCH_LIMIT", "30"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+
+WORDS = (
+    "감자 양파 계란 두부 애호박 당근 버섯 돼지고기 닭가슴살 오이 고등어 김치 참치 토마토 "
+    "브로콜리 양배추 치즈 베이컨 새우 고구마 시금치 콩나물 어묵 떡 소시지 가지 파프리카 연근"
+).split()
+
+# ---------------------------------------------------------------------------
+# 기존 구현 (비교 기준) — 개선 전 CardIndex.search 그대로
+# ---------------------------------------------------------------------------
+def _legacy_search(idx: CardIndex, tokens: List[str], limit: int) -> List[Any]:
+    per_token = [idx.token_masks(t) for t in tokens if t and t.strip()]
+    if not per_token:
+        return []
+    scores: Dict[Any, float] = {}
+    hits: Dict[Any, int] = {}
+    for masks in per_token:
+        for cid, mask in masks.items():
+            scores[cid] = scores.get(cid, 0.0) + mask_score(mask)
+            hits[cid] = hits.get(cid, 0) + 1
+    n = len(per_token)
+    for cid in scores:
+        if cid in idx._full:
+            scores[cid] += FULL_BONUS
+    ranked = sorted(scores, key=lambda c: (hits[c] == n, scores[c]), reverse=True)
+    return ranked[:limit]
+
+# 실제 재료 분포처럼 소수 재료가 자주, 대부분은 드물게 등장 (Zipf, 어휘 ~300)
+VOCAB = WORDS + [a + b + c for a in "가나다라마" for b in "바사아자차카" for c in "타파하고노도마보소오"][:270]
+ZIPF = [1.0 / (r + 1) for r in range(len(VOCAB))]
+
+def _make_doc(rng: random.Random, i: int) -> Dict[str, Any]:
+    def pick(k: int) -> List[str]:
+        return list(dict.fromkeys(rng.choices(VOCAB, weights=ZIPF, k=k)))
+    return {
+        "_id": i,
+        "search_fields": [
+            "".join(pick(2)) + rng.choice(["볶음", "조림", "찌개", "전"]),
+            " ".join(pick(3)), " ".join(pick(8)), " ".join(pick(6)),
+        ],
+        "has_full": rng.random() < 0.3,
+    }
+
+def _sig(idx: CardIndex, ids: List[Any], tokens: List[str]):
+    # 동점 순서는 구현마다 다를 수 있어 (AND 여부, 점수) 열로 비교
+    lists = [idx.token_masks(t) for t in tokens]
+    out = []
+    for cid in ids:
+        s = sum(mask_score(m.get(cid, 0)) for m in lists) + (FULL_BONUS if cid in idx._full else 0)
+        out.append((all(cid in m for m in lists), round(s, 6)))
+    return out
+
+def _bench(fn, idx, queries) -> float:
+    t0 = time.process_time()
+    for _ in range(REPEAT):
+        for q in queries:
+            fn(idx, q, LIMIT)
+    return (time.process_time() - t0) / (REPEAT * len(queries)) * 1000
+
+def main() -> None:
+    rng = random.Random(7)
+    queries = [rng.sample(WORDS[:16], k) for k in (1, 2, 3, 4, 5)] + [rng.sample(WORDS[8:], 2)]
+    for n in SIZES:
+        idx = CardIndex()
+        for i in range(n):
+            idx.upsert(_make_doc(rng, i))
+        same = all(
+            _sig(idx, _legacy_search(idx, q, LIMIT), q) == _sig(idx, idx.search(q, LIMIT), q)
+            for q in queries
+        )
+        before = _bench(_legacy_search, idx, queries)
+        after = _bench(lambda ix, q, k: ix.search(q, k), idx, queries)
+        print(f"[bench] cards={n} limit={LIMIT}: before {before:.2f} ms  after {after:.2f} ms"
+              f"  (x{before / max(after, 1e-9):.1f})  same top-{LIMIT}: {same}")
+
+if __name__ == "__main__":
+    main()
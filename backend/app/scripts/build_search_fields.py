@@ -0,0 +1,46 @@
+# app/scripts/build_search_fields.py
+# 기존 recipe_cards에 검색용 역정규화 필드(search_fields/has_full/search_tokens/ing_tokens)를 일괄 채운다.
+# 추천 후보 조회($in/$all on search_tokens)와 1단계 점수화가 원문 배열 대신 이 필드만 읽도록 하기 위함.
+# 실행: python -m app.scripts.build_search_fields  (ALL=1 이면 이미 있는 카드도 재계산)
+import asyncio
+import os
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.db.init import init_db, get_db
+from app.services.crawl10000.card_index import INDEX_PROJECTION, build_search_fields
+from app.services.crawl10000.vocab import set_vocabulary
+from app.services.crawl10000.vocab_store import load_vocabulary
+
+BATCH = 500
+
+async def main(rebuild_all: bool = os.getenv("ALL") == "1"):
+    await init_db()
+    db = get_db()
+    set_vocabulary(await load_vocabulary(db))   # 토큰화는 ingredient_vocab 기준
+    col = db["recipe_cards"]
+
+    missing = {"$or": [
+        {"search_fields": {"$exists": False}},
+        {"search_tokens": {"$exists": False}},
+        {"ing_tokens": {"$exists": False}},
+    ]}
+    q = {} if rebuild_all else missing
+    ops = []
+    n = 0
+    async for d in col.find(q, INDEX_PROJECTION):
+        fields = build_search_fields(d)
+        ops.append(UpdateOne({"_id": d["_id"]}, {"$set": {**fields, "updated_at": datetime.utcnow()}}))
+        if len(ops) >= BATCH:
+            await col.bulk_write(ops, ordered=False)
+            n += len(ops)
+            ops = []
+    if ops:
+        await col.bulk_write(ops, ordered=False)
+        n += len(ops)
+
+    print(f"[search_fields] updated cards: {n}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
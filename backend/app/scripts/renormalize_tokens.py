@@ -0,0 +1,21 @@
+# app/scripts/renormalize_tokens.py
+# ingredient_vocab 현재 버전으로 recipe_cards/recipes 의 저장 토큰(search_tokens/ing_tokens/norm_ko/norm_slug)을 다시 만든다.
+# 앱이 떠 있으면 어휘 버전이 바뀔 때 자동으로 돌지만(VOCAB_RENORMALIZE), 앱 없이 일괄 처리할 때 사용.
+# 실행: python -m app.scripts.renormalize_tokens
+import asyncio
+
+from app.db.init import init_db, get_db
+from app.services.crawl10000.vocab import set_vocabulary
+from app.services.crawl10000.vocab_store import load_vocabulary, renormalize_tokens
+
+async def main():
+    await init_db()
+    db = get_db()
+    vocab = await load_vocabulary(db)
+    set_vocabulary(vocab)
+    print(f"[renormalize] vocab version={vocab.version} entries={len(vocab)}")
+    stats = await renormalize_tokens(db, claim=False)
+    print(f"[renormalize] {stats}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
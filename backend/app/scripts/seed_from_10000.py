@@ -26,6 +26,10 @@ except Exception:
         def normalize_ingredients_ko(xs: List[str]) -> List[str]:
             return [x.strip() for x in xs if x and str(x).strip()]
 
+from app.services.crawl10000.card_index import build_search_fields
+from app.services.crawl10000.vocab import set_vocabulary
+from app.services.crawl10000.vocab_store import load_vocabulary
+
 # ---------------------------------------------------------------------------
 
 # 환경변수 우선(MONGODB_URI → MONGODB_URL), 없으면 도커 서비스명 기본값
@@ -154,7 +158,7 @@ def make_doc(item: Dict[str, Any], terms: List[str], extra_tags: List[str]) -> D
     ings = item.get("ingredients", []) or []
     steps = item.get("steps", []) or []
 
-    return {
+    doc = {
         "title": item.get("title") or "",
         "summary": item.get("desc") or "",
         "imageUrl": item.get("thumbnail") or "",
@@ -163,7 +167,11 @@ def make_doc(item: Dict[str, Any], terms: List[str], extra_tags: List[str]) -> D
         "steps": steps,
         "source": {"site": "만개의레시피", "url": item.get("url"), "recipe_id": rid},
         "is_recipe": True,
+        "updated_at": datetime.utcnow(),   # API 역색인 증분 동기화 워터마크
     }
+    # 추천 후보 조회/점수화용 역정규화 필드(search_fields/search_tokens)
+    doc.update(build_search_fields(doc))
+    return doc
 
 async def seed_one_query(db, terms: List[str], extra_tags: List[str], limit: int) -> Dict[str, int]:
     # 상세까지 긁어서 반환
@@ -228,7 +236,11 @@ async def create_indexes(db):
     if not has_key([("tags", 1)]):
         await safe_create([("tags", 1)], name="tags_1")
 
-    # 4) 텍스트 인덱스(컬렉션당 1개)
+    # 4) 정규화 재료 토큰 멀티키 인덱스
+    if not has_key([("search_tokens", 1)]):
+        await safe_create([("search_tokens", 1)], name="search_tokens_1")
+
+    # 5) 텍스트 인덱스(컬렉션당 1개)
     has_text = any(any(p[1] == "text" for p in v.get("key", [])) for v in info.values())
     if not has_text:
         await safe_create([("title", "text"), ("summary", "text")], name="txt_title_summary")
@@ -241,6 +253,7 @@ async def main():
     db = cli[DBNAME]
 
     await create_indexes(db)
+    set_vocabulary(await load_vocabulary(db))   # 토큰화는 ingredient_vocab 기준
 
     plan = build_query_plan()
     random.shuffle(plan)
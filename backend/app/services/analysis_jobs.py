@@ -0,0 +1,270 @@
+# app/services/analysis_jobs.py
+# 목적: 사진 분석 비동기 작업 큐 (제출 → 폴링)
+# - POST 는 이미지를 images 컬렉션에 저장하고 image_analyses 에 status=pending 작업만 만든 뒤 바로 반환
+# - 프로세스 내 워커 N개가 status=pending 을 created_at 순으로 원자적으로 선점(find_one_and_update)
+#   → Vision + 추천 실행 → 결과/오류를 작업 문서에 기록
+# - HTTP 워커는 Vision 호출 시간 동안 묶이지 않고, 몰리는 요청은 타임아웃 대신 대기열에 쌓인다
+# - 제출 시 Event로 워커를 즉시 깨우고, 다른 프로세스가 넣은 작업은 POLL_SEC 주기로 확인
+# - 앱이 실행 중에 죽어 running 으로 남은 작업은 시작 시 STALE_SEC 기준으로 pending 복귀
+# - 재시도는 not_before 시각까지 선점 대상에서 빠진다 (일시 오류는 지수 백오프, Vision 장애(JobRetry)는
+#   retry_after 뒤 — 시도 횟수를 쓰지 않고 RETRY_WINDOW_SEC 까지 대기열에서 기다림)
+# - 끝난 작업(done/failed)의 원본 이미지 바이트는 지운다 (메타데이터/해시만 남김)
+# - 실제 분석 로직은 라우터가 set_handler 로 등록 (서비스 → api 역참조 방지)
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.services.image_prep import sniff_mime
+
+log = logging.getLogger(__name__)
+
+WORKERS = max(1, int(getattr(settings, "ANALYSIS_WORKERS", 2) or 2))
+POLL_SEC = float(getattr(settings, "ANALYSIS_POLL_SEC", 2.0) or 2.0)
+STALE_SEC = float(getattr(settings, "ANALYSIS_STALE_SEC", 300.0) or 300.0)
+MAX_ATTEMPTS = max(1, int(getattr(settings, "ANALYSIS_MAX_ATTEMPTS", 2) or 2))
+RETRY_BACKOFF_SEC = float(getattr(settings, "ANALYSIS_RETRY_BACKOFF_SEC", 5.0) or 5.0)
+RETRY_WINDOW_SEC = float(getattr(settings, "ANALYSIS_RETRY_WINDOW_SEC", 900.0) or 0.0)
+
+STATUSES = ("pending", "running", "done", "failed")
+
+# (db, 이미지 바이트들, 작업 문서) → 결과 dict
+Handler = Callable[[Any, List[bytes], Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobFailed(Exception):
+    """재시도해도 같은 결과인 실패 (입력 문제 등) — 바로 failed 처리."""
+
+    def __init__(self, detail: Any, code: int = 422) -> None:
+        super().__init__(str(detail))
+        self.detail = detail
+        self.code = code
+
+
+class JobRetry(Exception):
+    """지금은 실행할 수 없는 상태 (Vision 서킷 open 등) — 실패로 치지 않고 retry_after 초 뒤 다시 대기열로."""
+
+    def __init__(self, detail: Any, retry_after: float = RETRY_BACKOFF_SEC) -> None:
+        super().__init__(str(detail))
+        self.detail = detail
+        self.retry_after = max(1.0, float(retry_after or RETRY_BACKOFF_SEC))
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+class AnalysisQueue:
+    def __init__(self, workers: int = WORKERS, poll_sec: float = POLL_SEC) -> None:
+        self.workers = workers
+        self.poll_sec = poll_sec
+        self._handler: Optional[Handler] = None
+        self._db = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wake = asyncio.Event()
+        self.stats = {"submitted": 0, "done": 0, "failed": 0, "retried": 0, "requeued": 0, "errors": 0}
+
+    def set_handler(self, handler: Handler) -> None:
+        self._handler = handler
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    # ---------- 제출/조회 ----------
+    async def submit(self, db, images: List[bytes], anon_id: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """이미지 저장 + pending 작업 생성 → 작업 id (Vision은 워커가 나중에 실행)."""
+        now = _now()
+        docs = [
+            {
+                "anon_id": anon_id, "created_at": now, "data": b,
+                "mime": sniff_mime(b) or "application/octet-stream",
+                "size": len(b), "sha256": hashlib.sha256(b).hexdigest(),
+            }
+            for b in images
+        ]
+        res = await db["images"].insert_many(docs)
+        image_ids = list(res.inserted_ids)
+        job = {
+            "anon_id": anon_id,
+            "image_id": image_ids[0] if image_ids else None,
+            "image_ids": image_ids,
+            "params": dict(params or {}),
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        jid = (await db["image_analyses"].insert_one(job)).inserted_id
+        self.stats["submitted"] += 1
+        self._wake.set()
+        return str(jid)
+
+    async def get(self, db, job_id: str, anon_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """작업 상태 조회 (다른 사용자의 작업은 None). 대기 중이면 앞선 대기 작업 수(position) 포함."""
+        if not ObjectId.is_valid(job_id):
+            return None
+        job = await db["image_analyses"].find_one({"_id": ObjectId(job_id)})
+        if not job or (anon_id is not None and job.get("anon_id") != anon_id):
+            return None
+        if job.get("status") == "pending":
+            job["position"] = await db["image_analyses"].count_documents(
+                {"status": "pending", "created_at": {"$lt": job["created_at"]}}
+            )
+        return job
+
+    # ---------- 워커 ----------
+    async def start(self, db) -> None:
+        if self._tasks:
+            return
+        self._db = db
+        await self._requeue_stale()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._wake.set()
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        for t in tasks:
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _requeue_stale(self) -> None:
+        cutoff = _now() - timedelta(seconds=STALE_SEC)
+        res = await self._db["image_analyses"].update_many(
+            {"status": "running", "started_at": {"$lt": cutoff}},
+            {"$set": {"status": "pending", "updated_at": _now()}},
+        )
+        if res.modified_count:
+            self.stats["requeued"] += res.modified_count
+            log.warning("analysis: requeued %d stale running jobs", res.modified_count)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        # (status, created_at) 인덱스로 가장 오래된 pending 1건을 원자적으로 running 전환
+        # (재시도 대기 중인 작업은 not_before 가 지날 때까지 건너뜀, 필드 없는 작업은 바로 대상)
+        now = _now()
+        return await self._db["image_analyses"].find_one_and_update(
+            {"status": "pending", "not_before": {"$not": {"$gt": now}}},
+            {"$set": {"status": "running", "started_at": now, "updated_at": now}, "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _worker(self, i: int) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("analysis worker %d: claim failed: %s", i, e)
+                job = None
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_sec)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._wake.set()   # 대기열이 더 남아 있을 수 있으니 다른 워커도 깨움
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 결과 기록(_finish/_fail/_drop_images) 중 DB 오류: 워커는 살려 두고 다음 작업으로
+                # (running 으로 남은 작업은 다음 기동 때 STALE_SEC 기준으로 pending 복귀)
+                self.stats["errors"] += 1
+                log.exception("analysis worker %d: job %s bookkeeping failed: %s", i, job.get("_id"), e)
+
+    async def _finish(self, job: Dict[str, Any], fields: Dict[str, Any]) -> None:
+        now = _now()
+        fields = {**fields, "updated_at": now}
+        if fields.get("status") in ("done", "failed"):
+            fields["finished_at"] = now
+            fields["ms"] = round((now - job["started_at"]).total_seconds() * 1000, 1)
+        await self._db["image_analyses"].update_one({"_id": job["_id"]}, {"$set": fields})
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        ids = job.get("image_ids") or []
+        try:
+            if self._handler is None:
+                raise RuntimeError("analysis handler not registered")
+            found = {d["_id"]: d.get("data") for d in await self._db["images"].find(
+                {"_id": {"$in": ids}}, {"data": 1}).to_list(length=None)}
+            images = [bytes(found[i]) for i in ids if found.get(i)]
+            if not images:
+                raise JobFailed("images not found", code=410)
+            result = await self._handler(self._db, images, job)
+        except asyncio.CancelledError:
+            # 종료 중: 다음 기동 때 다시 잡히도록 되돌림
+            await self._finish(job, {"status": "pending"})
+            raise
+        except JobFailed as e:
+            await self._fail(job, e.detail, e.code)
+            return
+        except JobRetry as e:
+            # Vision 장애: 시도 횟수를 되돌리고 장애 창 안이면 retry_after 뒤 다시 선점
+            if RETRY_WINDOW_SEC and _now() - job["created_at"] < timedelta(seconds=RETRY_WINDOW_SEC):
+                self.stats["retried"] += 1
+                log.warning("analysis %s deferred %.0fs: %s", job["_id"], e.retry_after, e)
+                await self._finish(job, {
+                    "status": "pending", "error": str(e), "attempts": max(0, job.get("attempts", 1) - 1),
+                    "not_before": _now() + timedelta(seconds=e.retry_after),
+                })
+            else:
+                await self._fail(job, e.detail, 503)
+            return
+        except Exception as e:
+            attempts = job.get("attempts", 1)
+            if attempts < MAX_ATTEMPTS:
+                self.stats["retried"] += 1
+                delay = RETRY_BACKOFF_SEC * 2 ** (attempts - 1)
+                log.warning("analysis %s attempt %d failed, retrying in %.0fs: %s", job["_id"], attempts, delay, e)
+                await self._finish(job, {
+                    "status": "pending", "error": str(e), "not_before": _now() + timedelta(seconds=delay),
+                })
+            else:
+                log.exception("analysis %s failed", job["_id"])
+                await self._fail(job, str(e), 500)
+            return
+
+        self.stats["done"] += 1
+        await self._finish(job, {"status": "done", "result": result, "error": None})
+        await self._drop_images(ids)
+
+    async def _fail(self, job: Dict[str, Any], detail: Any, code: int) -> None:
+        self.stats["failed"] += 1
+        await self._finish(job, {"status": "failed", "error": detail, "code": code})
+        await self._drop_images(job.get("image_ids") or [])
+
+    async def _drop_images(self, ids: List[Any]) -> None:
+        # 끝난 작업의 원본 바이트는 보관하지 않음 (메타데이터/해시만 남김)
+        if ids:
+            await self._db["images"].update_many({"_id": {"$in": ids}}, {"$unset": {"data": ""}})
+
+
+_queue = AnalysisQueue()
+
+
+def get_analysis_queue() -> AnalysisQueue:
+    return _queue
+
+
+async def start_analysis_workers(db) -> AnalysisQueue:
+    await _queue.start(db)
+    return _queue
+
+
+async def stop_analysis_workers() -> None:
+    await _queue.stop()
@@ -0,0 +1,72 @@
+# app/services/circuit_breaker.py
+# 목적: 외부 의존(Vision 프로바이더) 장애 시 빠른 실패
+# - closed: 정상. 연속 실패(오류/타임아웃/느린 호출)가 FAILURES 회 쌓이면 open
+# - open: COOLDOWN_SEC 동안 호출 자체를 막음 → 요청은 기다리지 않고 즉시 503(또는 토큰 폴백)
+# - half_open: 쿨다운이 지나면 탐침 1건만 통과, 성공하면 closed / 실패하면 다시 open
+
+from __future__ import annotations
+import logging
+import time
+from typing import Any, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failures: int = 5, cooldown: float = 30.0,
+                 slow_sec: Optional[float] = None) -> None:
+        self.name = name
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self.slow_sec = slow_sec          # 이보다 오래 걸린 성공도 실패로 셈 (없으면 미적용)
+        self.state = "closed"
+        self._streak = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.stats = {"rejected": 0, "opened": 0, "failures": 0, "successes": 0}
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.cooldown:
+                self.stats["rejected"] += 1
+                return False
+            self.state = "half_open"
+            self._probing = False
+        if self._probing:                 # half_open: 탐침 1건만
+            self.stats["rejected"] += 1
+            return False
+        self._probing = True
+        return True
+
+    def record(self, ok: bool, seconds: Optional[float] = None) -> None:
+        if ok and self.slow_sec is not None and seconds is not None and seconds > self.slow_sec:
+            ok = False
+        if ok:
+            self.stats["successes"] += 1
+            if self.state != "closed":
+                log.info("circuit %s closed", self.name)
+            self.state, self._streak, self._probing = "closed", 0, False
+            return
+        self.stats["failures"] += 1
+        self._streak += 1
+        if self.state == "half_open" or self._streak >= self.failures:
+            if self.state != "open":
+                self.stats["opened"] += 1
+                log.warning("circuit %s open (streak=%d, cooldown=%.0fs)", self.name, self._streak, self.cooldown)
+            self.state, self._opened_at, self._probing = "open", time.monotonic(), False
+
+    def release(self) -> None:
+        # 탐침이 결과 기록 없이 끝난 경우(취소 등) 다음 탐침을 허용
+        if self.state == "half_open":
+            self._probing = False
+
+    def retry_after(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "streak": self._streak,
+                "retry_after": round(self.retry_after(), 1), **self.stats}
@@ -0,0 +1,333 @@
+# app/services/crawl10000/bm25.py
+# 목적: recipe_cards BM25 랭킹 (ranking=bm25)
+# - 흔한 토큰(양파)과 드문 토큰(고등어)을 IDF로 구분, 필드 길이 정규화(BM25F 방식)
+#   필드: 제목/태그+칩/재료/요약 — 가중치는 card_index.FIELD_WEIGHTS와 동일
+# - 포스팅은 CSR 형태 NumPy 배열: indptr[단어] → rows(int32), masks(uint8, 필드 비트)
+# - 카드 변경은 pending 오버레이(dict)에 쌓고 행은 새로 붙임(옛 행은 alive=False),
+#   오버레이가 COMPACT_AT을 넘으면 CSR을 다시 만든다 (card_index 리스너로 증분 반영)
+#   재구성은 스냅샷(살아있는 행 + 단어 dict 참조)으로 워커 스레드에서 하고, 끝나면 이벤트 루프에서 한 번에 교체
+#   → 그동안 요청은 기존 CSR + 오버레이로 계속 응답, 스냅샷 이후 바뀐 카드는 새 오버레이로 옮겨 담는다
+# - 질의 토큰은 어휘 부분 문자열로 확장("호박" → "애호박")해 역색인 경로와 같은 매칭 규칙 유지
+
+from __future__ import annotations
+import asyncio
+import math
+import time
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.crawl10000.card_index import (
+    COMPACT_PROJECTION, FIELD_WEIGHTS, INDEX_PROJECTION, BuildBuffer, add_card_listener, card_terms,
+)
+
+log = logging.getLogger(__name__)
+
+K1 = 1.2
+B = 0.75
+COMPACT_AT = 1000          # 오버레이 카드 수가 이만큼 쌓이면 CSR 재구성
+EXPAND_CACHE_MAX = 4096
+
+_N_FIELDS = len(FIELD_WEIGHTS)
+_FIELD_W = np.array([w for _, w in FIELD_WEIGHTS], dtype=np.float32)
+_FIELD_BITS = np.array([b for b, _ in FIELD_WEIGHTS], dtype=np.uint8)
+
+_CSR = Tuple[Dict[str, int], np.ndarray, np.ndarray, np.ndarray]
+
+
+def _build_csr(terms: List[Optional[Dict[str, int]]]) -> _CSR:
+    """행별 {단어: 마스크} → (어휘, indptr, rows, masks). 공유 상태를 건드리지 않아 스레드에서 실행 가능."""
+    vocab: Dict[str, int] = {}
+    tids: List[int] = []
+    rows: List[int] = []
+    masks: List[int] = []
+    for new_r, t in enumerate(terms):
+        for w, m in (t or {}).items():
+            tid = vocab.get(w)
+            if tid is None:
+                tid = vocab[w] = len(vocab)
+            tids.append(tid)
+            rows.append(new_r)
+            masks.append(m)
+    tid_arr = np.asarray(tids, dtype=np.int64)
+    order = np.argsort(tid_arr, kind="stable")
+    counts = np.bincount(tid_arr, minlength=len(vocab))
+    indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return vocab, indptr, np.asarray(rows, dtype=np.int32)[order], np.asarray(masks, dtype=np.uint8)[order]
+
+
+class BM25Index:
+    """
+    CSR 포스팅 + 변경분 오버레이.
+    - _terms[row]: 행의 {단어: 필드 마스크} (재구성/길이 계산용 정방향)
+    - _lens[row, f]: 필드별 단어 수, _alive[row]: 현재 유효 행
+    """
+
+    def __init__(self) -> None:
+        self._ids: List[Any] = []
+        self._row: Dict[Any, int] = {}
+        self._terms: List[Optional[Dict[str, int]]] = []
+        self._lens = np.zeros((0, _N_FIELDS), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._len_sum = np.zeros(_N_FIELDS, dtype=np.float64)
+        # CSR (compact 시점 스냅샷)
+        self._vocab: Dict[str, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._rows = np.zeros(0, dtype=np.int32)
+        self._masks = np.zeros(0, dtype=np.uint8)
+        # 오버레이: compact 이후 바뀐 카드의 포스팅
+        self._pending: Dict[str, Dict[int, int]] = {}
+        self._pending_rows: Set[int] = set()
+        self._expand_cache: Dict[str, List[str]] = {}
+        self._compacting: Optional["asyncio.Task[None]"] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    # ---------- 쓰기 ----------
+    def _append_row(self, cid: Any, terms: Dict[str, int]) -> int:
+        r = len(self._ids)
+        self._ids.append(cid)
+        self._terms.append(terms)
+        if r >= len(self._alive):
+            extra = max(1024, len(self._alive))
+            self._lens = np.vstack([self._lens, np.zeros((extra, _N_FIELDS), dtype=np.float32)])
+            self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        lens = [sum(1 for m in terms.values() if m & bit) for bit, _ in FIELD_WEIGHTS]
+        self._lens[r] = lens
+        self._len_sum += lens
+        self._alive[r] = True
+        self._row[cid] = r
+        return r
+
+    def _drop_row(self, r: int) -> None:
+        terms = self._terms[r] or {}
+        if r in self._pending_rows:
+            self._pending_rows.discard(r)
+            for w in terms:
+                bucket = self._pending.get(w)
+                if bucket is not None:
+                    bucket.pop(r, None)
+        self._len_sum -= self._lens[r]
+        self._alive[r] = False
+        self._terms[r] = None
+        self._ids[r] = None
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        """빌드용: 오버레이 없이 행만 추가 (끝나고 compact() 호출)."""
+        cid = doc.get("_id")
+        if cid is not None and cid not in self._row:
+            self._append_row(cid, card_terms(doc))
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        cid = doc.get("_id")
+        if cid is None:
+            return
+        self.remove(cid)
+        terms = card_terms(doc)
+        r = self._append_row(cid, terms)
+        self._pending_rows.add(r)
+        for w, mask in terms.items():
+            bucket = self._pending.get(w)
+            if bucket is None:
+                bucket = self._pending[w] = {}
+                if w not in self._vocab:
+                    self._expand_cache.clear()   # 새 어휘
+            bucket[r] = mask
+        if len(self._pending_rows) >= COMPACT_AT:
+            self._schedule_compact()
+
+    def remove(self, cid: Any) -> None:
+        r = self._row.pop(cid, None)
+        if r is not None:
+            self._drop_row(r)
+
+    def _snapshot(self) -> Tuple[List[int], int, List[Optional[Dict[str, int]]]]:
+        n = len(self._ids)
+        keep = [int(r) for r in np.flatnonzero(self._alive[:n])]
+        return keep, n, [self._terms[r] for r in keep]
+
+    def _install(self, keep: List[int], n_snap: int, csr: _CSR, t0: float) -> None:
+        """
+        스냅샷 기준 CSR 교체: 스냅샷 행은 0..len(keep)-1, 그 뒤에 붙은 살아있는 행은 이어서 번호를 매겨 새 오버레이로.
+        스냅샷 이후 지워진 행은 alive=False 로 남겨 조회에서 걸러지고 다음 재구성 때 빠진다. (await 없이 한 번에 실행)
+        """
+        extra = [r for r in range(n_snap, len(self._ids)) if self._alive[r]]
+        order = keep + extra
+        m = len(order)
+        ids = [self._ids[r] for r in order]
+        terms = [self._terms[r] for r in order]
+        alive = self._alive[order] if m else np.zeros(0, dtype=bool)
+        lens = self._lens[order] if m else np.zeros((0, _N_FIELDS), dtype=np.float32)
+
+        cap = max(1024, m)
+        self._ids = ids
+        self._terms = terms
+        self._row = {cid: i for i, cid in enumerate(ids) if alive[i]}
+        self._lens = np.zeros((cap, _N_FIELDS), dtype=np.float32)
+        self._lens[:m] = lens
+        self._alive = np.zeros(cap, dtype=bool)
+        self._alive[:m] = alive
+        self._len_sum = self._lens[:m][alive].sum(axis=0, dtype=np.float64)
+        self._vocab, self._indptr, self._rows, self._masks = csr
+        self._pending = {}
+        self._pending_rows = set()
+        for r in range(len(keep), m):
+            self._pending_rows.add(r)
+            for w, mask in (terms[r] or {}).items():
+                self._pending.setdefault(w, {})[r] = mask
+        self._expand_cache = {}
+        log.info("bm25 compact: cards=%d terms=%d postings=%d overlay=%d (%.1f ms)",
+                 len(self._row), len(self._vocab), len(self._rows), len(self._pending_rows),
+                 (time.perf_counter() - t0) * 1000)
+
+    def compact(self) -> None:
+        """동기 재구성 (이벤트 루프 밖 스크립트/벤치용). 살아있는 행만 다시 번호 매기고 오버레이 비움."""
+        t0 = time.perf_counter()
+        keep, n, terms = self._snapshot()
+        self._install(keep, n, _build_csr(terms), t0)
+
+    async def compact_async(self) -> None:
+        """스냅샷으로 워커 스레드에서 CSR 을 만들고 루프에서 교체 — 그동안 조회/증분 반영은 계속된다."""
+        t0 = time.perf_counter()
+        keep, n, terms = self._snapshot()
+        csr = await asyncio.to_thread(_build_csr, terms)
+        self._install(keep, n, csr, t0)
+
+    def _schedule_compact(self) -> None:
+        if self._compacting is not None and not self._compacting.done():
+            return   # 진행 중인 재구성이 끝나면 다음 upsert 에서 다시 판단
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.compact()
+            return
+        self._compacting = loop.create_task(self.compact_async())
+        self._compacting.add_done_callback(_log_compact_error)
+
+    # ---------- 읽기 ----------
+    def expand(self, token: str) -> List[str]:
+        """질의 토큰을 포함하는 어휘(CSR + 오버레이) 단어들."""
+        t = (token or "").strip().lower()
+        if not t:
+            return []
+        hit = self._expand_cache.get(t)
+        if hit is None:
+            words = set(w for w in self._vocab if t in w)
+            words.update(w for w in self._pending if t in w)
+            hit = sorted(words)
+            if len(self._expand_cache) >= EXPAND_CACHE_MAX:
+                self._expand_cache.pop(next(iter(self._expand_cache)))
+            self._expand_cache[t] = hit
+        return hit
+
+    def _postings(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """토큰 1개 → (행, 필드 마스크) — 확장 단어들을 행 단위로 OR 합침."""
+        rows_parts: List[np.ndarray] = []
+        mask_parts: List[np.ndarray] = []
+        for w in self.expand(token):
+            tid = self._vocab.get(w)
+            if tid is not None:
+                a, b = self._indptr[tid], self._indptr[tid + 1]
+                rows_parts.append(self._rows[a:b])
+                mask_parts.append(self._masks[a:b])
+            bucket = self._pending.get(w)
+            if bucket:
+                rows_parts.append(np.fromiter(bucket.keys(), dtype=np.int32, count=len(bucket)))
+                mask_parts.append(np.fromiter(bucket.values(), dtype=np.uint8, count=len(bucket)))
+        if not rows_parts:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint8)
+        rows = np.concatenate(rows_parts)
+        masks = np.concatenate(mask_parts)
+        keep = self._alive[rows]
+        rows, masks = rows[keep], masks[keep]
+        if len(rows_parts) > 1:
+            rows, inv = np.unique(rows, return_inverse=True)
+            merged = np.zeros(len(rows), dtype=np.uint8)
+            np.bitwise_or.at(merged, inv, masks)
+            masks = merged
+        return rows, masks
+
+    def search(self, tokens: List[str], limit: int) -> List[Tuple[Any, float]]:
+        """AND(모든 토큰 등장) 우선 + BM25F 점수 상위 limit개 (카드 _id, 점수)."""
+        uniq = list(dict.fromkeys(t.strip().lower() for t in tokens if t and t.strip()))
+        n_docs = len(self._row)
+        if not uniq or not n_docs:
+            return []
+        cap = len(self._ids)
+        avg = np.maximum(self._len_sum / n_docs, 1.0).astype(np.float32)
+        scores = np.zeros(cap, dtype=np.float32)
+        hits = np.zeros(cap, dtype=np.int16)
+        for t in uniq:
+            rows, masks = self._postings(t)
+            if not rows.size:
+                continue
+            df = rows.size
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            # 필드별 tf(0/1) × 가중치 / 길이 정규화 → 의사 tf 합산 후 포화
+            on = ((masks[:, None] & _FIELD_BITS) > 0).astype(np.float32)
+            norm = 1.0 - B + B * self._lens[rows] / avg
+            tf = (on * _FIELD_W / norm).sum(axis=1)
+            scores[rows] += idf * tf * (K1 + 1.0) / (tf + K1)
+            hits[rows] += 1
+        cand = np.flatnonzero(hits)
+        if not cand.size:
+            return []
+        is_and = hits[cand] == len(uniq)
+        order = np.lexsort((-scores[cand], ~is_and))[:limit]
+        return [(self._ids[cand[i]], float(scores[cand[i]])) for i in order]
+
+
+# ---------- 전역 인스턴스 + Mongo 연동 ----------
+_bm25 = BM25Index()
+_building = BuildBuffer()
+
+
+def get_bm25_index() -> BM25Index:
+    return _bm25
+
+
+async def build_bm25_index(db, batch_size: int = 2000) -> BM25Index:
+    """recipe_cards 전체로 CSR 통계를 만든 뒤 원자적으로 교체."""
+    global _bm25
+    fresh = BM25Index()
+    col = db["recipe_cards"]
+    # search_fields 보유 카드는 압축 필드만, 미보유(구 문서)만 원문 필드를 읽는다
+    _building.start()
+    try:
+        for q, proj in (
+            ({"search_fields": {"$exists": True}}, COMPACT_PROJECTION),
+            ({"search_fields": {"$exists": False}}, INDEX_PROJECTION),
+        ):
+            async for doc in col.find(q, proj).batch_size(batch_size):
+                fresh.add(doc)
+        await fresh.compact_async()
+    except BaseException:
+        _building.cancel()
+        raise
+    fresh.ready = True
+    _bm25 = fresh
+    _building.replay(fresh)
+    return fresh
+
+
+def _log_compact_error(task: "asyncio.Task[None]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        log.error("bm25 compact failed: %s", task.exception())
+
+
+# card_index 증분 갱신 경로에 연결 (빌드 중 변경은 _building 에 모았다가 교체 직후 새 인덱스에 재생)
+def _on_upsert(doc: Dict[str, Any]) -> None:
+    _building.upsert(doc)
+    if _bm25.ready:
+        _bm25.upsert(doc)
+
+
+def _on_remove(cid: Any) -> None:
+    _building.remove(cid)
+    _bm25.remove(cid)
+
+
+add_card_listener(_on_upsert, _on_remove)
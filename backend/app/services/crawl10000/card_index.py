@@ -0,0 +1,511 @@
+# app/services/crawl10000/card_index.py
+# 목적: recipe_cards 인메모리 역색인 (정규화 단어 → 카드 _id)
+# - 스타트업에서 1회 전체 빌드(백그라운드), 이후 쓰기 경로에서 refresh_cards()로 증분 갱신
+# - 외부 프로세스(seed/backfill 스크립트) 쓰기는 updated_at 워터마크로 주기 동기화
+# - 후보 생성은 포스팅 합집합(OR)/교집합(AND)만으로 끝나므로 컬렉션 스캔/800건 컷이 없음
+# - 부분 문자열 매칭(예: "호박" → "애호박")은 문서가 아니라 어휘(vocab) 단위로 확장해서 처리
+# - 랭킹은 토큰별 임팩트 정렬 포스팅 + 조기 종료(top-k)라 코퍼스가 커져도 limit 근처만 훑는다
+
+from __future__ import annotations
+import time
+import heapq
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.models.tags import extract_words
+from app.services.crawl10000.reco_cache import invalidate_reco_cache
+from app.services.crawl10000.seed_ing import build_ingredient_tokens, build_search_tokens
+from app.services.crawl10000.vocab import get_vocabulary
+
+log = logging.getLogger(__name__)
+
+# 필드 비트 (점수 가중치는 recommender._score와 동일하게 유지)
+F_TITLE, F_TAGS, F_INGS, F_SUMMARY = 1, 2, 4, 8
+FIELD_WEIGHTS: Tuple[Tuple[int, float], ...] = (
+    (F_TITLE, 2.0), (F_TAGS, 1.5), (F_INGS, 1.2), (F_SUMMARY, 0.5),
+)
+FULL_BONUS = 0.2
+
+# 인덱스 빌드/동기화에 필요한 최소 필드만 가져온다
+INDEX_PROJECTION = {
+    "_id": 1, "title": 1, "summary": 1, "tags": 1, "chips": 1,
+    "ingredients": 1, "ingredients_full": 1, "ingredients_clean": 1,
+    "steps_full": 1, "updated_at": 1, "search_fields": 1, "has_full": 1,
+    "variants.key_ingredients": 1,   # search_tokens 재계산용
+    "ing_tokens": 1,
+}
+# 압축 검색 필드가 이미 있는 카드는 이것만 읽으면 된다
+COMPACT_PROJECTION = {"_id": 1, "search_fields": 1, "has_full": 1, "updated_at": 1}
+
+SYNC_INTERVAL_SEC = 30.0     # 외부 쓰기 반영 주기
+EXPAND_CACHE_MAX = 4096      # 질의 토큰 → 어휘 확장 결과 캐시 상한
+TOKEN_CACHE_MAX = 1024       # 질의 토큰 → 임팩트 정렬 포스팅 캐시 상한
+
+
+def _as_text(v: Any) -> str:
+    # list/dict/str 혼합 스키마 → 하나의 문자열 (recommender._as_text와 같은 규칙)
+    if isinstance(v, list):
+        return " ".join(str(x) for x in v if x)
+    if isinstance(v, dict):
+        parts: List[str] = []
+        for val in v.values():
+            if isinstance(val, list):
+                parts.extend(str(x) for x in val if x)
+            elif isinstance(val, str):
+                parts.append(val)
+        return " ".join(parts)
+    return str(v or "")
+
+
+def _raw_field_texts(doc: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    ing = doc.get("ingredients")
+    ing_d = ing if isinstance(ing, dict) else {}
+    title = str(doc.get("title") or "")
+    tags = " ".join([_as_text(doc.get("tags")), _as_text(doc.get("chips"))])
+    ings = " ".join([
+        _as_text(doc.get("ingredients_full")),
+        _as_text(doc.get("ingredients_clean")),
+        _as_text(ing),
+        _as_text(ing_d.get("raw")),
+        _as_text(ing_d.get("norm_ko")),
+        _as_text(ing_d.get("norm_slug")),
+    ])
+    summ = str(doc.get("summary") or "")
+    return title, tags, ings, summ
+
+
+def card_field_texts(doc: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """카드 문서 → (제목, 태그+칩, 재료 전체, 요약) 텍스트. 압축 검색 필드가 있으면 그걸 사용."""
+    sf = doc.get("search_fields")
+    if isinstance(sf, list) and len(sf) == 4:
+        return str(sf[0] or ""), str(sf[1] or ""), str(sf[2] or ""), str(sf[3] or "")
+    return _raw_field_texts(doc)
+
+
+def has_full_fields(doc: Dict[str, Any]) -> bool:
+    return bool(doc.get("has_full") or doc.get("steps_full") or doc.get("ingredients_full"))
+
+
+def build_search_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    쓰기 시점에 카드에 저장할 검색용 역정규화 필드.
+    - search_fields: [제목, 태그+칩, 재료, 요약] 각각 소문자 단어 중복 제거 후 공백 연결
+      (수량/단위/중복 라인이 빠져 원문 재료 배열보다 훨씬 작다)
+    - has_full: 풀 필드 가점 여부 (점수화 단계에서 steps_full 등을 안 읽어도 되게)
+    - search_tokens: 정규화 재료 토큰 배열 (멀티키 인덱스로 $in/$all 후보 조회)
+    - ing_tokens: 재료 필드만의 정규화 토큰 (재료 커버리지 엔진용)
+    - vocab_version: 토큰을 만든 어휘 버전 (어휘가 바뀌면 재정규화 작업이 이 값으로 대상 선별)
+    """
+    fields = [
+        " ".join(dict.fromkeys(w.lower() for w in extract_words(text)))
+        for text in _raw_field_texts(doc)
+    ]
+    return {
+        "search_fields": fields,
+        "has_full": has_full_fields(doc),
+        "search_tokens": build_search_tokens(doc),
+        "ing_tokens": build_ingredient_tokens(doc),
+        "vocab_version": get_vocabulary().version,
+    }
+
+
+def card_terms(doc: Dict[str, Any]) -> Dict[str, int]:
+    """카드 문서 → {소문자 단어: 필드 비트마스크}."""
+    out: Dict[str, int] = {}
+    for bit, text in zip((F_TITLE, F_TAGS, F_INGS, F_SUMMARY), card_field_texts(doc)):
+        for w in extract_words(text):
+            w = w.lower()
+            out[w] = out.get(w, 0) | bit
+    return out
+
+
+def mask_score(mask: int) -> float:
+    s = 0.0
+    for bit, weight in FIELD_WEIGHTS:
+        if mask & bit:
+            s += weight
+    return s
+
+
+# 필드 마스크(4비트) → 점수 룩업 (top-k 루프의 임의 접근 점수화용)
+_MASK_SCORES: Tuple[float, ...] = tuple(mask_score(m) for m in range(1 << len(FIELD_WEIGHTS)))
+
+
+class CardIndex:
+    """
+    단어 → {카드 _id: 필드 비트마스크} 포스팅.
+    - 정방향(_fwd)도 같이 들고 있어 카드 갱신/삭제 시 기존 포스팅을 정확히 걷어낸다
+    - search()는 recommender._score와 같은 가중치로 AND 우선 정렬된 _id 목록을 돌려준다
+    """
+
+    def __init__(self) -> None:
+        self._post: Dict[str, Dict[Any, int]] = {}
+        self._fwd: Dict[Any, Dict[str, int]] = {}
+        self._full: Set[Any] = set()
+        self._expand_cache: Dict[str, Set[str]] = {}
+        self._tp_cache: "OrderedDict[str, TokenPostings]" = OrderedDict()
+        self._gen = 0               # 쓰기마다 증가 → 토큰 포스팅 캐시 무효화
+        self.ready = False
+        self.watermark: Optional[datetime] = None
+        self.last_sync = 0.0
+
+    def __len__(self) -> int:
+        return len(self._fwd)
+
+    # ---------- 쓰기 ----------
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        cid = doc.get("_id")
+        if cid is None:
+            return
+        self.remove(cid)
+        self._gen += 1
+        terms = card_terms(doc)
+        for w, mask in terms.items():
+            bucket = self._post.get(w)
+            if bucket is None:
+                bucket = self._post[w] = {}
+                self._on_new_word(w)
+            bucket[cid] = mask
+        self._fwd[cid] = terms
+        if has_full_fields(doc):
+            self._full.add(cid)
+        ts = doc.get("updated_at")
+        if isinstance(ts, datetime) and (self.watermark is None or ts > self.watermark):
+            self.watermark = ts
+
+    def remove(self, cid: Any) -> None:
+        terms = self._fwd.pop(cid, None)
+        self._full.discard(cid)
+        if not terms:
+            return
+        self._gen += 1
+        for w in terms:
+            bucket = self._post.get(w)
+            if bucket is None:
+                continue
+            bucket.pop(cid, None)
+            if not bucket:
+                del self._post[w]
+                for hits in self._expand_cache.values():
+                    hits.discard(w)
+
+    def _on_new_word(self, w: str) -> None:
+        # 캐시된 확장 결과에 새 어휘 반영 (캐시 크기만큼만 비용)
+        for t, hits in self._expand_cache.items():
+            if t in w:
+                hits.add(w)
+
+    # ---------- 읽기 ----------
+    def expand(self, token: str) -> Set[str]:
+        """질의 토큰을 포함하는 어휘 단어 집합(부분 문자열 매칭)."""
+        t = (token or "").strip().lower()
+        if not t:
+            return set()
+        hits = self._expand_cache.get(t)
+        if hits is None:
+            hits = {w for w in self._post if t in w}
+            if len(self._expand_cache) >= EXPAND_CACHE_MAX:
+                self._expand_cache.pop(next(iter(self._expand_cache)))
+            self._expand_cache[t] = hits
+        return hits
+
+    def token_masks(self, token: str) -> Dict[Any, int]:
+        """토큰 하나의 포스팅: {카드 _id: 등장 필드 마스크} (확장 단어들의 합집합)."""
+        out: Dict[Any, int] = {}
+        for w in self.expand(token):
+            for cid, mask in self._post.get(w, {}).items():
+                out[cid] = out.get(cid, 0) | mask
+        return out
+
+    def candidates(self, tokens: List[str]) -> Tuple[Set[Any], Set[Any]]:
+        """(AND 교집합, OR 합집합) 후보 _id."""
+        sets = [set(self.token_masks(t)) for t in tokens]
+        if not sets:
+            return set(), set()
+        must = set.intersection(*sorted(sets, key=len))
+        return must, set().union(*sets)
+
+    def token_postings(self, token: str) -> "TokenPostings":
+        """토큰 1개의 임팩트 정렬 포스팅 (인덱스 세대가 바뀌기 전까지 캐시)."""
+        t = (token or "").strip().lower()
+        tp = self._tp_cache.get(t)
+        if tp is not None and tp.gen == self._gen:
+            self._tp_cache.move_to_end(t)
+            return tp
+        tp = TokenPostings(self.token_masks(t), self._gen)
+        self._tp_cache[t] = tp
+        if len(self._tp_cache) > TOKEN_CACHE_MAX:
+            self._tp_cache.popitem(last=False)
+        return tp
+
+    def search(self, tokens: List[str], limit: int) -> List[Any]:
+        """
+        AND 우선 + 필드 가중 점수 상위 limit개 _id — 전체 후보 정렬 없이 조기 종료(top-k).
+        - AND 집합은 짧은 포스팅부터 키 교집합(C 레벨 set 연산)으로 먼저 확정
+        - 각 티어는 토큰별 임팩트 내림차순 포스팅을 라운드로빈으로 읽고(Threshold Algorithm),
+          처음 본 카드는 다른 토큰 포스팅을 임의 접근해 점수를 바로 확정
+        - 못 본 카드의 최대 점수 = 커서 임팩트 합 (+ 풀 필드 가점) 이 k번째 점수 이하면 중단
+          (커서가 낮은 임팩트 버킷으로 내려갈 때만 확인)
+        """
+        uniq = list(dict.fromkeys(t.strip().lower() for t in tokens if t and t.strip()))
+        if not uniq or limit <= 0:
+            return []
+        lists = [self.token_postings(t) for t in uniq]
+        if len(lists) == 1:
+            return self._threshold_topk(lists, limit, lambda cid: True)
+
+        by_len = sorted(lists, key=len)
+        and_ids = by_len[0].masks.keys()
+        for tp in by_len[1:]:
+            if not and_ids:
+                break
+            and_ids = and_ids & tp.masks.keys()
+        and_ids = set(and_ids)
+
+        # 1) AND 티어: 작으면 전부 점수화, 크면 AND 문서만 대상으로 조기 종료
+        #    (집합 순회 순서는 실행마다 달라지므로 동점은 _id 문자열 순으로 고정)
+        if len(and_ids) <= limit * 4:
+            top_and = sorted(((self._score_of(cid, lists), cid) for cid in and_ids),
+                             key=lambda x: (-x[0], str(x[1])))[:limit]
+            out = [cid for _, cid in top_and]
+        else:
+            out = self._threshold_topk(lists, limit, lambda cid: cid in and_ids)
+        room = limit - len(out)
+        if room <= 0:
+            return out
+
+        # 2) OR 티어 (AND 문서 제외) — AND 문서는 이미 전부 out에 있다
+        return out + self._threshold_topk(lists, room, lambda cid: cid not in and_ids)
+
+    def _score_of(self, cid: Any, lists: List["TokenPostings"]) -> float:
+        s = 0.0
+        for tp in lists:
+            s += _MASK_SCORES[tp.masks.get(cid, 0)]
+        return s + FULL_BONUS if cid in self._full else s
+
+    def _threshold_topk(self, lists: List["TokenPostings"], k: int, accept: Callable[[Any], bool]) -> List[Any]:
+        """
+        accept(cid)인 카드 중 점수 상위 k개.
+        - 임팩트 정렬 포스팅 라운드로빈 + 상한 기반 중단 (Threshold Algorithm)
+        - MaxScore: 긴 리스트부터, 남은 포스팅 상한(커서) 합(+가점)이 k번째 점수 이하인 리스트들은
+          "비필수"로 돌려 더 읽지 않는다 (그 토큰들만 가진 카드는 top-k에 못 들고,
+          필수 토큰이 있는 카드는 필수 리스트에서 만나 임의 접근으로 전체 점수를 받는다)
+        """
+        order = sorted(range(len(lists)), key=lambda i: len(lists[i]), reverse=True)
+        heap: List[Tuple[float, int, Any]] = []   # (점수, -순번, cid) 최소 힙
+        iters: List[Optional[Iterator[Tuple[float, Any]]]] = [tp.iter_impact() for tp in lists]
+        cursor = [tp.max_impact for tp in lists]
+        n_skip = 0                                 # order 앞쪽 n_skip개 = 비필수 리스트
+        skip_ub = 0.0
+        seen: Set[Any] = set()
+        seq = 0
+        live = len(iters)
+        while live:
+            live = 0
+            dropped = False
+            for i, it in enumerate(iters):
+                if it is None:
+                    continue
+                nxt = next(it, None)
+                if nxt is None:
+                    iters[i] = None
+                    cursor[i] = 0.0
+                    dropped = True
+                    continue
+                live += 1
+                impact, cid = nxt
+                if impact < cursor[i]:
+                    cursor[i] = impact
+                    dropped = True
+                if cid in seen or not accept(cid):
+                    continue
+                seen.add(cid)
+                seq += 1
+                item = (self._score_of(cid, lists), -seq, cid)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+                    dropped = True
+            if not dropped or len(heap) < k:
+                continue
+            theta = heap[0][0]
+            while n_skip < len(order) - 1:
+                j = order[n_skip]
+                if iters[j] is not None and skip_ub + cursor[j] + FULL_BONUS > theta:
+                    break
+                skip_ub += cursor[j] if iters[j] is not None else 0.0
+                iters[j] = None
+                n_skip += 1
+            ess = sum(cursor[j] for j in order[n_skip:] if iters[j] is not None)
+            if theta >= ess + skip_ub + FULL_BONUS:
+                break
+        return [cid for _, _, cid in sorted(heap, reverse=True)]
+
+
+class TokenPostings:
+    """
+    토큰 1개의 포스팅: 임의 접근용 {cid: 마스크} + 임팩트(필드 가중 점수) 내림차순 버킷.
+    마스크가 4비트라 임팩트 값은 최대 16종 → 정렬 없이 O(p) 버킷팅 (같은 점수 마스크는 한 버킷).
+    """
+
+    __slots__ = ("masks", "gen", "max_impact", "_buckets")
+
+    def __init__(self, masks: Dict[Any, int], gen: int) -> None:
+        self.masks = masks
+        self.gen = gen
+        by_impact: Dict[float, List[Any]] = {}
+        for cid, m in masks.items():
+            by_impact.setdefault(_MASK_SCORES[m], []).append(cid)
+        self._buckets = sorted(by_impact.items(), key=lambda b: b[0], reverse=True)
+        self.max_impact = self._buckets[0][0] if self._buckets else 0.0
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def iter_impact(self) -> Iterator[Tuple[float, Any]]:
+        for impact, ids in self._buckets:
+            for cid in ids:
+                yield impact, cid
+
+
+# ---------- 전역 인스턴스 + Mongo 연동 ----------
+_index = CardIndex()
+
+# 카드 변경(upsert/삭제)을 같이 받아야 하는 보조 인덱스 훅 (coverage 등)
+_listeners: List[Tuple[Callable[[Dict[str, Any]], None], Callable[[Any], None]]] = []
+
+
+def get_card_index() -> CardIndex:
+    return _index
+
+
+def add_card_listener(on_upsert: Callable[[Dict[str, Any]], None], on_remove: Callable[[Any], None]) -> None:
+    """refresh_cards/sync_card_index/삭제 감지 시 함께 호출될 콜백 등록."""
+    _listeners.append((on_upsert, on_remove))
+
+
+class BuildBuffer:
+    """
+    보조 인덱스(coverage/bm25/suggest/text) 재빌드 중에 리스너로 들어온 카드 변경 기록.
+    빌드 커서가 이미 지나간 카드가 바뀌거나 지워져도 교체 직후 replay() 로 새 인덱스에 반영된다.
+    사용: start() → 빌드 → (await 없이) 전역 교체 + replay(fresh), 실패하면 cancel()
+    """
+
+    def __init__(self) -> None:
+        self._events: Optional[List[Tuple[bool, Any]]] = None
+
+    def start(self) -> None:
+        self._events = []
+
+    def cancel(self) -> None:
+        self._events = None
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        if self._events is not None:
+            self._events.append((True, doc))
+
+    def remove(self, cid: Any) -> None:
+        if self._events is not None:
+            self._events.append((False, cid))
+
+    def replay(self, index: Any) -> int:
+        events, self._events = self._events or [], None
+        for is_upsert, x in events:
+            if is_upsert:
+                index.upsert(x)
+            else:
+                index.remove(x)
+        return len(events)
+
+
+# build_card_index 진행 중 앱 내부 쓰기/삭제 기록 (교체 직후 새 인덱스에 재생)
+_building = BuildBuffer()
+
+
+def _notify_upsert(doc: Dict[str, Any]) -> None:
+    for on_upsert, _ in _listeners:
+        on_upsert(doc)
+
+
+def notify_removed(cid: Any) -> None:
+    """외부에서 삭제된 카드를 역색인과 보조 인덱스에서 모두 제거."""
+    _index.remove(cid)
+    _building.remove(cid)
+    for _, on_remove in _listeners:
+        on_remove(cid)
+
+
+async def build_card_index(db, batch_size: int = 2000) -> CardIndex:
+    """recipe_cards 전체를 스트리밍으로 읽어 새 인덱스를 만든 뒤 원자적으로 교체."""
+    global _index
+    t0 = time.perf_counter()
+    started = datetime.utcnow()
+    fresh = CardIndex()
+    col = db["recipe_cards"]
+    _building.start()
+    try:
+        # search_fields 보유 카드는 압축 필드만, 미보유(구 문서)만 원문 필드를 읽는다
+        for q, proj in (
+            ({"search_fields": {"$exists": True}}, COMPACT_PROJECTION),
+            ({"search_fields": {"$exists": False}}, INDEX_PROJECTION),
+        ):
+            async for doc in col.find(q, proj).batch_size(batch_size):
+                fresh.upsert(doc)
+    except BaseException:
+        _building.cancel()
+        raise
+    # 빌드 도중 들어온 쓰기도 다음 sync에서 다시 읽히도록 시작 시각 이상으로 워터마크 고정
+    if fresh.watermark is None or fresh.watermark < started:
+        fresh.watermark = started
+    fresh.ready = True
+    fresh.last_sync = time.monotonic()
+    _index = fresh
+    # 빌드 중 refresh_cards/notify_removed 로 들어온 변경 (커서가 이미 지나간 카드도 최신으로)
+    # 재생은 워터마크를 옮기지 않는다 (빌드 중 외부 쓰기는 다음 sync 가 시작 시각부터 읽음)
+    wm = fresh.watermark
+    _building.replay(fresh)
+    fresh.watermark = wm
+    log.info("card index built: cards=%d words=%d (%.1f ms)",
+             len(fresh), len(fresh._post), (time.perf_counter() - t0) * 1000)
+    return fresh
+
+
+async def refresh_cards(db, ids: Iterable[Any]) -> None:
+    """앱 내부 쓰기 직후 호출: 해당 카드만 다시 읽어 반영(없어졌으면 제거)."""
+    idx = get_card_index()
+    ids = list(ids)
+    if not ids:
+        return
+    found = set()
+    async for doc in db["recipe_cards"].find({"_id": {"$in": ids}}, INDEX_PROJECTION):
+        idx.upsert(doc)
+        _building.upsert(doc)
+        _notify_upsert(doc)
+        found.add(doc["_id"])
+    for cid in ids:
+        if cid not in found:
+            notify_removed(cid)
+
+
+async def sync_card_index(db, force: bool = False) -> int:
+    """외부 프로세스가 쓴 카드(updated_at > 워터마크)를 주기적으로 반영. 반영 건수 반환."""
+    idx = get_card_index()
+    if not idx.ready:
+        return 0
+    now = time.monotonic()
+    if not force and now - idx.last_sync < SYNC_INTERVAL_SEC:
+        return 0
+    idx.last_sync = now
+    n = 0
+    cur = db["recipe_cards"].find({"updated_at": {"$gt": idx.watermark}}, INDEX_PROJECTION)
+    async for doc in cur:
+        idx.upsert(doc)
+        _notify_upsert(doc)
+        n += 1
+    if n:
+        # 외부 쓰기가 인덱스에 들어온 시점에 추천 캐시도 비움 (이전 인덱스 기준 결과 제거)
+        invalidate_reco_cache()
+    return n
@@ -0,0 +1,200 @@
+# app/services/crawl10000/coverage.py
+# 목적: "가진 재료로 뭘 만들 수 있나" — 재료 커버리지 랭킹 엔진 (NumPy 비트셋)
+# - 재료 어휘 → 정수 id, 카드 1장 = 재료 집합을 uint64 비트셋 1행으로 패킹한 행렬
+# - 질의 비트셋과 전체 행렬을 한 번에 AND + popcount → 보유 재료 수(have)
+#   (질의 비트가 있는 워드 열만 잘라서 계산)
+#   coverage = have / 카드 재료 수, missing = 카드 재료 수 - have
+# - 정렬: coverage ↓, missing ↑, have ↓ (전체 코퍼스 대상, 샘플 컷 없음)
+# - 카드 변경은 card_index 리스너(refresh_cards/sync_card_index)로 증분 반영
+
+from __future__ import annotations
+import time
+import logging
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.services.crawl10000.card_index import BuildBuffer, add_card_listener
+from app.services.crawl10000.seed_ing import build_ingredient_tokens
+
+log = logging.getLogger(__name__)
+
+# 커버리지 빌드에 필요한 필드 (ing_tokens 없는 구 문서는 원문 재료로 계산)
+COVERAGE_PROJECTION = {
+    "_id": 1, "ing_tokens": 1,
+    "ingredients": 1, "ingredients_full": 1, "ingredients_clean": 1,
+    "variants.key_ingredients": 1,
+}
+
+_ROW_CHUNK = 1024      # 행 용량 증가 단위
+
+# numpy>=2.0 은 bitwise_count(popcount) 제공, 없으면 바이트 룩업 테이블로 폴백
+_POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_rows(m: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(m).sum(axis=1, dtype=np.int32)
+    return _POP8[m.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+def ingredient_tokens_of(doc: Dict[str, Any]) -> List[str]:
+    toks = doc.get("ing_tokens")
+    if isinstance(toks, list):
+        return [str(t) for t in toks if t]
+    return build_ingredient_tokens(doc)
+
+
+class CoverageIndex:
+    """
+    카드 재료 비트셋 행렬.
+    - _bits: (행 용량, 워드 수) uint64, 어휘가 64의 배수를 넘으면 열(워드)을 늘린다
+    - _sizes: 행별 재료 수, _alive: 삭제/빈 행 마스크
+    """
+
+    def __init__(self) -> None:
+        self.vocab: Dict[str, int] = {}
+        self._ids: List[Any] = []
+        self._row: Dict[Any, int] = {}
+        self._free: List[int] = []
+        self._bits = np.zeros((0, 1), dtype=np.uint64)
+        self._sizes = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    # ---------- 쓰기 ----------
+    def _word_id(self, tok: str) -> int:
+        wid = self.vocab.get(tok)
+        if wid is None:
+            wid = self.vocab[tok] = len(self.vocab)
+            need = wid // 64 + 1
+            if need > self._bits.shape[1]:
+                grow = np.zeros((self._bits.shape[0], need * 2 - self._bits.shape[1]), dtype=np.uint64)
+                self._bits = np.hstack([self._bits, grow])
+        return wid
+
+    def _alloc_row(self, cid: Any) -> int:
+        if self._free:
+            r = self._free.pop()
+            self._ids[r] = cid
+            return r
+        r = len(self._ids)
+        self._ids.append(cid)
+        if r >= self._bits.shape[0]:
+            extra = max(_ROW_CHUNK, self._bits.shape[0])
+            self._bits = np.vstack([self._bits, np.zeros((extra, self._bits.shape[1]), dtype=np.uint64)])
+            self._sizes = np.concatenate([self._sizes, np.zeros(extra, dtype=np.int32)])
+            self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        return r
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        cid = doc.get("_id")
+        if cid is None:
+            return
+        toks = set(ingredient_tokens_of(doc))
+        if not toks:
+            self.remove(cid)
+            return
+        wids = [self._word_id(t) for t in toks]
+        r = self._row.get(cid)
+        if r is None:
+            r = self._row[cid] = self._alloc_row(cid)
+        row = np.zeros(self._bits.shape[1], dtype=np.uint64)
+        for w in wids:
+            row[w >> 6] |= np.uint64(1) << np.uint64(w & 63)
+        self._bits[r] = row
+        self._sizes[r] = len(wids)
+        self._alive[r] = True
+
+    def remove(self, cid: Any) -> None:
+        r = self._row.pop(cid, None)
+        if r is None:
+            return
+        self._bits[r] = 0
+        self._sizes[r] = 0
+        self._alive[r] = False
+        self._ids[r] = None
+        self._free.append(r)
+
+    # ---------- 읽기 ----------
+    def query_bits(self, tokens: List[str]) -> Tuple[np.ndarray, int]:
+        """질의 토큰 → (비트셋, 어휘에 있는 토큰 수)."""
+        q = np.zeros(self._bits.shape[1], dtype=np.uint64)
+        known = 0
+        for t in dict.fromkeys(t.strip().lower() for t in tokens if t and t.strip()):
+            w = self.vocab.get(t)
+            if w is not None:
+                q[w >> 6] |= np.uint64(1) << np.uint64(w & 63)
+                known += 1
+        return q, known
+
+    def score(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """전체 행 (have, sizes) — 벡터화 AND + popcount."""
+        q, known = self.query_bits(tokens)
+        n = len(self._ids)
+        if not known or not n:
+            return np.zeros(n, dtype=np.int32), self._sizes[:n]
+        # 질의 비트가 있는 워드(열)만 AND + popcount (토큰 수 ≤ 열 수라 행렬 전체를 안 훑음)
+        cols = np.flatnonzero(q)
+        have = _popcount_rows(self._bits[:n, cols] & q[cols])
+        return have, self._sizes[:n]
+
+    def search(self, tokens: List[str], limit: int) -> List[Tuple[Any, int, int]]:
+        """상위 limit개 (카드 _id, have, missing)."""
+        have, sizes = self.score(tokens)
+        rows = np.flatnonzero((have > 0) & self._alive[: len(have)])
+        if not rows.size:
+            return []
+        h = have[rows]
+        sz = sizes[rows]
+        missing = sz - h
+        cov = h / sz
+        order = np.lexsort((-h, missing, -cov))[:limit]
+        return [(self._ids[rows[i]], int(h[i]), int(missing[i])) for i in order]
+
+
+# ---------- 전역 인스턴스 + Mongo 연동 ----------
+_coverage = CoverageIndex()
+_building = BuildBuffer()
+
+
+def get_coverage_index() -> CoverageIndex:
+    return _coverage
+
+
+async def build_coverage_index(db, batch_size: int = 2000) -> CoverageIndex:
+    """recipe_cards 전체 재료 비트셋 행렬을 만든 뒤 원자적으로 교체."""
+    global _coverage
+    t0 = time.perf_counter()
+    fresh = CoverageIndex()
+    _building.start()
+    try:
+        async for doc in db["recipe_cards"].find({}, COVERAGE_PROJECTION).batch_size(batch_size):
+            fresh.upsert(doc)
+    except BaseException:
+        _building.cancel()
+        raise
+    fresh.ready = True
+    _coverage = fresh
+    _building.replay(fresh)
+    log.info("coverage index built: cards=%d vocab=%d (%.1f ms)",
+             len(fresh), len(fresh.vocab), (time.perf_counter() - t0) * 1000)
+    return fresh
+
+
+# card_index 증분 갱신 경로에 연결 (빌드 중 변경은 _building 에 모았다가 교체 직후 새 인덱스에 재생)
+def _on_upsert(doc: Dict[str, Any]) -> None:
+    _building.upsert(doc)
+    if _coverage.ready:
+        _coverage.upsert(doc)
+
+
+def _on_remove(cid: Any) -> None:
+    _building.remove(cid)
+    _coverage.remove(cid)
+
+
+add_card_listener(_on_upsert, _on_remove)
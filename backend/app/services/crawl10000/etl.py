@@ -1,35 +1,16 @@
 # 목적: (1) 재료 문자열 → 토큰(slug) 정규화, (2) Mongo 업서트, (3) 인덱스 생성
 # 특징: 토큰 규칙이 단순해도 시드가 넓으면 교집합 매칭은 충분히 동작
-# 확장: _KOR2SLUG 사전 확장 / 동의어 테이블을 컬렉션으로 분리 가능
+# 확장: slug/동의어 사전은 ingredient_vocab 컬렉션 (crawl10000/vocab.py)
 
 import re
 from typing import Dict, List, Optional, Set
 from motor.motor_asyncio import AsyncIOMotorCollection
 
-# 기본 매핑(초기 커버) — 부족하면 점진적으로 확장
-_KOR2SLUG = {
-    "삼겹살": "porkbelly", "돼지고기": "pork", "감자": "potato", "양파": "onion",
-    "대파": "scallion", "파": "scallion", "마늘": "garlic", "소금": "salt",
-    "후추": "pepper", "설탕": "sugar", "간장": "soy_sauce", "식용유": "oil",
-    "버터": "butter", "닭가슴살": "chickenbreast", "닭고기": "chicken",
-    "달걀": "egg", "계란": "egg", "고추장": "gochujang", "된장": "doenjang",
-    "김치": "kimchi", "두부": "tofu", "파프리카": "bellpepper",
-    "고구마": "sweetpotato", "당근": "carrot", "오이": "cucumber",
-    "브로콜리": "broccoli", "가지": "eggplant", "버섯": "mushroom",
-}
+from app.services.crawl10000.vocab import get_vocabulary
 
 def kor_to_slug(token: str) -> Optional[str]:
-    # 한글/영문 토큰을 내부 slug로 통일
-    token = (token or "").strip()
-    if not token:
-        return None
-    if token in _KOR2SLUG:
-        return _KOR2SLUG[token]
-    if re.fullmatch(r"[a-zA-Z_]+", token):
-        return token.lower()
-    # 공백/기호 제거 후 재매핑 시도
-    t = re.sub(r"[\s·,()/\[\]-]+", "", token)
-    return _KOR2SLUG.get(t) or None
+    # 한글/영문 토큰을 내부 slug로 통일 (사전: ingredient_vocab, seed_ing 과 공용)
+    return get_vocabulary().slug(token)
 
 def extract_ingredient_tokens(line: str) -> List[str]:
     # 양파(다진 것) 100g' → ['양파', '다진', ...] 같은 형태로 토큰 후보 추출
@@ -72,6 +53,7 @@ async def upsert_recipe(recipes: AsyncIOMotorCollection, doc: Dict) -> str:
         "image": doc.get("image") or "",
         "tags": doc.get("tags") or [],
         "ingredients": {"raw": doc.get("ingredients_raw") or [], "norm": norm},
+        "vocab_version": get_vocabulary().version,
     }
     res = await recipes.update_one({"url": doc["url"]}, {"$set": payload}, upsert=True)
     rid = res.upserted_id
@@ -0,0 +1,239 @@
+# app/services/crawl10000/fuzzy.py
+# 목적: 오탈자/표기 변형에 강한 재료 토큰 보정 (모차렐라 → 모짜렐라, "닭 가슴살" → 닭가슴살, brocoli → 브로콜리)
+# - 대상 어휘: ingredient_vocab(동의어/표준 라벨) + 코퍼스 재료 토큰(coverage 인덱스 어휘)
+# - 한글은 자모로 풀어서(모짜 → ㅁㅗㅉㅏ) 편집 거리를 잰다 → 받침/쌍자음 하나 차이가 거리 1
+# - 자모 bigram 역색인으로 후보를 추리고(q-gram 개수 필터: 거리 k 이내면 공유 bigram ≥ (n+1) - 2k)
+#   후보만 상한 있는 Levenshtein 으로 확인 → 어휘 수천 개에서도 조회 1건 수십~수백 µs, 결과는 LRU 메모
+# - 허용 거리는 자모 길이로: 5 미만 0(보정 안 함) / 10 미만 1 / 그 이상 2
+#   같은 거리 후보가 여럿이면 큐레이션 어휘 우선, 그다음 코퍼스 빈도. 그래도 동률이면 보정하지 않음
+# - 이미 아는 토큰(어휘에 있거나 카드 역색인에서 부분 문자열로 걸리는 토큰)은 건드리지 않는다
+# - 어휘 버전/코퍼스 어휘가 바뀌면 다음 조회 때 다시 만들거나(버전) 새 단어만 추가(코퍼스)
+
+from __future__ import annotations
+import itertools
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.tags import extract_words
+from app.services.crawl10000.card_index import get_card_index
+from app.services.crawl10000.coverage import get_coverage_index
+from app.services.crawl10000.vocab import get_vocabulary
+
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+_RX_SEP = re.compile(r"[\s·\-_/]+")
+
+CURATED = float("inf")    # 큐레이션 어휘 가중치 (코퍼스 빈도보다 항상 우선)
+LOOKUP_CACHE = 8192
+
+
+def to_jamo(s: str) -> str:
+    """한글 음절 → 초/중/종성 자모열, 그 외 문자는 소문자 그대로."""
+    out: List[str] = []
+    for ch in s:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            out.append(_JUNG[(code % 588) // 28])
+            if code % 28:
+                out.append(_JONG[code % 28])
+        else:
+            out.append(ch.lower())
+    return "".join(out)
+
+
+def to_chosung(s: str) -> str:
+    """한글 음절 → 초성 (두부 → ㄷㅂ), 그 외 문자는 소문자 그대로."""
+    out: List[str] = []
+    for ch in s:
+        code = ord(ch) - 0xAC00
+        out.append(_CHO[code // 588] if 0 <= code < 11172 else ch.lower())
+    return "".join(out)
+
+
+def is_chosung(ch: str) -> bool:
+    return len(ch) == 1 and ch in _CHO
+
+
+def compact(s: str) -> str:
+    # 띄어쓰기/구분 기호 차이 무시
+    return _RX_SEP.sub("", (s or "").strip().lower())
+
+
+def max_distance(n: int) -> int:
+    return 0 if n < 5 else 1 if n < 10 else 2
+
+
+def _grams(j: str) -> List[str]:
+    p = f"^{j}$"
+    return [p[i:i + 2] for i in range(len(p) - 1)]
+
+
+def _levenshtein(a: str, b: str, k: int) -> int:
+    """편집 거리 (k 를 넘으면 k+1 로 조기 종료)."""
+    if abs(len(a) - len(b)) > k:
+        return k + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        best = i
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if cur[j] < best:
+                best = cur[j]
+        if best > k:
+            return k + 1
+        prev = cur
+    return prev[-1]
+
+
+class FuzzyIndex:
+    """어휘(표기 → (표준 토큰, 가중치))의 자모 bigram 역색인."""
+
+    def __init__(self) -> None:
+        self.terms: Dict[str, Tuple[str, float]] = {}
+        self._jamo: List[str] = []
+        self._keys: List[str] = []
+        self._post: Dict[str, List[int]] = {}
+        self.lookup = lru_cache(maxsize=LOOKUP_CACHE)(self._lookup)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def add(self, surface: str, canon: str, weight: float) -> None:
+        key = compact(surface)
+        if not key or not canon:
+            return
+        old = self.terms.get(key)
+        if old is not None:
+            if old[1] < weight:
+                self.terms[key] = (canon, weight)
+            return
+        self.terms[key] = (canon, weight)
+        i = len(self._keys)
+        j = to_jamo(key)
+        self._keys.append(key)
+        self._jamo.append(j)
+        for g in set(_grams(j)):
+            self._post.setdefault(g, []).append(i)
+        self.lookup.cache_clear()
+
+    def exact(self, surface: str) -> Optional[str]:
+        hit = self.terms.get(compact(surface))
+        return hit[0] if hit else None
+
+    def _lookup(self, token: str) -> Optional[Tuple[str, int]]:
+        """모르는 토큰 → (표준 토큰, 거리). 보정할 후보가 없거나 애매하면 None."""
+        key = compact(token)
+        hit = self.terms.get(key)
+        if hit is not None:
+            return hit[0], 0
+        j = to_jamo(key)
+        k = max_distance(len(j))
+        if k == 0:
+            return None
+        grams = set(_grams(j))
+        need = len(j) + 1 - 2 * k
+        counts: Dict[int, int] = {}
+        for g in grams:
+            for i in self._post.get(g, ()):
+                counts[i] = counts.get(i, 0) + 1
+        best: List[Tuple[int, float, str]] = []
+        for i, c in counts.items():
+            if c < need:
+                continue
+            d = _levenshtein(j, self._jamo[i], k)
+            if d <= k:
+                canon, w = self.terms[self._keys[i]]
+                best.append((d, -w, canon))
+        if not best:
+            return None
+        best.sort()
+        d, w, canon = best[0]
+        if any(b[0] == d and b[1] == w and b[2] != canon for b in best[1:]):
+            return None   # 같은 거리/가중치의 서로 다른 후보 → 추측하지 않음
+        return canon, d
+
+
+# ---------- 전역 인스턴스 (어휘 버전/코퍼스 어휘 변화 감지) ----------
+_fuzzy = FuzzyIndex()
+_state: Dict[str, Any] = {"vocab": None, "coverage": None, "n_corpus": 0}
+
+
+def _df(word: str) -> float:
+    # 코퍼스 빈도 (동률 깨기용) — 카드 역색인 포스팅 크기
+    return float(len(get_card_index()._post.get(word, ())))
+
+
+def get_fuzzy_index() -> FuzzyIndex:
+    global _fuzzy
+    vocab = get_vocabulary()
+    cov = get_coverage_index()
+    if _state["vocab"] is not vocab or _state["coverage"] is not cov:
+        fresh = FuzzyIndex()
+        for term in vocab.entries:
+            canon = vocab.normalizer.canonicalize(term)
+            if canon:
+                fresh.add(term, canon, CURATED)
+        for label in vocab.labels:
+            fresh.add(label, label, CURATED)
+        _fuzzy = fresh
+        _state.update(vocab=vocab, coverage=cov, n_corpus=0)
+    # coverage 어휘는 늘기만 하고 id 순서로 쌓이므로 새로 생긴 단어만 추가
+    n = len(cov.vocab)
+    if n > _state["n_corpus"]:
+        for w in itertools.islice(cov.vocab, _state["n_corpus"], None):
+            if not vocab.is_stop(w):
+                _fuzzy.add(w, w, _df(w))
+        _state["n_corpus"] = n
+    return _fuzzy
+
+
+def _known(fz: FuzzyIndex, token: str) -> bool:
+    if compact(token) in fz.terms:
+        return True
+    idx = get_card_index()
+    return bool(idx.ready and idx.expand(token))
+
+
+def correct_tokens(raws: List[str]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    normalize_ingredients_ko 와 같은 토큰 목록을 만들되, 모르는 토큰은 가장 가까운 어휘로 보정.
+    반환: (토큰, 보정 내역 [{"from", "to", "distance"}]) — 보정이 없으면 normalize_ingredients_ko 결과와 같다.
+    """
+    vocab = get_vocabulary()
+    fz = get_fuzzy_index()
+    out: List[str] = []
+    fixes: List[Dict[str, Any]] = []
+
+    def _add(t: str) -> None:
+        if t not in out:
+            out.append(t)
+
+    for raw in raws or []:
+        raw = str(raw or "")
+        # 띄어쓰기 변형: "닭 가슴살" 전체가 어휘 표기와 같으면 단어로 쪼개기 전에 확정
+        if compact(raw) != raw.strip().lower():
+            hit = fz.exact(raw)
+            if hit:
+                # 정규화기도 같은 결과를 내는 동의어("sweet potato" → 고구마)는 보정 내역에 넣지 않음
+                if vocab.normalizer.normalize([raw]) != [hit]:
+                    fixes.append({"from": raw.strip(), "to": hit, "distance": 0})
+                _add(hit)
+                continue
+        for w in extract_words(raw):
+            canon = vocab.normalizer.canonicalize(w)
+            if canon is None and vocab.is_stop(w):
+                continue
+            if canon is not None and _known(fz, canon):
+                _add(canon)
+                continue
+            m = fz.lookup(canon or w)
+            if m is not None and m[1] > 0:
+                fixes.append({"from": canon or w, "to": m[0], "distance": m[1]})
+                _add(m[0])
+            elif canon is not None:
+                _add(canon)
+    return out, fixes
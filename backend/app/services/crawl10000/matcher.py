@@ -0,0 +1,69 @@
+# app/services/crawl10000/matcher.py
+# 목적: 요청당 1회 컴파일하는 다중 토큰 매처 (필드 텍스트 1회 스캔 → 등장 토큰 비트마스크)
+# - pyahocorasick(C 구현 Aho-Corasick)이 있으면 사용
+# - 없으면 전방탐색 정규식 (?=(t1|t2|...)) 하나로 폴백: 위치마다 겹치는 매치까지 한 번에 잡는다
+#   같은 위치에서 시작하는 더 짧은 토큰은 긴 토큰의 접두사이므로 prefix 마스크로 보정
+# 결과는 두 경로 모두 "토큰이 (대소문자 무시) 부분 문자열로 등장하는가"와 동일
+
+from __future__ import annotations
+import re
+from typing import Dict, List
+
+try:
+    import ahocorasick  # pyahocorasick
+    _HAS_PYAC = True
+except Exception:
+    _HAS_PYAC = False
+
+
+class TokenMatcher:
+    """
+    토큰 목록 → 단일 패스 매처.
+    - scan(text): 등장한 토큰 인덱스의 비트마스크 (bit i = tokens[i])
+    - full: 모든 토큰 비트가 켜진 마스크 (AND 판정용)
+    """
+
+    def __init__(self, tokens: List[str]) -> None:
+        self.tokens = [t.strip().lower() for t in tokens if t and t.strip()]
+        self.full = (1 << len(self.tokens)) - 1
+
+        # 같은 토큰이 중복 입력돼도 비트는 모두 켠다
+        bits: Dict[str, int] = {}
+        for i, t in enumerate(self.tokens):
+            bits[t] = bits.get(t, 0) | (1 << i)
+
+        self._ac = None
+        self._rx = None
+        if not bits:
+            return
+        if _HAS_PYAC:
+            ac = ahocorasick.Automaton()
+            for t, b in bits.items():
+                ac.add_word(t, b)
+            ac.make_automaton()
+            self._ac = ac
+        else:
+            longest_first = sorted(bits, key=len, reverse=True)
+            self._rx = re.compile("(?=(" + "|".join(re.escape(t) for t in longest_first) + "))")
+            # 매치된 토큰 → 같은 위치에서 함께 매치되는 접두사 토큰들까지 포함한 마스크
+            self._prefix = {
+                t: sum(b for u, b in bits.items() if t.startswith(u)) for t in longest_first
+            }
+
+    def scan(self, text: str) -> int:
+        if not text:
+            return 0
+        text = text.lower()
+        m = 0
+        if self._ac is not None:
+            for _, b in self._ac.iter(text):
+                m |= b
+                if m == self.full:
+                    break
+        elif self._rx is not None:
+            prefix = self._prefix
+            for mo in self._rx.finditer(text):
+                m |= prefix[mo.group(1)]
+                if m == self.full:
+                    break
+        return m
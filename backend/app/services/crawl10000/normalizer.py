@@ -0,0 +1,111 @@
+# app/services/crawl10000/normalizer.py
+# 목적: normalize_ingredients_ko 의 컴파일된 정규화 엔진 (크롤 적재/백필/요청마다 같은 단어를 반복 처리)
+# - 동의어 사전(정확 일치) + _CANON_REGEX 변형 + "그대로 한글 단어" 규칙을 정규식 하나로 합침
+#   · 동의어: ^(?:syn1|syn2|...)\Z
+#   · 변형:   (?=.*?(pattern_i)) 를 목록 순서대로 이어 붙임 → 단어 어디에 있든 "목록에서 먼저 나온 패턴"이 이김
+#   · 한글:   [가-힣]+\Z
+#   match() 1회에서 처음 성공한 분기(lastgroup)가 라벨을 정한다 — canonicalize_token_ko 와 결과 동일
+# - 단어 → 라벨, 줄 → 토큰 튜플 결과를 크기 제한 LRU(functools.lru_cache)로 메모
+#   ("소금 약간", "양파 1개" 같은 줄은 크롤 데이터에 수없이 반복됨)
+# - 배치 API: normalize_lines(줄 목록) → 줄별 토큰, normalize(줄 목록) → 중복 제거된 전체 토큰
+# - 현재 어휘 버전의 인스턴스는 vocab.get_vocabulary().normalizer (어휘 교체 시 새로 컴파일)
+# 벤치: python -m app.scripts.bench_normalize
+
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Set, Tuple
+
+from app.core.config import settings
+from app.models.tags import _CANON_REGEX, _CANON_SYNONYMS, EN_STOP, KOREAN_STOP, RX_WORD
+
+WORD_CACHE = int(getattr(settings, "NORMALIZE_WORD_CACHE", 50000) or 0)
+LINE_CACHE = int(getattr(settings, "NORMALIZE_LINE_CACHE", 20000) or 0)
+
+
+def _compile(synonyms: Dict[str, str], variants: Sequence[Tuple[Pattern[str], str]]) -> Tuple[Pattern[str], Dict[str, str]]:
+    """(동의어, 변형 정규식) → (결합 정규식, 그룹명 → 라벨). 동의어 분기는 사전에서 라벨을 찾는다."""
+    branches: List[str] = []
+    labels: Dict[str, str] = {}
+    if synonyms:
+        alts = sorted(synonyms, key=len, reverse=True)
+        branches.append("(?P<syn>(?-i:" + "|".join(re.escape(s) for s in alts) + r"))\Z")
+    for i, (rx, label) in enumerate(variants):
+        # 이름 있는 그룹으로 감싸 안쪽 그룹과 구분, 대소문자 플래그는 원래 패턴 것을 분기에만 적용
+        flag = "i" if rx.flags & re.I else "-i"
+        branches.append(f"(?=.*?(?P<v{i}>(?{flag}:{rx.pattern})))")
+        labels[f"v{i}"] = label
+    branches.append(r"(?P<ko>[가-힣]+)\Z")
+    return re.compile("|".join(branches), re.S), labels
+
+
+class IngredientNormalizer:
+    """동의어/변형/불용어 → 컴파일된 정규화기. 어휘가 바뀌면 새로 만든다 (캐시도 함께 비워짐)."""
+
+    def __init__(
+        self,
+        synonyms: Optional[Dict[str, str]] = None,
+        variants: Optional[Sequence[Tuple[Pattern[str], str]]] = None,
+        stop: Optional[Iterable[str]] = None,
+        word_cache: int = WORD_CACHE,
+        line_cache: int = LINE_CACHE,
+    ) -> None:
+        self.synonyms = dict(_CANON_SYNONYMS if synonyms is None else synonyms)
+        self.variants = list(_CANON_REGEX if variants is None else variants)
+        self.stop: Set[str] = set(KOREAN_STOP | EN_STOP if stop is None else stop)
+        self._rx, self._labels = _compile(self.synonyms, self.variants)
+        self._word = lru_cache(maxsize=word_cache)(self._canon)
+        self._line = lru_cache(maxsize=line_cache)(self._tokens)
+
+    # ---------- 단어 ----------
+    def _canon(self, word: str) -> Optional[str]:
+        # canonicalize_token_ko + 불용어 제외 (normalize_ingredients_ko 에서 쓰는 그대로)
+        s = word.strip().lower()
+        if not s:
+            return None
+        m = self._rx.match(s)
+        if m is None:
+            return None
+        g = m.lastgroup
+        if g == "syn":
+            label = self.synonyms[s]
+        elif g == "ko":
+            label = s if s not in self.stop else None
+        else:
+            label = self._labels[g]
+        if not label or label.strip().lower() in self.stop:
+            return None
+        return label
+
+    def canonicalize(self, word: str) -> Optional[str]:
+        return self._word(word or "")
+
+    # ---------- 줄 ----------
+    def _tokens(self, line: str) -> Tuple[str, ...]:
+        out: List[str] = []
+        for m in RX_WORD.finditer(line):
+            canon = self._word(m.group(0).strip())
+            if canon and canon not in out:
+                out.append(canon)
+        return tuple(out)
+
+    def line_tokens(self, line: str) -> Tuple[str, ...]:
+        return self._line(line or "")
+
+    def normalize_lines(self, lines: Iterable[str]) -> List[List[str]]:
+        """배치: 줄마다 정규화 토큰 (줄 안에서만 중복 제거, 순서 유지)."""
+        return [list(self._line(line or "")) for line in lines or []]
+
+    def normalize(self, lines: Iterable[str]) -> List[str]:
+        """normalize_ingredients_ko 와 같은 결과: 모든 줄의 토큰을 처음 나온 순서대로 중복 없이."""
+        seen: Set[str] = set()
+        out: List[str] = []
+        for line in lines or []:
+            for t in self._line(line or ""):
+                if t not in seen:
+                    seen.add(t)
+                    out.append(t)
+        return out
+
+    def cache_info(self) -> Dict[str, Dict[str, int]]:
+        return {name: fn.cache_info()._asdict() for name, fn in (("word", self._word), ("line", self._line))}
@@ -0,0 +1,131 @@
+# app/services/crawl10000/reco_cache.py
+# 목적: hybrid_recommend 결과 캐시 (LRU + TTL, 프로세스 메모리)
+# - 키: (정렬된 정규화 토큰 튜플, limit, ranking) → 같은 재료 조합이면 입력 순서와 무관하게 적중
+# - 상한(maxsize) 초과 시 가장 오래 안 쓴 항목부터 제거, TTL 지나면 만료
+# - 무효화
+#   · 앱 내부 쓰기(get_card_full 백필): 랭킹 입력이 안 바뀌는 파생 필드라 비우지 않음.
+#     note_internal_write(updated_at) 로 감지 서명만 옮겨 외부 쓰기로 오인하지 않게 함
+#   · 외부 프로세스(seed/backfill 스크립트): 카드의 updated_at 최댓값 + 문서 수 변화를
+#     CACHE_POLL_SEC 간격으로 확인(updated_at 인덱스 1건 조회)해서 바뀌었으면 비움
+#     (hybrid_recommend 가 이때 sync_card_index(force=True) 로 인덱스도 바로 따라잡음)
+#   · sync_card_index 가 1건 이상 반영하면 invalidate_reco_cache()
+
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+CACHE_MAX = int(getattr(settings, "RECO_CACHE_MAX", 1024) or 0)
+CACHE_TTL_SEC = float(getattr(settings, "RECO_CACHE_TTL", 300.0) or 300.0)
+CACHE_POLL_SEC = 5.0        # 외부 쓰기 감지 주기
+
+
+class RecoCache:
+    """LRU + TTL 캐시. get/put 모두 O(1), 적중/미스/제거 카운터 보유."""
+
+    def __init__(self, maxsize: int = CACHE_MAX, ttl: float = CACHE_TTL_SEC) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._sig: Optional[Tuple[Any, int]] = None
+        self._last_poll = 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        if self._data:
+            self.invalidations += 1
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_sec": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def note_internal_write(self, updated_at: Any) -> None:
+        """캐시를 비울 필요 없는 앱 내부 쓰기의 updated_at 을 감지 서명에 반영."""
+        if self._sig is None or not isinstance(updated_at, datetime):
+            return
+        # Mongo 는 ms 단위로 저장하므로 다시 읽었을 때와 같은 값으로 맞춤
+        ts = updated_at.replace(microsecond=updated_at.microsecond // 1000 * 1000)
+        latest, count = self._sig
+        if latest is None or ts > latest:
+            self._sig = (ts, count)
+
+    async def check_external_writes(self, db, force: bool = False) -> bool:
+        """recipe_cards가 외부에서 바뀌었으면 캐시를 비우고 True."""
+        now = time.monotonic()
+        if not force and now - self._last_poll < CACHE_POLL_SEC:
+            return False
+        self._last_poll = now
+        col = db["recipe_cards"]
+        latest = await col.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", -1)])
+        count = await col.estimated_document_count()
+        sig = ((latest or {}).get("updated_at"), count)
+        changed = self._sig is not None and sig != self._sig
+        self._sig = sig
+        if changed:
+            self.clear()
+        return changed
+
+
+def cache_key(tokens: Iterable[str], limit: int, ranking: str) -> Tuple[Tuple[str, ...], int, str]:
+    """정규화 토큰 집합(정렬) + limit + ranking."""
+    toks = tuple(sorted({t.strip().lower() for t in tokens if t and t.strip()}))
+    return toks, int(limit), ranking
+
+
+_cache = RecoCache()
+
+
+def get_reco_cache() -> RecoCache:
+    return _cache
+
+
+def invalidate_reco_cache() -> None:
+    """카드 쓰기 직후 호출."""
+    _cache.clear()
+
+
+def cached_copy(value: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # 호출부가 리스트를 조작해도 캐시 원본이 바뀌지 않게 얕은 복사
+    return [dict(d) for d in value]
@@ -1,108 +1,115 @@
 # app/services/crawl10000/recommender.py
 from __future__ import annotations
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Optional, Set, Tuple
 import motor.motor_asyncio
 
+from app.services.crawl10000.card_index import (
+    COMPACT_PROJECTION, FIELD_WEIGHTS, FULL_BONUS, INDEX_PROJECTION,
+    card_field_texts, get_card_index, has_full_fields, notify_removed, sync_card_index,
+)
+from app.services.crawl10000.bm25 import get_bm25_index
+from app.services.crawl10000.coverage import get_coverage_index
+from app.services.crawl10000.matcher import TokenMatcher
+from app.services.crawl10000.reco_cache import cache_key, cached_copy, get_reco_cache
+
 # -----------------------------------------------------------------------------
-# 하이브리드 추천 (정규화된 재료 토큰 기반 정규식 매칭 + AND 우선 재정렬)
+# 하이브리드 추천 (정규화된 재료 토큰 기반 후보 조회 + 필드 가중 점수 + AND 우선 재정렬)
 # - 입력 토큰이 실제로 등장하는 카드만 반환
 # - 배열/문서 혼합 스키마(ingredients가 list 또는 dict) 모두 지원
 # - 제목/태그/칩/재료/요약에 대한 매칭 개수를 점수로 환산해 정렬
 # - "모든 토큰이 등장(AND)" 문서를 먼저, 그 외(OR 매칭)는 보충으로 뒤에 배치
+# - 인메모리 역색인(card_index)이 준비되면 후보/랭킹은 인덱스에서, Mongo는 상위 limit개만 조회
+# - 폴백은 search_tokens 멀티키 인덱스($all → $in) 후보 + 2단계 조회
+#   (1) _id + 압축 검색 필드로 점수화 (2) 상위 limit개만 표시 필드로 $in 조회
+# - ranking="agg": 커버리지/가중 점수/정렬/컷을 Mongo 집계 파이프라인에서 처리 (최종 limit개만 전송)
+# - ranking="coverage": 재료 비트셋 행렬(coverage.py)로 전체 카드의 보유 재료 비율/부족 재료 수 랭킹
+# - ranking="bm25": IDF + 필드 길이 정규화(BM25F) 점수, CSR 포스팅(bm25.py)에서 상위 limit개
+# - 결과는 reco_cache(LRU+TTL)에 (토큰 집합, limit, 엔진) 키로 캐시, 카드 쓰기 시 무효화
 # -----------------------------------------------------------------------------
 
-def _regex_union(words: List[str]) -> re.Pattern:
-    """토큰들을 안전 이스케이프 후 OR 정규식으로 묶음. 토큰 없으면 매치 불가 패턴."""
-    safe = [re.escape(w.strip()) for w in (words or []) if w and w.strip()]
-    if not safe:
-        safe = ["$"]  # 매치 불가
-    return re.compile("|".join(safe), re.I)
+# 인덱스 미준비 시 search_tokens 후보 상한
+SCAN_CANDIDATES = 800
 
-def _as_text(v: Any) -> str:
-    """
-    - list[str] → "a b c"
-    - dict     → values 중 list/str만 평탄화
-    - 기타     → str(v)
-    """
-    if isinstance(v, list):
-        return " ".join(str(x) for x in v if x)
-    if isinstance(v, dict):
-        parts: List[str] = []
-        for val in v.values():
-            if isinstance(val, list):
-                parts.extend(str(x) for x in val if x)
-            elif isinstance(val, str):
-                parts.append(val)
-        return " ".join(parts)
-    return str(v or "")
-
-def _searchable_text(doc: Dict[str, Any]) -> str:
-    """AND 판정을 위해 문서의 주요 검색 필드를 하나의 문자열로 합침."""
-    title = doc.get("title") or ""
-    tags  = _as_text(doc.get("tags"))
-    chips = _as_text(doc.get("chips"))
-    summ  = doc.get("summary") or ""
-    ings_text = " ".join([
-        _as_text(doc.get("ingredients_full")),
-        _as_text(doc.get("ingredients_clean")),
-        _as_text(doc.get("ingredients")),
-        _as_text(doc.get("ingredients", {}).get("raw") if isinstance(doc.get("ingredients"), dict) else None),
-        _as_text(doc.get("ingredients", {}).get("norm_ko") if isinstance(doc.get("ingredients"), dict) else None),
-        _as_text(doc.get("ingredients", {}).get("norm_slug") if isinstance(doc.get("ingredients"), dict) else None),
-    ])
-    return " ".join([title, tags, chips, ings_text, summ])
-
-def _contains_all(doc: Dict[str, Any], tokens: List[str]) -> bool:
-    """모든 토큰이 문서 텍스트에 등장하는지(AND) 체크."""
-    if not tokens:
-        return False
-    text = _searchable_text(doc)
-    return all(re.search(re.escape(t), text, re.I) for t in tokens)
+# 요청 단위 랭킹 엔진 선택지
+RANKINGS = ("auto", "index", "scan", "agg", "coverage", "bm25")
+
+# 2단계(표시)에서만 읽는 필드
+CARD_PROJECTION = {
+    "_id": 1,
+    "title": 1, "summary": 1, "imageUrl": 1,
+    "tags": 1, "chips": 1,
+    "ingredients": 1, "ingredients_full": 1, "ingredients_clean": 1,
+    "steps": 1, "steps_full": 1,
+}
 
-def _score(doc: Dict[str, Any], tokens: List[str]) -> float:
+def _field_masks(doc: Dict[str, Any], m: TokenMatcher) -> Tuple[int, int, int, int]:
+    """(제목, 태그+칩, 재료, 요약) 각 필드를 한 번씩만 스캔해 등장 토큰 마스크를 구함."""
+    title, tags, ings, summ = card_field_texts(doc)
+    return m.scan(title), m.scan(tags), m.scan(ings), m.scan(summ)
+
+def _score_masks(masks: Tuple[int, int, int, int], doc: Dict[str, Any]) -> float:
     """
-    단순: 토큰이 등장한 필드 수/횟수로 점수화.
-    - 제목 가중치 > 태그/칩 > 재료들 > 요약
+    단순: 토큰이 등장한 필드 수로 점수화.
+    - 제목 가중치 > 태그/칩 > 재료들 > 요약 (토큰×필드마다 가중치 합산)
     - 풀 필드 보유(steps_full/ingredients_full) 약간 가점
     """
-    title = doc.get("title") or ""
-    tags  = _as_text(doc.get("tags"))
-    chips = _as_text(doc.get("chips"))
-    summ  = doc.get("summary") or ""
-
-    ings_text = " ".join([
-        _as_text(doc.get("ingredients_full")),
-        _as_text(doc.get("ingredients_clean")),
-        _as_text(doc.get("ingredients")),
-        _as_text(doc.get("ingredients", {}).get("raw") if isinstance(doc.get("ingredients"), dict) else None),
-        _as_text(doc.get("ingredients", {}).get("norm_ko") if isinstance(doc.get("ingredients"), dict) else None),
-        _as_text(doc.get("ingredients", {}).get("norm_slug") if isinstance(doc.get("ingredients"), dict) else None),
-    ])
-
     s = 0.0
-    for t in (tokens or []):
-        pat = re.compile(re.escape(t), re.I)
-        if pat.search(title):                 s += 2.0
-        if pat.search(f"{tags} {chips}"):     s += 1.5
-        if pat.search(ings_text):             s += 1.2
-        if pat.search(summ):                  s += 0.5
-
-    if doc.get("steps_full") or doc.get("ingredients_full"):
-        s += 0.2
+    for (_, weight), mask in zip(FIELD_WEIGHTS, masks):
+        s += weight * mask.bit_count()
+    if has_full_fields(doc):
+        s += FULL_BONUS
     return s
 
+def _rank_docs(
+    docs: List[Dict[str, Any]],
+    tokens: List[str],
+    limit: int,
+    must_ids: Optional[Set[Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    요청당 매처 1개로 AND 판정 + 필드 가중 점수를 한 번에 계산.
+    모든 토큰이 등장하는 문서(must)를 먼저, 일부만 등장(rest)은 뒤에.
+    must_ids: 이미 AND로 확인된 _id (search_tokens $all 결과 — 동의어 정규화까지 반영됨)
+    """
+    m = TokenMatcher(tokens)
+    must_ids = must_ids or set()
+    keyed = []
+    for i, d in enumerate(docs):
+        masks = _field_masks(d, m)
+        is_and = d.get("_id") in must_ids or (masks[0] | masks[1] | masks[2] | masks[3]) == m.full
+        keyed.append((not is_and, -round(_score_masks(masks, d), 6), i))
+    keyed.sort()
+    return [docs[i] for _, _, i in keyed[:limit]]
+
+def resolve_engine(ranking: str) -> str:
+    """요청 ranking → 실제 실행 엔진 (인메모리 인덱스가 아직 없으면 scan 폴백)."""
+    if ranking in ("auto", "index"):
+        return "index" if get_card_index().ready else "scan"
+    if ranking == "coverage" and not get_coverage_index().ready:
+        return "scan"
+    if ranking == "bm25" and not get_bm25_index().ready:
+        return "scan"
+    return ranking
+
+
 async def hybrid_recommend(
     db: motor.motor_asyncio.AsyncIOMotorDatabase,
     ingredients: List[str],
-    limit: int = 30
+    limit: int = 30,
+    ranking: str = "auto",
 ) -> List[Dict[str, Any]]:
     """
     입력 토큰(정규화된 재료명)이 문서(제목/태그/칩/재료/요약)에 등장하는지로 필터·랭킹.
     - 감자 같은 하드코딩/폴백 없음
     - 무관한 카드 보강 없음 (매칭된 것만 반환)
     - 다중 재료 입력 시: 모든 토큰이 등장하는 문서(AND)를 먼저, 나머지(OR)는 뒤에
+    - ranking: auto(역색인 준비되면 index, 아니면 scan) | index | scan | agg(서버측 집계)
+      | coverage(가진 재료 비율 순, 카드에 coverage/have/missing 포함)
+      | bm25(드문 재료에 더 큰 가중치, AND 우선)
+      같은 코퍼스에서 엔진별 비교(벤치)를 위해 요청 단위로 고를 수 있다
     """
+    if ranking not in RANKINGS:
+        raise ValueError(f"unknown ranking: {ranking}")
     col = db["recipe_cards"]
 
     # 0) 토큰 준비
@@ -110,47 +117,143 @@ async def hybrid_recommend(
     if not tokens:
         return []
 
-    rx = _regex_union(tokens)
-
-    # 1) 후보 쿼리: 배열/스칼라/중첩 경로 모두 커버
-    q = {
-        "$or": [
-            {"ingredients_full": rx},            # array[str]
-            {"ingredients_clean": rx},           # array[str]
-            {"ingredients": rx},                 # array[str] (레거시)
-            {"ingredients.raw": rx},             # dict{ raw: array[str] }
-            {"ingredients.norm_ko": rx},         # dict{ norm_ko: array[str] }
-            {"ingredients.norm_slug": rx},       # dict{ norm_slug: array[str] }
-            {"tags": rx},                        # array[str]
-            {"chips": rx},                       # array[str]
-            {"title": rx},                       # str
-            {"summary": rx},                     # str
-        ]
-    }
-
-    proj = {
-        "_id": 1,
-        "title": 1, "summary": 1, "imageUrl": 1,
-        "tags": 1, "chips": 1,
-        "ingredients": 1, "ingredients_full": 1, "ingredients_clean": 1,
-        "steps": 1, "steps_full": 1,
-    }
-
-    # 2) 후보 로드 (넓게)
-    docs = await col.find(q, proj).limit(800).to_list(length=800)
+    # 1) 실제 실행될 엔진 확정 (auto/index는 역색인 준비 여부에 따라)
+    idx = get_card_index()
+    engine = resolve_engine(ranking)
+
+    # 2) 결과 캐시: 같은 토큰 집합/limit/엔진이면 DB 조회 없이 반환
+    cache = get_reco_cache()
+    if await cache.check_external_writes(db):
+        # 외부 쓰기 감지 → 인덱스를 바로 따라잡아야 새 결과가 다시 옛 인덱스로 캐시되지 않음
+        await sync_card_index(db, force=True)
+    key = cache_key(tokens, limit, engine)
+    hit = cache.get(key)
+    if hit is not None:
+        return cached_copy(hit)
+
+    if engine == "agg":
+        # 서버측 집계 랭킹: 최종 limit개만 전송
+        docs = await _agg_recommend(col, tokens, limit)
+    elif engine == "bm25":
+        # BM25F: IDF·필드 길이 정규화 점수 → 상위 limit개만 $in 조회
+        await sync_card_index(db)
+        ids = [cid for cid, _ in get_bm25_index().search(tokens, limit)]
+        docs = await _hydrate_or_prune(col, ids)
+    elif engine == "coverage":
+        docs = await _coverage_recommend(db, col, tokens, limit)
+    elif engine == "index":
+        # 역색인 경로: 포스팅 합/교집합으로 랭킹 → 상위 limit개만 $in 조회
+        await sync_card_index(db)
+        ids = idx.search(tokens, limit)
+        docs = await _hydrate_or_prune(col, ids)
+    else:
+        # 폴백(인덱스 빌드 전) 또는 scan 지정: search_tokens 인덱스 조회 + Python 점수화
+        docs = await _scan_recommend(col, tokens, limit)
+
+    cache.put(key, cached_copy(docs))
+    return docs
+
+
+async def _coverage_recommend(db, col, tokens: List[str], limit: int) -> List[Dict[str, Any]]:
+    """전체 카드 재료 비트셋에 대해 AND+popcount → 커버리지 상위 limit개만 조회."""
+    await sync_card_index(db)
+    hits = get_coverage_index().search(tokens, limit)
+    docs = await _hydrate(col, [cid for cid, _, _ in hits])
+    by_id = {d["_id"]: d for d in docs}
+    out: List[Dict[str, Any]] = []
+    for cid, have, missing in hits:
+        d = by_id.get(cid)
+        if d is None:
+            notify_removed(cid)  # 외부에서 삭제된 카드
+            continue
+        # 응답 전용 필드는 새 dict 에만 (조회한 카드 dict 는 캐시/추측 풀과 공유될 수 있음)
+        out.append({**d, "have": have, "missing": missing, "coverage": round(have / (have + missing), 4)})
+    return out
+
+
+async def _hydrate_or_prune(col, ids: List[Any]) -> List[Dict[str, Any]]:
+    """_hydrate + 조회되지 않은(외부에서 삭제된) 카드는 인메모리 인덱스들에서 제거."""
+    docs = await _hydrate(col, ids)
+    if len(docs) < len(ids):
+        found = {d["_id"] for d in docs}
+        for cid in ids:
+            if cid not in found:
+                notify_removed(cid)
+    return docs
+
+
+async def _hydrate(col, ids: List[Any]) -> List[Dict[str, Any]]:
+    """2단계: 살아남은 상위 id만 표시용 필드로 한 번에 조회 (순서 유지)."""
+    if not ids:
+        return []
+    docs = await col.find({"_id": {"$in": ids}}, CARD_PROJECTION).to_list(length=len(ids))
+    by_id = {d["_id"]: d for d in docs}
+    return [by_id[c] for c in ids if c in by_id]
+
+async def _scan_recommend(col, tokens: List[str], limit: int) -> List[Dict[str, Any]]:
+    """
+    인덱스가 없을 때의 경로: search_tokens 멀티키 인덱스로 후보 조회 → 압축 필드로 점수화 → 상위만 조회.
+    - AND 티어: {"search_tokens": {"$all": tokens}}
+    - OR 티어 : {"search_tokens": {"$in": tokens}} (AND로 limit을 못 채울 때만)
+    """
+    uniq = list(dict.fromkeys(tokens))
+
+    # 1단계: 후보는 넓게, 필드는 _id + 압축 검색 필드만
+    docs = await col.find(
+        {"search_tokens": {"$all": uniq}}, COMPACT_PROJECTION
+    ).limit(SCAN_CANDIDATES).to_list(length=SCAN_CANDIDATES)
+    must_ids = {d["_id"] for d in docs}
+    if len(uniq) > 1 and len(docs) < limit:
+        seen = [d["_id"] for d in docs]
+        room = SCAN_CANDIDATES - len(docs)
+        docs += await col.find(
+            {"search_tokens": {"$in": uniq}, "_id": {"$nin": seen}}, COMPACT_PROJECTION
+        ).limit(room).to_list(length=room)
 
     if not docs:
         return []
 
-    # 3) AND 우선 분리
-    #    모든 토큰이 등장하는 문서(must) / 일부만 등장(rest)
-    must_docs = [d for d in docs if _contains_all(d, tokens)]
-    must_ids = {str(d.get("_id")) for d in must_docs}
-    rest_docs = [d for d in docs if str(d.get("_id")) not in must_ids]
+    # search_fields가 아직 없는 구 문서만 원문 필드로 다시 읽음
+    missing = [d["_id"] for d in docs if not d.get("search_fields")]
+    if missing:
+        light = await col.find({"_id": {"$in": missing}}, INDEX_PROJECTION).to_list(length=len(missing))
+        by_id = {d["_id"]: d for d in light}
+        docs = [by_id.get(d["_id"], d) for d in docs]
+
+    # AND 우선 + 점수 정렬 (단일 패스 매처)
+    ranked = _rank_docs(docs, uniq, limit, must_ids)
+
+    # 2단계: 상위 limit개만 표시 필드로 조회
+    return await _hydrate(col, [d["_id"] for d in ranked])
+
+
+def _agg_pipeline(tokens: List[str], limit: int) -> List[Dict[str, Any]]:
+    """
+    서버측 랭킹 파이프라인.
+    - 커버리지: |search_tokens ∩ tokens| ($setIntersection/$size), 전부 덮으면 AND 티어
+    - 점수: 토큰×필드 부분 문자열 등장($indexOfCP on search_fields[i]) × 필드 가중치 + 풀 필드 가점
+    - $sort + $limit 은 서버에서 top-k 정렬로 합쳐지고, 표시 필드는 마지막에만 남긴다
+    """
+    uniq = list(dict.fromkeys(t.lower() for t in tokens))
+    hits = []
+    for i, (_, weight) in enumerate(FIELD_WEIGHTS):
+        field = {"$ifNull": [{"$arrayElemAt": ["$search_fields", i]}, ""]}
+        for t in uniq:
+            hits.append({"$cond": [{"$gte": [{"$indexOfCP": [field, t]}, 0]}, weight, 0]})
+    return [
+        {"$match": {"search_tokens": {"$in": uniq}}},
+        {"$addFields": {
+            "_cov": {"$size": {"$setIntersection": [{"$ifNull": ["$search_tokens", []]}, uniq]}},
+            "_score": {"$add": hits + [{"$cond": [{"$ifNull": ["$has_full", False]}, FULL_BONUS, 0]}]},
+        }},
+        {"$addFields": {"_and": {"$eq": ["$_cov", len(uniq)]}}},
+        {"$sort": {"_and": -1, "_score": -1, "_cov": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": CARD_PROJECTION},
+    ]
 
-    # 4) 각 그룹 내부 점수화 + 정렬
-    must_sorted = sorted(must_docs, key=lambda d: _score(d, tokens), reverse=True)
-    rest_sorted = sorted(rest_docs, key=lambda d: _score(d, tokens), reverse=True)
 
-    # 5) 병합 후 상위 limit 반환
-    return (must_sorted + rest_sorted)[:limit]
+async def _agg_recommend(col, tokens: List[str], limit: int) -> List[Dict[str, Any]]:
+    """search_tokens 멀티키 인덱스 $match 후 집계 파이프라인에서 랭킹까지 끝냄."""
+    pipeline = _agg_pipeline(tokens, limit)
+    return await col.aggregate(pipeline, allowDiskUse=True).to_list(length=limit)
@@ -1,57 +1,97 @@
 # app/services/crawl10000/seed_ing.py
 # 목적: (1) 재료 문자열 → 토큰 정규화, (2) Mongo 업서트, (3) 인덱스 생성
 
-import re
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 from motor.motor_asyncio import AsyncIOMotorCollection
 
-from app.models.tags import (
-    canonicalize_token_ko, extract_words, is_stop,
-)
-
-# --- slug 매핑(영문/내부용) ----------------------------------------------------
-_KOR2SLUG = {
-    "삼겹살":"porkbelly","돼지고기":"pork","감자":"potato","양파":"onion",
-    "대파":"scallion","파":"scallion","마늘":"garlic","소금":"salt",
-    "후추":"pepper","설탕":"sugar","간장":"soy_sauce","식용유":"oil",
-    "버터":"butter","닭가슴살":"chickenbreast","닭고기":"chicken",
-    "달걀":"egg","계란":"egg","고추장":"gochujang","된장":"doenjang",
-    "김치":"kimchi","두부":"tofu","파프리카":"bellpepper",
-    "고구마":"sweetpotato","당근":"carrot","오이":"cucumber",
-    "브로콜리":"broccoli","가지":"eggplant","버섯":"mushroom",
-    "호박":"pumpkin","단호박":"pumpkin","애호박":"pumpkin","zucchini":"pumpkin",
-}
+from app.models.tags import extract_words
+from app.services.crawl10000.vocab import get_vocabulary
 
+# --- slug 매핑(영문/내부용) — 사전은 ingredient_vocab (vocab.get_vocabulary) -------
 def kor_to_slug(token: str) -> Optional[str]:
-    token = (token or "").strip()
-    if not token:
-        return None
-    if token in _KOR2SLUG:
-        return _KOR2SLUG[token]
-    if re.fullmatch(r"[a-zA-Z_]+", token):
-        return token.lower()
-    t = re.sub(r"[\s·,()/\[\]-]+", "", token)
-    return _KOR2SLUG.get(t) or None
+    return get_vocabulary().slug(token)
 
 # --- 정규화: KO/slug 모두 만들기 ----------------------------------------------
 def normalize_ingredients_ko(raws: List[str]) -> List[str]:
-    seen, out = set(), []
-    for line in raws or []:
-        for w in extract_words(line):
-            canon = canonicalize_token_ko(w)
-            if canon and canon not in seen and not is_stop(canon):
-                seen.add(canon); out.append(canon)
-    return out
+    # canonicalize_token_ko + 불용어 제외와 같은 결과 (현재 어휘 버전의 컴파일된 정규화기)
+    return get_vocabulary().normalizer.normalize(raws)
 
 def normalize_ingredients_slug(raws: List[str]) -> List[str]:
+    vocab = get_vocabulary()
     seen, out = set(), []
     for line in raws or []:
         for w in extract_words(line):
-            slug = kor_to_slug(w)
+            slug = vocab.slug(w)
             if slug and slug not in seen:
                 seen.add(slug); out.append(slug)
     return out
 
+# --- 검색 토큰: 카드/레시피 1건 → 정규화 토큰 배열(멀티키 인덱스용) ----------------
+def _strings(v: Any) -> List[str]:
+    # list / {raw, norm_ko, norm_slug, ...} / str 어떤 모양이든 문자열 목록으로
+    if isinstance(v, str):
+        return [v]
+    if isinstance(v, list):
+        return [str(x) for x in v if isinstance(x, (str, int, float)) and str(x).strip()]
+    if isinstance(v, dict):
+        out: List[str] = []
+        for val in v.values():
+            out.extend(_strings(val))
+        return out
+    return []
+
+def _with_labels(toks: List[str]) -> List[str]:
+    # 합성어 토큰("감자볶음")에 들어있는 표준 재료명("감자")도 함께 넣어 $in 정확 매칭을 보완
+    seen = set(toks)
+    labels = get_vocabulary().labels
+    for t in list(toks):
+        for label in labels:
+            if label != t and label in t and label not in seen:
+                seen.add(label); toks.append(label)
+    return sorted(seen)
+
+def build_search_tokens(doc: Dict) -> List[str]:
+    """
+    제목/태그/칩/재료(모든 스키마)를 normalize_ingredients_ko로 정규화한 토큰 배열.
+    - 재료 스키마: list, {raw,norm_ko,norm_slug}, ingredients_full, ingredients_clean, ingredients_raw
+    - 카드 variants의 key_ingredients도 포함
+    - 합성어 토큰("감자볶음")에 들어있는 표준 재료명("감자")도 함께 넣어 $in 정확 매칭을 보완
+    """
+    lines: List[str] = [str(doc.get("title") or "")]
+    for k in ("tags", "chips", "ingredients", "ingredients_full", "ingredients_clean", "ingredients_raw"):
+        lines.extend(_strings(doc.get(k)))
+    for v in doc.get("variants") or []:
+        if isinstance(v, dict):
+            lines.extend(_strings(v.get("key_ingredients")))
+    return _with_labels(normalize_ingredients_ko(lines))
+
+# 재료 라인에서 재료가 아닌 수량 단위 단어 ("감자 2개" → "개")
+_UNIT_WORDS = {
+    "개","장","줌","모","쪽","톨","알","봉","봉지","팩","캔","병","통","마리","조각",
+    "송이","덩이","꼬집","인분","조금","약간","적당량","한줌","반개","대","포기","그램",
+}
+
+def build_ingredient_tokens(doc: Dict) -> List[str]:
+    """
+    재료 필드만 정규화한 토큰 배열 (제목/태그 제외) — "가진 재료로 몇 %를 만들 수 있나" 커버리지 계산용.
+    - 수량 단위 단어는 뺀다
+    - 합성어("다진양파")는 안에 든 표준 재료명("양파")으로 바꿔 재료 수를 부풀리지 않는다
+    """
+    lines: List[str] = []
+    for k in ("ingredients", "ingredients_full", "ingredients_clean", "ingredients_raw"):
+        lines.extend(_strings(doc.get(k)))
+    for v in doc.get("variants") or []:
+        if isinstance(v, dict):
+            lines.extend(_strings(v.get("key_ingredients")))
+    vocab = get_vocabulary()
+    out: Set[str] = set()
+    for t in vocab.normalizer.normalize(lines):
+        if t in _UNIT_WORDS:
+            continue
+        labels = [label for label in vocab.labels if label in t]
+        out.update(labels or [t])
+    return sorted(out)
+
 # --- 인덱스/업서트 -------------------------------------------------------------
 async def ensure_indexes(recipes: AsyncIOMotorCollection):
     await recipes.create_index("url",
@@ -61,12 +101,39 @@ async def ensure_indexes(recipes: AsyncIOMotorCollection):
     await recipes.create_index("title", background=True)
     await recipes.create_index("ingredients.norm_ko", background=True)
     await recipes.create_index("ingredients.norm_slug", background=True)
+    await recipes.create_index("search_tokens", background=True)
     await recipes.create_index([("tags", 1)], background=True)
 
+def recipe_token_fields(doc: Dict, raws: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    recipes 문서의 어휘 의존 필드 (ingredients.norm_ko/norm_slug, search_tokens, vocab_version).
+    raws 를 안 주면 문서의 ingredients.raw 를 다시 정규화 (어휘 버전 변경 시 재정규화용)
+    - raw 가 없으면 original/lines/list 에서 가져온다
+    - ingredients 가 dict 가 아니거나(리스트 스키마) 원문 줄을 못 찾으면 ingredients 는 건드리지 않는다
+    """
+    vocab = get_vocabulary()
+    ing = doc.get("ingredients")
+    if raws is None:
+        if isinstance(ing, dict):
+            for k in ("raw", "original", "lines", "list"):
+                raws = _strings(ing.get(k))
+                if raws:
+                    break
+        if not raws:
+            return {"search_tokens": build_search_tokens(doc), "vocab_version": vocab.version}
+    ing = dict(ing) if isinstance(ing, dict) else {}
+    ing.update({
+        "raw": raws,
+        "norm_ko": vocab.normalizer.normalize(raws),
+        "norm_slug": normalize_ingredients_slug(raws),
+    })
+    return {
+        "ingredients": ing,
+        "search_tokens": build_search_tokens({**doc, "ingredients": ing}),
+        "vocab_version": vocab.version,
+    }
+
 async def upsert_recipe(recipes: AsyncIOMotorCollection, doc: Dict) -> str:
-    raws = doc.get("ingredients_raw") or []
-    norm_ko   = normalize_ingredients_ko(raws)
-    norm_slug = normalize_ingredients_slug(raws)
     payload = {
         "url": doc.get("url",""),
         "title": doc.get("title") or "",
@@ -74,8 +141,8 @@ async def upsert_recipe(recipes: AsyncIOMotorCollection, doc: Dict) -> str:
         "steps": doc.get("steps") or [],
         "image": doc.get("image") or "",
         "tags": doc.get("tags") or [],
-        "ingredients": {"raw": raws, "norm_ko": norm_ko, "norm_slug": norm_slug},
     }
+    payload.update(recipe_token_fields(payload, doc.get("ingredients_raw") or []))
     res = await recipes.update_one({"url": payload["url"]}, {"$set": payload}, upsert=True)
     rid = res.upserted_id
     if not rid:
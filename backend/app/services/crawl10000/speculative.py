@@ -0,0 +1,138 @@
+# app/services/crawl10000/speculative.py
+# 목적: Vision 스트리밍 출력과 추천 조회를 겹치기 (vision=stream)
+# - 재료명이 하나씩 나올 때마다 feed(부분 토큰) → 후보 조회(hybrid_recommend, limit 여유 있게)를 미리 시작
+#   조회 중에 토큰이 늘면 진행 중인 조회는 취소하고 최신 토큰으로 다시 (동시에 1건만)
+# - 미리 받은 카드는 요청 단위 풀(_id → 카드)에 모아 둔다
+# - result(최종 토큰)
+#   · 끝난 추측 조회 토큰 == 최종 토큰 → 그 결과 그대로 (추가 DB 왕복 없음)
+#   · index/bm25 엔진 → 최종 토큰으로 인메모리 랭킹을 다시 하고, 상위 카드가 모두 풀에 있으면 그대로
+#   · 최종 토큰 조회가 진행 중이면 합류, 아니면 풀에 없는 카드만 $in 조회
+#   · 그 외 엔진(scan/agg/coverage) → 최종 토큰으로 hybrid_recommend (추측 결과는 버림)
+# - 결과는 hybrid_recommend 와 같은 키로 reco_cache 에 넣는다
+
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.crawl10000.bm25 import get_bm25_index
+from app.services.crawl10000.card_index import get_card_index, notify_removed, sync_card_index
+from app.services.crawl10000.reco_cache import cache_key, cached_copy, get_reco_cache
+from app.services.crawl10000.recommender import _hydrate, hybrid_recommend, resolve_engine
+
+log = logging.getLogger(__name__)
+
+SPEC_FACTOR = 2       # 추측 조회는 limit × SPEC_FACTOR 개까지 받아 둠 (최종 랭킹 재사용률 ↑)
+
+
+def _clean(tokens: List[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(t.strip() for t in (tokens or []) if t and t.strip()))
+
+
+class SpeculativeRecommend:
+    def __init__(self, db, limit: int = 30, ranking: str = "auto") -> None:
+        self.db = db
+        self.limit = limit
+        self.ranking = ranking
+        self.spec_limit = limit * SPEC_FACTOR
+        self._pool: Dict[Any, Dict[str, Any]] = {}
+        self._task: Optional["asyncio.Task[List[Dict[str, Any]]]"] = None
+        self._task_tokens: Tuple[str, ...] = ()
+        self._done: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self._want: Tuple[str, ...] = ()
+        self._closed = False
+        self.stats = {"rounds": 0, "final": "", "hydrated_final": 0}
+
+    # ---------- 추측 조회 ----------
+    def feed(self, tokens: List[str]) -> None:
+        """부분 토큰 갱신 (Vision 스트림 콜백에서 동기 호출)."""
+        t = _clean(tokens)
+        if self._closed or not t or t == self._want:
+            return
+        self._want = t
+        if self._task is not None and not self._task.done():
+            self._task.cancel()   # 최신 토큰이 우선: 이전 조회는 결과가 곧바로 낡으므로 버림
+        self._launch()
+
+    def _launch(self) -> None:
+        t = self._want
+        if t in self._done:
+            return
+        self._task_tokens = t
+        self.stats["rounds"] += 1
+        self._task = asyncio.ensure_future(hybrid_recommend(self.db, list(t), limit=self.spec_limit, ranking=self.ranking))
+        self._task.add_done_callback(lambda fut, t=t: self._on_done(t, fut))
+
+    def _on_done(self, t: Tuple[str, ...], fut: "asyncio.Future[List[Dict[str, Any]]]") -> None:
+        if fut.cancelled():
+            return
+        if fut.exception() is not None:
+            log.warning("speculative retrieval failed (%s): %s", list(t), fut.exception())
+            return
+        docs = fut.result()
+        self._done[t] = docs
+        for d in docs:
+            self._pool.setdefault(d["_id"], d)
+
+    def close(self) -> None:
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    # ---------- 최종 ----------
+    async def result(self, tokens: List[str]) -> List[Dict[str, Any]]:
+        final = _clean(tokens)
+        self._closed = True
+        if not final:
+            return []
+        engine = resolve_engine(self.ranking)
+        if final in self._done and engine not in ("index", "bm25"):
+            return self._finish("exact", self._done[final][: self.limit])
+        cache = get_reco_cache()
+        key = cache_key(list(final), self.limit, engine)
+        hit = cache.get(key)
+        if hit is not None:
+            self.stats["final"] = "cache"
+            return cached_copy(hit)
+
+        # index/bm25: 최종 토큰 랭킹은 인메모리라 바로 계산 → 상위 카드가 전부 풀에 있으면 DB 왕복 없음
+        ids: Optional[List[Any]] = None
+        if engine in ("index", "bm25") and self._pool:
+            await sync_card_index(self.db)
+            if engine == "bm25":
+                ids = [cid for cid, _ in get_bm25_index().search(list(final), self.limit)]
+            else:
+                ids = get_card_index().search(list(final), self.limit)
+            if all(cid in self._pool for cid in ids):
+                return self._finish("rerank", [self._pool[cid] for cid in ids], key)
+
+        task = self._task
+        if task is not None and not task.done():
+            if self._task_tokens == final:
+                await asyncio.wait([task])   # 최종 토큰 조회가 이미 진행 중 → 합류 (새 왕복보다 먼저 끝남)
+                if final in self._done and ids is None:
+                    return self._finish("exact", self._done[final][: self.limit])
+            else:
+                task.cancel()
+
+        if ids is None:
+            self.stats["final"] = "full"
+            return await hybrid_recommend(self.db, list(final), limit=self.limit, ranking=self.ranking)
+
+        # 풀에 없는 카드만 조회
+        need = [cid for cid in ids if cid not in self._pool]
+        fetched = await _hydrate(self.db["recipe_cards"], need)
+        for d in fetched:
+            self._pool[d["_id"]] = d
+        found = {d["_id"] for d in fetched}
+        for cid in need:
+            if cid not in found:
+                notify_removed(cid)   # 외부에서 삭제된 카드
+        self.stats["hydrated_final"] = len(need)
+        return self._finish("rerank", [self._pool[cid] for cid in ids if cid in self._pool], key)
+
+    def _finish(self, how: str, docs: List[Dict[str, Any]], key: Any = None) -> List[Dict[str, Any]]:
+        self.stats["final"] = how
+        if key is not None:
+            get_reco_cache().put(key, cached_copy(docs))
+        return cached_copy(docs)
@@ -0,0 +1,318 @@
+# app/services/crawl10000/suggest.py
+# 목적: 재료 자동완성 (GET /recipes/ingredients/suggest?q=) — 입력 한 글자마다 호출돼도 되는 접두사 트라이
+# - 대상: ingredient_vocab 표기(달걀 → 토큰 계란 같은 동의어 포함) + 코퍼스 재료 토큰(카드 ing_tokens, df ≥ MIN_DF)
+#   가중치 = 토큰의 문서 빈도(df, 해당 재료가 들어간 카드 수)
+# - 트라이 2개: 표기 그대로(두부) / 초성(ㄷㅂ). 노드마다 서브트리 상위 K_NODE 개를 미리 정렬해 둬서
+#   조회 = 접두사 따라 내려가기 + 목록 자르기 → 키 입력 1회당 수 µs
+#   "두ㅂ" 처럼 음절/초성이 섞이면 초성 트라이 노드의 후보를 위치별로 걸러낸다
+# - 증분 갱신
+#   · 코퍼스: card_index 리스너로 카드 upsert/삭제 때 df 만 바뀐 토큰의 경로를 다시 정렬
+#     (가중치가 오르면 경로 노드에 끼워 넣기, 내려가면 그 토큰이 상위 목록에 있던 노드만 자식 목록에서 재계산)
+#   · 어휘: 조회 시 Vocabulary 객체가 바뀌었으면 표기 차이만 넣고 뺀다
+
+from __future__ import annotations
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.crawl10000.card_index import BuildBuffer, add_card_listener
+from app.services.crawl10000.coverage import COVERAGE_PROJECTION, ingredient_tokens_of
+from app.services.crawl10000.fuzzy import is_chosung, to_chosung
+from app.services.crawl10000.vocab import get_vocabulary
+
+log = logging.getLogger(__name__)
+
+MIN_DF = max(1, int(getattr(settings, "SUGGEST_MIN_DF", 2) or 1))
+K_NODE = 16          # 노드별로 미리 정렬해 두는 상위 개수 (= limit 상한)
+MAX_VISIT = 5000     # 음절/초성 혼합 질의에서 훑을 최대 노드 수
+
+
+class _Node:
+    __slots__ = ("kids", "words", "top")
+
+    def __init__(self) -> None:
+        self.kids: Dict[str, "_Node"] = {}
+        self.words: Set[str] = set()     # 이 노드에서 끝나는 표기
+        self.top: List[str] = []         # 서브트리 상위 K_NODE 표기 (가중치순)
+
+
+class _Trie:
+    def __init__(self) -> None:
+        self.root = _Node()
+
+    def path(self, key: str, create: bool = False) -> List[_Node]:
+        """key 를 따라간 노드들 (루트 제외, 깊이 1..len(key)). 없으면 빈 목록."""
+        node, out = self.root, []
+        for ch in key:
+            nxt = node.kids.get(ch)
+            if nxt is None:
+                if not create:
+                    return []
+                nxt = node.kids[ch] = _Node()
+            out.append(nxt)
+            node = nxt
+        return out
+
+    def find(self, key: str) -> Optional[_Node]:
+        p = self.path(key)
+        return p[-1] if p else None
+
+
+class SuggestIndex:
+    def __init__(self, min_df: int = MIN_DF) -> None:
+        self.min_df = min_df
+        self.df: Dict[str, int] = {}
+        self._fwd: Dict[Any, Tuple[str, ...]] = {}
+        self._curated: Dict[str, str] = {}           # 어휘 표기 → 토큰
+        self._by_token: Dict[str, Set[str]] = {}     # 토큰 → 어휘 표기들
+        self._token: Dict[str, str] = {}             # 트라이에 들어 있는 표기 → 토큰
+        self._key: Dict[str, Tuple[int, int, str]] = {}
+        self._surface = _Trie()
+        self._cho = _Trie()
+        self._vocab = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._token)
+
+    # ---------- 정렬 키 / 트라이 경로 ----------
+    def _rank(self, text: str) -> Tuple[int, int, str]:
+        # df ↓, 짧은 표기 ↑, 가나다순
+        return (-self.df.get(self._token[text], 0), len(text), text)
+
+    def _paths(self, text: str, create: bool = False) -> List[List[_Node]]:
+        out = [self._surface.path(text, create)]
+        cho = to_chosung(text)
+        if cho != text.lower():
+            out.append(self._cho.path(cho, create))
+        return out
+
+    def _recompute(self, node: _Node) -> None:
+        cands = set(node.words)
+        for kid in node.kids.values():
+            cands.update(kid.top)
+        node.top = sorted(cands, key=self._key.__getitem__)[:K_NODE]
+
+    def _place(self, text: str) -> None:
+        """text 가 트라이에 들어가거나 가중치가 바뀐 뒤 경로의 상위 목록을 맞춘다."""
+        old = self._key.get(text)
+        new = self._key[text] = self._rank(text)
+        for path in self._paths(text, create=True):
+            path[-1].words.add(text)
+            if old is None or new < old:       # 오르거나 새로 들어옴: 끼워 넣기
+                for node in path:
+                    if text in node.top:
+                        node.top.sort(key=self._key.__getitem__)
+                    elif len(node.top) < K_NODE or new < self._key[node.top[-1]]:
+                        node.top.append(text)
+                        node.top.sort(key=self._key.__getitem__)
+                        del node.top[K_NODE:]
+            elif new > old:                    # 내려감: 들어 있던 노드만 아래에서부터 재계산
+                for node in reversed(path):
+                    if text in node.top:
+                        self._recompute(node)
+
+    def _drop(self, text: str) -> None:
+        paths = self._paths(text)
+        for path in paths:
+            if path:
+                path[-1].words.discard(text)
+        self._token.pop(text, None)
+        for path in paths:
+            for node in reversed(path):
+                if text in node.top:
+                    node.top.remove(text)
+                    self._recompute(node)
+        self._key.pop(text, None)
+
+    def _sync(self, text: str) -> None:
+        token = self._curated.get(text) or text
+        want = text in self._curated or self.df.get(text, 0) >= self.min_df
+        if not want:
+            if text in self._token:
+                self._drop(text)
+            return
+        self._token[text] = token
+        if self._key.get(text) != self._rank(text):
+            self._place(text)
+
+    def _sync_token(self, token: str) -> None:
+        self._sync(token)
+        for text in self._by_token.get(token, ()):
+            if text != token:
+                self._sync(text)
+
+    # ---------- 어휘 ----------
+    def _curated_of(self, vocab) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        for term in vocab.entries:
+            canon = vocab.normalizer.canonicalize(term)
+            if canon:
+                out[term] = canon
+        for label in vocab.labels:
+            out.setdefault(label, label)
+        return out
+
+    def sync_vocab(self) -> None:
+        vocab = get_vocabulary()
+        if vocab is self._vocab:
+            return
+        fresh = self._curated_of(vocab)
+        changed = [t for t in set(fresh) | set(self._curated) if fresh.get(t) != self._curated.get(t)]
+        for t in changed:
+            old = self._curated.get(t)
+            if old is not None:
+                self._by_token.get(old, set()).discard(t)
+            if t in fresh:
+                self._curated[t] = fresh[t]
+                self._by_token.setdefault(fresh[t], set()).add(t)
+            else:
+                self._curated.pop(t, None)
+            if t in self._token and self._token[t] != (fresh.get(t) or t):
+                self._drop(t)   # 토큰이 바뀐 표기는 새 가중치로 다시 넣는다
+            self._sync(t)
+        self._vocab = vocab
+
+    # ---------- 코퍼스 ----------
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        cid = doc.get("_id")
+        if cid is None:
+            return
+        toks = tuple(sorted(set(ingredient_tokens_of(doc))))
+        old = self._fwd.get(cid, ())
+        if toks == old:
+            return
+        if toks:
+            self._fwd[cid] = toks
+        else:
+            self._fwd.pop(cid, None)
+        self._apply(old, toks)
+
+    def remove(self, cid: Any) -> None:
+        old = self._fwd.pop(cid, ())
+        self._apply(old, ())
+
+    def _apply(self, old: Iterable[str], new: Iterable[str]) -> None:
+        old, new = set(old), set(new)
+        for t in old - new:
+            self.df[t] -= 1
+            if self.df[t] <= 0:
+                del self.df[t]
+        for t in new - old:
+            self.df[t] = self.df.get(t, 0) + 1
+        for t in old ^ new:
+            self._sync_token(t)
+
+    def bulk_load(self, fwd: Dict[Any, Tuple[str, ...]]) -> None:
+        """초기 빌드: df 를 한 번에 세고 트라이 상위 목록을 후위 순회로 한 번만 계산."""
+        self._fwd = fwd
+        for toks in fwd.values():
+            for t in toks:
+                self.df[t] = self.df.get(t, 0) + 1
+        vocab = get_vocabulary()
+        self._curated = self._curated_of(vocab)
+        for text, token in self._curated.items():
+            self._by_token.setdefault(token, set()).add(text)
+        texts = set(self._curated) | {t for t, n in self.df.items() if n >= self.min_df}
+        for text in texts:
+            self._token[text] = self._curated.get(text) or text
+            self._key[text] = self._rank(text)
+            for path in self._paths(text, create=True):
+                path[-1].words.add(text)
+        for trie in (self._surface, self._cho):
+            stack: List[Tuple[_Node, bool]] = [(k, False) for k in trie.root.kids.values()]
+            while stack:
+                node, done = stack.pop()
+                if done:
+                    self._recompute(node)
+                    continue
+                stack.append((node, True))
+                stack.extend((k, False) for k in node.kids.values())
+        self._vocab = vocab
+
+    # ---------- 조회 ----------
+    def suggest(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        self.sync_vocab()
+        q = " ".join((q or "").lower().split())
+        limit = max(0, min(limit, K_NODE))
+        if not q or not limit:
+            return []
+        if not any(is_chosung(c) for c in q):
+            node = self._surface.find(q)
+            texts = node.top[:limit] if node else []
+        else:
+            node = self._cho.find(to_chosung(q))
+            if node is None:
+                texts = []
+            elif all(is_chosung(c) for c in q):
+                texts = node.top[:limit]
+            else:
+                texts = self._mixed(node, q, limit)
+        return [{"text": t, "token": self._token[t], "df": self.df.get(self._token[t], 0)} for t in texts]
+
+    def _mixed(self, node: _Node, q: str, limit: int) -> List[str]:
+        # "두ㅂ": 초성 트라이(ㄷㅂ) 후보 중 음절 위치가 맞는 것만
+        def ok(text: str) -> bool:
+            return all(is_chosung(c) or text[i] == c for i, c in enumerate(q))
+
+        hits = [t for t in node.top if ok(t)]
+        if len(hits) >= limit or len(node.top) < K_NODE:
+            return hits[:limit]     # 상위 목록이 서브트리 전체거나 이미 충분
+        found: Set[str] = set()
+        stack, seen = [node], 0
+        while stack and seen < MAX_VISIT:
+            n = stack.pop()
+            seen += 1
+            found.update(t for t in n.words if ok(t))
+            stack.extend(n.kids.values())
+        return sorted(found, key=self._key.__getitem__)[:limit]
+
+
+# ---------- 전역 인스턴스 + Mongo 연동 ----------
+_suggest = SuggestIndex()
+_building = BuildBuffer()
+
+
+def get_suggest_index() -> SuggestIndex:
+    return _suggest
+
+
+async def build_suggest_index(db, batch_size: int = 2000) -> SuggestIndex:
+    """recipe_cards 재료 토큰으로 새 자동완성 트라이를 만든 뒤 원자적으로 교체."""
+    global _suggest
+    t0 = time.perf_counter()
+    fwd: Dict[Any, Tuple[str, ...]] = {}
+    _building.start()
+    try:
+        async for doc in db["recipe_cards"].find({}, COVERAGE_PROJECTION).batch_size(batch_size):
+            toks = tuple(sorted(set(ingredient_tokens_of(doc))))
+            if toks:
+                fwd[doc["_id"]] = toks
+    except BaseException:
+        _building.cancel()
+        raise
+    fresh = SuggestIndex()
+    fresh.bulk_load(fwd)
+    fresh.ready = True
+    _suggest = fresh
+    _building.replay(fresh)
+    log.info("suggest index built: cards=%d texts=%d (%.1f ms)",
+             len(fwd), len(fresh), (time.perf_counter() - t0) * 1000)
+    return fresh
+
+
+# card_index 증분 갱신 경로에 연결 (빌드 중 변경은 _building 에 모았다가 교체 직후 새 인덱스에 재생)
+def _on_upsert(doc: Dict[str, Any]) -> None:
+    _building.upsert(doc)
+    if _suggest.ready:
+        _suggest.upsert(doc)
+
+
+def _on_remove(cid: Any) -> None:
+    _building.remove(cid)
+    if _suggest.ready:
+        _suggest.remove(cid)
+
+
+add_card_listener(_on_upsert, _on_remove)
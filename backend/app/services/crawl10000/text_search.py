@@ -0,0 +1,229 @@
+# app/services/crawl10000/text_search.py
+# 목적: 제목/요약 자유 검색 (GET /recipes/search?q=) — 한국어 부분 문자열 매칭
+# - Mongo 기본 text 인덱스(txt_title_summary)는 한국어를 형태소로 못 나눠서 "된장찌개" 에 "찌개" 가 안 걸린다
+# - 문자 bigram 역색인: 필드 텍스트를 소문자 + 공백/기호 제거(된장 찌개 == 된장찌개)로 압축한 뒤
+#   연속 두 글자 → {카드 _id: 필드 비트(제목/요약)}
+# - 질의어마다 bigram 포스팅을 작은 것부터 교집합(필드 비트 AND) → 후보는 압축 텍스트에서 실제 위치를 확인
+#   (bigram 이 다 있어도 이어져 있지 않으면 탈락, 찾은 위치는 점수에 사용)
+# - 한 글자 질의는 그 글자가 들어간 bigram 포스팅 합집합
+# - 점수: 질의어별 제목 2.0(+제목 첫머리 1.0) / 요약 0.5 (card_index.FIELD_WEIGHTS 와 같은 비중), 동점이면 짧은 제목
+# - card_index 리스너로 카드 upsert/삭제 때 해당 카드의 bigram 만 넣고 뺀다
+
+from __future__ import annotations
+import re
+import time
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.services.crawl10000.card_index import (
+    F_SUMMARY, F_TITLE, FIELD_WEIGHTS, BuildBuffer, add_card_listener, sync_card_index,
+)
+from app.services.crawl10000.recommender import CARD_PROJECTION, _hydrate_or_prune
+
+log = logging.getLogger(__name__)
+
+TEXT_PROJECTION = {"_id": 1, "title": 1, "summary": 1}
+PREFIX_BONUS = 1.0        # 제목이 질의어로 시작하면 가점
+_W = dict(FIELD_WEIGHTS)
+_RX_NONWORD = re.compile(r"[\W_]+")
+
+
+def compact_text(s: Any) -> str:
+    """소문자 + 공백/기호 제거 (색인/질의 공통)."""
+    return _RX_NONWORD.sub("", str(s or "").lower())
+
+
+def _grams(t: str) -> Set[str]:
+    if len(t) < 2:
+        return {t} if t else set()
+    return {t[i:i + 2] for i in range(len(t) - 1)}
+
+
+def query_terms(q: str) -> List[str]:
+    """공백으로 나눈 질의어 (압축/중복 제거). 모든 질의어가 제목이나 요약에 있어야 매칭."""
+    return list(dict.fromkeys(t for t in (compact_text(w) for w in (q or "").split()) if t))
+
+
+class TextIndex:
+    def __init__(self) -> None:
+        self._post: Dict[str, Dict[Any, int]] = {}
+        self._by_char: Dict[str, Set[str]] = {}       # 글자 → 그 글자가 든 bigram (한 글자 질의용)
+        self._text: Dict[Any, Tuple[str, str]] = {}   # 카드 → (압축 제목, 압축 요약)
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    # ---------- 쓰기 ----------
+    def _grams_of(self, texts: Tuple[str, str]) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for bit, t in zip((F_TITLE, F_SUMMARY), texts):
+            for g in _grams(t):
+                out[g] = out.get(g, 0) | bit
+        return out
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        cid = doc.get("_id")
+        if cid is None:
+            return
+        texts = (compact_text(doc.get("title")), compact_text(doc.get("summary")))
+        if self._text.get(cid) == texts:
+            return
+        self.remove(cid)
+        if not any(texts):
+            return
+        self._text[cid] = texts
+        for g, mask in self._grams_of(texts).items():
+            bucket = self._post.get(g)
+            if bucket is None:
+                bucket = self._post[g] = {}
+                for ch in set(g):
+                    self._by_char.setdefault(ch, set()).add(g)
+            bucket[cid] = mask
+
+    def remove(self, cid: Any) -> None:
+        texts = self._text.pop(cid, None)
+        if texts is None:
+            return
+        for g in self._grams_of(texts):
+            bucket = self._post.get(g)
+            if bucket is None:
+                continue
+            bucket.pop(cid, None)
+            if not bucket:
+                del self._post[g]
+                for ch in set(g):
+                    chars = self._by_char.get(ch)
+                    if chars is not None:
+                        chars.discard(g)
+                        if not chars:
+                            del self._by_char[ch]
+
+    # ---------- 읽기 ----------
+    def _candidates(self, term: str) -> Dict[Any, int]:
+        """질의어 1개 → {카드: 필드 비트} (bigram 이 모두 같은 필드에 있는 카드만, 위치 확인 전)."""
+        if len(term) == 1:
+            out: Dict[Any, int] = {}
+            for g in self._by_char.get(term, ()):
+                for cid, m in self._post[g].items():
+                    out[cid] = out.get(cid, 0) | m
+            return out
+        lists = [self._post.get(g) for g in _grams(term)]
+        if not all(lists):
+            return {}
+        lists.sort(key=len)
+        out = dict(lists[0])
+        for other in lists[1:]:
+            out = {cid: m & other[cid] for cid, m in out.items() if cid in other and m & other[cid]}
+            if not out:
+                break
+        return out
+
+    def _verify(self, cid: Any, term: str, mask: int) -> float:
+        """후보의 압축 텍스트에서 질의어 위치 확인 → 점수 (없으면 0)."""
+        title, summ = self._text[cid]
+        exact = len(term) <= 2    # 두 글자 이하는 포스팅 자체가 정확한 위치 정보
+        s = 0.0
+        if mask & F_TITLE:
+            if title.startswith(term):
+                s += _W[F_TITLE] + PREFIX_BONUS
+            elif exact or term in title:
+                s += _W[F_TITLE]
+        if mask & F_SUMMARY and (exact or term in summ):
+            s += _W[F_SUMMARY]
+        return s
+
+    def search(self, q: str, limit: int) -> List[Tuple[Any, float]]:
+        """모든 질의어가 등장하는 카드 중 점수 상위 limit개 (카드 _id, 점수)."""
+        terms = query_terms(q)
+        if not terms or limit <= 0:
+            return []
+        # 후보가 적은 질의어부터 좁혀 간다
+        pairs = sorted(((t, self._candidates(t)) for t in terms), key=lambda p: len(p[1]))
+        if not pairs[0][1]:
+            return []
+        scored: List[Tuple[float, int, Any]] = []
+        for cid in pairs[0][1]:
+            total = 0.0
+            for term, cand in pairs:
+                mask = cand.get(cid)
+                s = self._verify(cid, term, mask) if mask else 0.0
+                if not s:
+                    break
+                total += s
+            else:
+                scored.append((total, -len(self._text[cid][0]), cid))
+        top = heapq.nlargest(limit, scored, key=lambda x: (x[0], x[1]))
+        return [(cid, s) for s, _, cid in top]
+
+
+# ---------- 전역 인스턴스 + Mongo 연동 ----------
+_text_index = TextIndex()
+_building = BuildBuffer()
+
+
+def get_text_index() -> TextIndex:
+    return _text_index
+
+
+async def build_text_index(db, batch_size: int = 2000) -> TextIndex:
+    """recipe_cards 제목/요약으로 새 bigram 색인을 만든 뒤 원자적으로 교체."""
+    global _text_index
+    t0 = time.perf_counter()
+    fresh = TextIndex()
+    _building.start()
+    try:
+        async for doc in db["recipe_cards"].find({}, TEXT_PROJECTION).batch_size(batch_size):
+            fresh.upsert(doc)
+    except BaseException:
+        _building.cancel()
+        raise
+    fresh.ready = True
+    _text_index = fresh
+    _building.replay(fresh)
+    log.info("text index built: cards=%d grams=%d (%.1f ms)",
+             len(fresh), len(fresh._post), (time.perf_counter() - t0) * 1000)
+    return fresh
+
+
+def regex_query(q: str) -> Optional[Dict[str, Any]]:
+    """색인 빌드 전 폴백용 Mongo 조건 (질의어별 제목/요약 정규식 AND). 질의어가 없으면 None."""
+    words = [w for w in (q or "").split() if compact_text(w)]
+    if not words:
+        return None
+    conds = [
+        {"$or": [{"title": {"$regex": re.escape(w), "$options": "i"}},
+                 {"summary": {"$regex": re.escape(w), "$options": "i"}}]}
+        for w in dict.fromkeys(words)
+    ]
+    return conds[0] if len(conds) == 1 else {"$and": conds}
+
+
+async def search_recipes(db, q: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """제목/요약 검색 → 표시용 카드 (색인 준비 전이면 정규식 스캔 폴백)."""
+    col = db["recipe_cards"]
+    if _text_index.ready:
+        await sync_card_index(db)
+        ids = [cid for cid, _ in _text_index.search(q, limit)]
+        return await _hydrate_or_prune(col, ids)
+    cond = regex_query(q)
+    if cond is None:
+        return []
+    return await col.find(cond, CARD_PROJECTION).limit(limit).to_list(length=limit)
+
+
+# card_index 증분 갱신 경로에 연결 (리스너 문서는 INDEX_PROJECTION 이라 title/summary 포함)
+# 빌드 중 변경은 _building 에 모았다가 교체 직후 새 인덱스에 재생
+def _on_upsert(doc: Dict[str, Any]) -> None:
+    _building.upsert(doc)
+    if _text_index.ready:
+        _text_index.upsert(doc)
+
+
+def _on_remove(cid: Any) -> None:
+    _building.remove(cid)
+    _text_index.remove(cid)
+
+
+add_card_listener(_on_upsert, _on_remove)
@@ -0,0 +1,83 @@
+# app/services/crawl10000/vocab.py
+# 목적: 재료 어휘(동의어 → 표준 라벨, 재료명 → slug, 불용어)의 메모리 스냅샷
+# - 기준 데이터는 Mongo ingredient_vocab 컬렉션 (vocab_store.py 가 읽어 와 install)
+#   DB 를 못 읽었거나 아직 안 읽었으면 코드 기본값(models/tags.py) 으로 동작 (version=0)
+# - Vocabulary 는 만들어진 뒤 바뀌지 않는다: 컴파일된 정규화기/slug 사전/라벨 목록을 한 객체에 묶고
+#   새 버전은 새 객체를 만들어 전역 참조 1개만 바꿔 끼운다 → 요청 중간에 반쯤 바뀐 어휘를 볼 일이 없고 DB 조회도 없음
+# - 호출부는 한 작업 안에서 get_vocabulary() 를 한 번 잡아 쓰면 같은 버전으로 일관된다
+
+from __future__ import annotations
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from app.models.tags import _CANON_SYNONYMS, _KOR2SLUG, CANON, EN_STOP, KOREAN_STOP
+from app.services.crawl10000.normalizer import IngredientNormalizer
+
+_RX_SLUG = re.compile(r"[a-zA-Z_]+")
+_RX_SLUG_PUNCT = re.compile(r"[\s·,()/\[\]-]+")
+
+
+def clean_term(term: Any) -> str:
+    return str(term or "").strip().lower()
+
+
+def default_entries() -> Dict[str, Dict[str, Any]]:
+    """코드 기본값 → {term: {label, slug, stop}} (컬렉션 최초 시드용)."""
+    out: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(term: str) -> Dict[str, Any]:
+        return out.setdefault(clean_term(term), {"label": None, "slug": None, "stop": False})
+
+    for term, label in _CANON_SYNONYMS.items():
+        _entry(term)["label"] = label
+    for term, slug in _KOR2SLUG.items():
+        _entry(term)["slug"] = slug
+    for term in KOREAN_STOP | EN_STOP:
+        _entry(term)["stop"] = True
+    return out
+
+
+class Vocabulary:
+    """어휘 한 버전. entries: {term: {"label": 표준 한글 라벨|None, "slug": slug|None, "stop": bool}}"""
+
+    def __init__(self, entries: Dict[str, Dict[str, Any]], version: int = 0) -> None:
+        self.version = version
+        self.entries = entries
+        self.synonyms: Dict[str, str] = {t: e["label"] for t, e in entries.items() if e.get("label")}
+        self.slugs: Dict[str, str] = {t: e["slug"] for t, e in entries.items() if e.get("slug")}
+        self.stop: Set[str] = {t for t, e in entries.items() if e.get("stop")}
+        # 표준 재료 라벨 전체 (긴 것 우선) — 합성어("감자볶음") 속 재료명 보강용
+        self.labels: List[str] = sorted(set(self.synonyms.values()) | set(CANON["main"]), key=len, reverse=True)
+        self.normalizer = IngredientNormalizer(self.synonyms, stop=self.stop)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def slug(self, token: str) -> Optional[str]:
+        """한글/영문 토큰 → 내부 slug (사전에 없고 영문이면 소문자 그대로, 그 외 None)."""
+        token = (token or "").strip()
+        if not token:
+            return None
+        if token in self.slugs:
+            return self.slugs[token]
+        if _RX_SLUG.fullmatch(token):
+            return token.lower()
+        # 공백/기호 제거 후 재매핑 시도
+        return self.slugs.get(_RX_SLUG_PUNCT.sub("", token)) or None
+
+    def is_stop(self, tok: str) -> bool:
+        return clean_term(tok) in self.stop
+
+
+_vocab = Vocabulary(default_entries())
+
+
+def get_vocabulary() -> Vocabulary:
+    return _vocab
+
+
+def set_vocabulary(vocab: Vocabulary) -> Vocabulary:
+    """새 버전으로 교체 (참조 1개 대입이라 원자적). 이전 버전을 돌려준다."""
+    global _vocab
+    prev, _vocab = _vocab, vocab
+    return prev
@@ -0,0 +1,305 @@
+# app/services/crawl10000/vocab_store.py
+# 목적: 재료 어휘의 단일 기준(Mongo) + 무중단 핫 리로드 + 저장된 토큰 재정규화
+# - ingredient_vocab: { _id: term(소문자), label: 표준 한글 라벨|None, slug: slug|None, stop: bool }
+#   vocab_meta(_id="ingredient_vocab"): { version, updated_at, renorm_done, renorm_lease }
+#   비어 있으면 코드 기본값(models/tags.py)으로 1회 시드 (version=1)
+# - 어휘를 고치면(update_entries) version +1 → 각 프로세스의 VocabWatcher 가 POLL_SEC 마다 version 만 보고
+#   바뀌었으면 전체를 읽어 새 Vocabulary(컴파일 포함)를 만든 뒤 참조 교체 — 요청 경로는 DB 를 읽지 않음
+# - 교체되면 추천 캐시를 비우고 재정규화 작업을 시작:
+#   recipe_cards / recipes 에서 vocab_version != 현재 버전인 문서만 다시 토큰화해 bulk_write
+#   토큰이 실제로 바뀐 카드만 updated_at 을 올려 인메모리 역색인/커버리지가 다음 sync 에서 다시 읽게 한다
+#   여러 프로세스 중 1곳만 돌도록 vocab_meta 에 임대(renorm_lease)를 잡고, 도중에 버전이 또 바뀌면 중단(새 버전이 이어받음)
+# 수동 실행: python -m app.scripts.renormalize_tokens
+
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import re
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.services.crawl10000.card_index import INDEX_PROJECTION, build_search_fields
+from app.services.crawl10000.etl import normalize_ingredients as etl_normalize
+from app.services.crawl10000.reco_cache import invalidate_reco_cache
+from app.services.crawl10000.seed_ing import recipe_token_fields
+from app.services.crawl10000.vocab import Vocabulary, clean_term, default_entries, get_vocabulary, set_vocabulary
+
+log = logging.getLogger(__name__)
+
+VOCAB_COL = "ingredient_vocab"
+META_COL = "vocab_meta"
+META_ID = "ingredient_vocab"
+
+POLL_SEC = float(getattr(settings, "VOCAB_POLL_SEC", 10.0) or 10.0)
+RENORMALIZE = bool(getattr(settings, "VOCAB_RENORMALIZE", True))
+BATCH = max(1, int(getattr(settings, "VOCAB_RENORM_BATCH", 500) or 500))
+LEASE_SEC = 120.0    # 재정규화 임대 — 배치마다 연장, 프로세스가 죽으면 이만큼 뒤 다른 곳이 이어받음
+
+_RX_SLUG = re.compile(r"[a-z0-9_]+")
+_RENORM_CARD_PROJECTION = {**INDEX_PROJECTION, "search_tokens": 1}
+_RENORM_FIELDS = ("search_fields", "has_full", "search_tokens", "ing_tokens")
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+# ---------- 저장소 ----------
+async def seed_defaults(db) -> None:
+    """컬렉션이 비어 있으면 코드 기본값으로 채움 (여러 프로세스가 동시에 불러도 안전)."""
+    if await db[VOCAB_COL].estimated_document_count() == 0:
+        docs = [{"_id": t, **e, "updated_at": _now()} for t, e in default_entries().items()]
+        try:
+            await db[VOCAB_COL].insert_many(docs, ordered=False)
+        except BulkWriteError:
+            pass   # 다른 프로세스가 먼저 넣은 항목
+    await db[META_COL].update_one(
+        {"_id": META_ID}, {"$setOnInsert": {"version": 1, "updated_at": _now()}}, upsert=True,
+    )
+
+
+async def current_version(db) -> int:
+    meta = await db[META_COL].find_one({"_id": META_ID}, {"version": 1})
+    return int((meta or {}).get("version") or 0)
+
+
+async def load_vocabulary(db, seed: bool = True) -> Vocabulary:
+    """컬렉션 전체 → 새 Vocabulary. version 을 먼저 읽으므로 읽는 도중 바뀐 내용은 다음 확인에서 다시 반영된다."""
+    if seed:
+        await seed_defaults(db)
+    version = await current_version(db)
+    entries: Dict[str, Dict[str, Any]] = {}
+    async for d in db[VOCAB_COL].find({}):
+        term = clean_term(d.get("_id"))
+        if term:
+            entries[term] = {"label": d.get("label") or None, "slug": d.get("slug") or None, "stop": bool(d.get("stop"))}
+    return Vocabulary(entries, version=version)
+
+
+def check_entry(e: Dict[str, Any]) -> Dict[str, Any]:
+    """API 입력 1건 검증 → 저장 형태. 잘못되면 ValueError."""
+    term = clean_term(e.get("term"))
+    if not term:
+        raise ValueError("term is required")
+    label = str(e.get("label") or "").strip() or None
+    slug = str(e.get("slug") or "").strip().lower() or None
+    if slug is not None and not _RX_SLUG.fullmatch(slug):
+        raise ValueError(f"invalid slug for {term!r}: {slug!r} (a-z, 0-9, _)")
+    stop = bool(e.get("stop"))
+    if label is None and slug is None and not stop:
+        raise ValueError(f"{term!r}: one of label/slug/stop is required")
+    return {"_id": term, "label": label, "slug": slug, "stop": stop}
+
+
+async def update_entries(db, upserts: List[Dict[str, Any]], delete: List[str]) -> int:
+    """항목 추가/수정/삭제 후 version +1. 새 version 반환 (검증 실패 시 아무것도 쓰지 않고 ValueError)."""
+    docs = [check_entry(e) for e in upserts or []]
+    terms = [t for t in (clean_term(x) for x in delete or []) if t]
+    await seed_defaults(db)
+    now = _now()
+    ops = [UpdateOne({"_id": d["_id"]}, {"$set": {**d, "updated_at": now}}, upsert=True) for d in docs]
+    if ops:
+        await db[VOCAB_COL].bulk_write(ops, ordered=False)
+    if terms:
+        await db[VOCAB_COL].delete_many({"_id": {"$in": terms}})
+    meta = await db[META_COL].find_one_and_update(
+        {"_id": META_ID}, {"$inc": {"version": 1}, "$set": {"updated_at": now}},
+        upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    return int(meta["version"])
+
+
+# ---------- 재정규화 ----------
+async def _claim_renorm(db, version: int, owner: str) -> bool:
+    now = _now()
+    got = await db[META_COL].find_one_and_update(
+        {"_id": META_ID, "version": version, "renorm_done": {"$ne": version},
+         "$or": [{"renorm_lease": {"$exists": False}}, {"renorm_lease": {"$lt": now}}]},
+        {"$set": {"renorm_lease": now + timedelta(seconds=LEASE_SEC), "renorm_owner": owner}},
+    )
+    return got is not None
+
+
+async def _renew_renorm(db, version: int) -> None:
+    await db[META_COL].update_one(
+        {"_id": META_ID, "version": version},
+        {"$set": {"renorm_lease": _now() + timedelta(seconds=LEASE_SEC)}},
+    )
+
+
+async def renormalize_tokens(db, batch: int = BATCH, claim: bool = True) -> Dict[str, Any]:
+    """
+    현재 어휘 버전과 다른 vocab_version 을 가진 recipe_cards/recipes 를 다시 토큰화.
+    claim=False 면 임대 없이 바로 실행 (수동 스크립트).
+    """
+    vocab = get_vocabulary()
+    version = vocab.version
+    stats: Dict[str, Any] = {"version": version, "cards": 0, "cards_changed": 0, "recipes": 0, "aborted": False}
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    if claim and not await _claim_renorm(db, version, owner):
+        stats["skipped"] = True
+        return stats
+
+    async def _flush(col, ops: List[UpdateOne]) -> bool:
+        if ops:
+            await col.bulk_write(ops, ordered=False)
+            ops.clear()
+        if claim:
+            await _renew_renorm(db, version)
+        return get_vocabulary().version == version   # 도중에 새 버전이 들어오면 중단
+
+    # 1) recipe_cards: search_fields/search_tokens/ing_tokens
+    col = db["recipe_cards"]
+    ops: List[UpdateOne] = []
+    async for d in col.find({"vocab_version": {"$ne": version}}, _RENORM_CARD_PROJECTION).batch_size(batch):
+        fields = build_search_fields(d)
+        stats["cards"] += 1
+        if any(d.get(k) != fields[k] for k in _RENORM_FIELDS):
+            stats["cards_changed"] += 1
+            sets = {**fields, "updated_at": _now()}
+        else:
+            sets = {"vocab_version": version}
+        ops.append(UpdateOne({"_id": d["_id"], "vocab_version": {"$ne": version}}, {"$set": sets}))
+        if len(ops) >= batch and not await _flush(col, ops):
+            stats["aborted"] = True
+            return stats
+    if not await _flush(col, ops):
+        stats["aborted"] = True
+        return stats
+
+    # 2) recipes: ingredients.norm_ko/norm_slug(/norm), search_tokens
+    col = db["recipes"]
+    async for d in col.find({"vocab_version": {"$ne": version}}, {"embedding": 0}).batch_size(batch):
+        sets = recipe_token_fields(d)
+        ing = sets.get("ingredients")
+        if ing is not None and "norm" in ing:   # etl.upsert_recipe 스키마
+            ing["norm"] = etl_normalize(ing["raw"])
+        stats["recipes"] += 1
+        ops.append(UpdateOne({"_id": d["_id"], "vocab_version": {"$ne": version}}, {"$set": sets}))
+        if len(ops) >= batch and not await _flush(col, ops):
+            stats["aborted"] = True
+            return stats
+    if not await _flush(col, ops):
+        stats["aborted"] = True
+        return stats
+
+    if claim:
+        await db[META_COL].update_one(
+            {"_id": META_ID, "version": version},
+            {"$set": {"renorm_done": version, "renorm_at": _now()}, "$unset": {"renorm_lease": "", "renorm_owner": ""}},
+        )
+    log.info("vocab v%d renormalized: %s", version, stats)
+    return stats
+
+
+# ---------- 핫 리로드 ----------
+class VocabWatcher:
+    def __init__(self, poll_sec: float = POLL_SEC, renormalize: bool = RENORMALIZE) -> None:
+        self.poll_sec = poll_sec
+        self.renormalize = renormalize
+        self._db = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._renorm: Optional["asyncio.Task[Dict[str, Any]]"] = None
+        self.last_renorm: Optional[Dict[str, Any]] = None
+        self.stats = {"reloads": 0, "checks": 0, "errors": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self, db) -> Vocabulary:
+        if self._task is not None:
+            return get_vocabulary()
+        self._db = db
+        vocab = await load_vocabulary(db)
+        self.install(vocab)
+        self._task = asyncio.create_task(self._loop())
+        return vocab
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._task, self._renorm) if t is not None]
+        self._task = self._renorm = None
+        for t in tasks:
+            t.cancel()
+        for t in tasks:
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def install(self, vocab: Vocabulary) -> None:
+        prev = set_vocabulary(vocab)
+        if prev.version != vocab.version:
+            invalidate_reco_cache()   # 같은 입력이라도 토큰이 달라졌을 수 있음
+        self.stats["reloads"] += 1
+        log.info("vocab v%d installed (%d entries)", vocab.version, len(vocab))
+        self._kick()
+
+    async def check(self) -> bool:
+        """DB version 이 다르면 다시 읽어 교체. 교체했으면 True."""
+        self.stats["checks"] += 1
+        meta = await self._db[META_COL].find_one({"_id": META_ID}, {"version": 1, "renorm_done": 1}) or {}
+        version = int(meta.get("version") or 0)
+        if version == get_vocabulary().version:
+            if meta.get("renorm_done") != version:
+                self._kick()   # 재정규화를 맡은 프로세스가 죽었으면 임대 만료 후 여기서 이어받음
+            return False
+        self.install(await load_vocabulary(self._db, seed=False))
+        return True
+
+    def _kick(self) -> None:
+        if not self.renormalize or self._db is None:
+            return
+        if self._renorm is not None and not self._renorm.done():
+            return   # 진행 중인 작업은 버전이 바뀐 것을 보고 스스로 멈춤 → 끝나면 _done 에서 다시 시작
+        self._renorm = asyncio.create_task(renormalize_tokens(self._db))
+        self._renorm.add_done_callback(self._done)
+
+    def _done(self, fut: "asyncio.Future[Dict[str, Any]]") -> None:
+        if fut.cancelled():
+            return
+        if fut.exception() is not None:
+            self.stats["errors"] += 1
+            log.warning("vocab renormalize failed: %s", fut.exception())
+            return
+        self.last_renorm = fut.result()
+        if self.last_renorm.get("version") != get_vocabulary().version:
+            self._kick()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_sec)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                log.warning("vocab check failed: %s", e)
+
+    def snapshot(self) -> Dict[str, Any]:
+        vocab = get_vocabulary()
+        running = self._renorm is not None and not self._renorm.done()
+        return {"version": vocab.version, "entries": len(vocab), "renormalizing": running,
+                "last_renorm": self.last_renorm, **self.stats}
+
+
+_watcher = VocabWatcher()
+
+
+def get_vocab_watcher() -> VocabWatcher:
+    return _watcher
+
+
+async def start_vocab_watcher(db) -> Vocabulary:
+    return await _watcher.start(db)
+
+
+async def stop_vocab_watcher() -> None:
+    await _watcher.stop()
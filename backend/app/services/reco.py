@@ -1,5 +1,8 @@
 # 추천 점수/칼로리 타깃 계산 — 지용 담당
-from typing import Dict
+from typing import Any, Dict, List
+
+from app.services.crawl10000.recommender import hybrid_recommend
+from app.services.crawl10000.seed_ing import normalize_ingredients_ko
 
 def calc_target_kcal(weight_kg: float, target_weight_kg: float, days: int, activity: float = 1.35) -> int:
     # 매우 단순한 일일 타깃 계산 (MVP)
@@ -14,3 +17,35 @@ def score_recipe(recipe: Dict, target_kcal: int) -> float:
     calorie_fit = 1 - min(abs(kcal - target_kcal) / max(1, target_kcal), 1)  # 0~1
     trend = float(recipe.get("trend_score", 0.0))  # 0~1 가정
     return 0.8 * calorie_fit + 0.2 * trend
+
+def _str_list(v: Any) -> List[str]:
+    # list / {raw, norm_ko, ...} / str 혼합 스키마 → 표시용 문자열 목록 (dict는 원문 raw 우선)
+    if isinstance(v, dict):
+        v = v.get("raw") or v.get("norm_ko") or []
+    if isinstance(v, str):
+        v = [v]
+    if not isinstance(v, list):
+        return []
+    return [str(x).strip() for x in v if isinstance(x, (str, int, float)) and str(x).strip()]
+
+async def find_recipes_by_ingredients(db, ings: List[str], limit: int = 12, ranking: str = "auto") -> List[Dict[str, Any]]:
+    """
+    원재료명 → 정규화 토큰 → hybrid_recommend (/recipes/recommend 와 같은 역색인/랭킹/결과 캐시 경로).
+    /photo 라우터가 바로 쓰는 필드(_id/title/description/ingredients/steps/imageUrl/tags)로 평탄화해서 반환.
+    """
+    tokens = normalize_ingredients_ko(ings)
+    if not tokens:
+        return []
+    cards = await hybrid_recommend(db, tokens, limit=limit, ranking=ranking)
+    return [
+        {
+            "_id": str(c.get("_id") or c.get("id") or ""),
+            "title": c.get("title") or "",
+            "description": c.get("summary") or c.get("description") or "",
+            "ingredients": _str_list(c.get("ingredients_full")) or _str_list(c.get("ingredients")),
+            "steps": _str_list(c.get("steps_full")) or _str_list(c.get("steps")),
+            "imageUrl": c.get("imageUrl") or None,
+            "tags": _str_list(c.get("tags")) or _str_list(c.get("chips")),
+        }
+        for c in cards
+    ]
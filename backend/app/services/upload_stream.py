@@ -0,0 +1,168 @@
+# app/services/upload_stream.py
+# 목적: 멀티파트 업로드를 스트리밍으로 파싱하면서 바로 제한 적용 (request.form() 전체 버퍼링 대체)
+# - Content-Length 가 요청 상한을 넘으면 본문을 읽기 전에 거절
+# - 청크 단위로 읽으면서 파일별/요청별 바이트 예산을 검사 → 넘는 순간 중단 (끝까지 받지 않음)
+# - 파일 파트의 첫 바이트로 실제 형식 판정(sniff_mime): JPEG/PNG/WebP 가 아니면 버퍼링하지 않고 건너뜀
+#   (클라이언트가 보낸 Content-Type 은 믿지 않음)
+# - 최대 파일 수를 넘는 이미지 파트도 버퍼링하지 않음 → Vision 단계에는 상한이 정해진 버퍼만 전달
+
+from __future__ import annotations
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header   # python-multipart>=0.0.13
+except Exception:
+    from multipart.multipart import MultipartParser, parse_options_header          # type: ignore
+
+from app.core.config import settings
+from app.services.image_prep import sniff_mime
+
+log = logging.getLogger(__name__)
+
+MAX_FILES = int(getattr(settings, "UPLOAD_MAX_FILES", 9) or 9)
+MAX_FILE_BYTES = int(getattr(settings, "UPLOAD_MAX_FILE_BYTES", 10 * 1024 * 1024) or 10 * 1024 * 1024)
+MAX_TOTAL_BYTES = int(getattr(settings, "UPLOAD_MAX_TOTAL_BYTES", 50 * 1024 * 1024) or 50 * 1024 * 1024)
+ALLOWED_MIMES = ("image/jpeg", "image/png", "image/webp")
+_SNIFF_BYTES = 12   # sniff_mime 이 보는 최대 바이트 수
+
+
+class UploadRejected(Exception):
+    # 업로드 거절 (라우터에서 status_code 그대로 HTTPException 으로 변환)
+    def __init__(self, status_code: int, detail: Any) -> None:
+        super().__init__(str(detail))
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _Part:
+    __slots__ = ("name", "filename", "head", "buf", "state", "size")
+
+    def __init__(self) -> None:
+        self.name = ""
+        self.filename: Optional[str] = None
+        self.head = bytearray()       # 형식 판정 전 앞부분
+        self.buf: Optional[bytearray] = None
+        self.state = "sniff"          # sniff → keep | skip
+        self.size = 0
+
+
+class ImageCollector:
+    """MultipartParser 콜백 묶음: 허용된 이미지 파트만 bytearray 로 모은다."""
+
+    def __init__(self, max_files: int, max_file_bytes: int) -> None:
+        self.max_files = max_files
+        self.max_file_bytes = max_file_bytes
+        self.images: List[bytes] = []
+        self.skipped: Dict[str, int] = {}
+        self._part: Optional[_Part] = None
+        self._hname = bytearray()
+        self._hvalue = bytearray()
+        self._headers: Dict[bytes, bytes] = {}
+
+    def callbacks(self) -> Dict[str, Any]:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": lambda d, s, e: self._hname.extend(d[s:e]),
+            "on_header_value": lambda d, s, e: self._hvalue.extend(d[s:e]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        }
+
+    def _skip(self, p: _Part, why: str) -> None:
+        p.state, p.head, p.buf = "skip", bytearray(), None
+        self.skipped[why] = self.skipped.get(why, 0) + 1
+
+    def _on_part_begin(self) -> None:
+        self._part = _Part()
+        self._headers = {}
+
+    def _on_header_end(self) -> None:
+        self._headers[bytes(self._hname).lower()] = bytes(self._hvalue)
+        self._hname.clear()
+        self._hvalue.clear()
+
+    def _on_headers_finished(self) -> None:
+        p = self._part
+        _, opts = parse_options_header(self._headers.get(b"content-disposition", b""))
+        p.name = (opts.get(b"name") or b"").decode("utf-8", "replace")
+        fn = opts.get(b"filename")
+        p.filename = fn.decode("utf-8", "replace") if fn is not None else None
+        if p.filename is None:
+            p.state = "skip"            # 일반 폼 필드는 무시 (파라미터는 쿼리로 받음)
+        elif len(self.images) >= self.max_files:
+            self._skip(p, "too_many")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        p = self._part
+        if p is None or p.state == "skip":
+            return
+        chunk = data[start:end]
+        p.size += len(chunk)
+        if p.size > self.max_file_bytes:
+            raise UploadRejected(413, {
+                "msg": "파일이 너무 큽니다.", "file": p.filename, "limit_bytes": self.max_file_bytes,
+            })
+        if p.state == "sniff":
+            p.head.extend(chunk)
+            if len(p.head) < _SNIFF_BYTES:
+                return
+            self._decide(p)
+        elif p.buf is not None:
+            p.buf.extend(chunk)
+
+    def _decide(self, p: _Part) -> None:
+        mime = sniff_mime(bytes(p.head))
+        if mime not in ALLOWED_MIMES:
+            self._skip(p, mime or "unknown")
+            return
+        p.state, p.buf, p.head = "keep", p.head, bytearray()
+
+    def _on_part_end(self) -> None:
+        p = self._part
+        self._part = None
+        if p is None or p.state == "skip":
+            return
+        if p.state == "sniff":          # 12바이트도 안 되는 파트
+            if not p.head:
+                return
+            self._decide(p)
+        if p.state == "keep" and p.buf:
+            self.images.append(bytes(p.buf))
+
+
+async def read_images(
+    request: Any,
+    max_files: int = MAX_FILES,
+    max_file_bytes: int = MAX_FILE_BYTES,
+    max_total_bytes: int = MAX_TOTAL_BYTES,
+) -> List[bytes]:
+    """
+    multipart/form-data 요청 본문 → 허용 형식 이미지 바이트 목록 (최대 max_files, 업로드 순서 유지).
+    제한 초과는 UploadRejected(413), 멀티파트가 아니면 빈 목록.
+    """
+    ctype, opts = parse_options_header(request.headers.get("content-type", ""))
+    if ctype != b"multipart/form-data" or not opts.get(b"boundary"):
+        return []
+    try:
+        declared = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        declared = 0
+    if declared > max_total_bytes:
+        raise UploadRejected(413, {"msg": "업로드 용량이 너무 큽니다.", "limit_bytes": max_total_bytes})
+
+    col = ImageCollector(max_files, max_file_bytes)
+    parser = MultipartParser(opts[b"boundary"], col.callbacks())
+    total = 0
+    async for chunk in request.stream():
+        total += len(chunk)
+        if total > max_total_bytes:
+            raise UploadRejected(413, {"msg": "업로드 용량이 너무 큽니다.", "limit_bytes": max_total_bytes})
+        parser.write(chunk)
+    parser.finalize()
+
+    if col.skipped:
+        log.info("upload: kept %d images, skipped %s (%d bytes read)", len(col.images), col.skipped, total)
+    return col.images
@@ -0,0 +1,136 @@
+# app/services/vision_cache.py
+# 목적: Vision 재료 추출 결과 캐시 (같은 냉장고 사진 재업로드/프론트 재시도 시 gpt-4o 왕복 생략)
+# - 키: 이미지별 sha256을 정렬·중복 제거한 집합 + 프롬프트/모델 버전 해시 (업로드 순서와 무관)
+# - 1단계: 프로세스 메모리 LRU, 2단계: 디스크(JSON 파일, 재시작 후에도 유지, TTL)
+# - 싱글플라이트: 같은 키의 동시 요청은 업스트림 호출 1번을 공유
+# - 빈 결과(실패/타임아웃 포함)와 일부 호출만 성공한 결과(PartialItems)는 캐시하지 않는다
+#   (호출자와 합류한 대기자에게는 그대로 돌려준다)
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = str(getattr(settings, "VISION_CACHE_DIR", "") or os.getenv("VISION_CACHE_DIR", ".cache/vision"))
+MEM_MAX = int(getattr(settings, "VISION_CACHE_MAX", 256) or 256)
+DISK_TTL_SEC = float(getattr(settings, "VISION_CACHE_TTL_SEC", 7 * 24 * 3600) or 0)
+
+Items = List[Dict[str, Any]]
+
+
+class PartialItems(list):
+    """여러 업스트림 호출 중 일부가 실패한 결과 — 응답에는 쓰되 캐시에는 넣지 않는다."""
+
+
+def images_key(images: List[bytes], version: str = "") -> str:
+    """이미지 바이트 집합 → 캐시 키 (순서/중복 무시)."""
+    digests = sorted({hashlib.sha256(b).hexdigest() for b in images if b})
+    h = hashlib.sha256(version.encode("utf-8"))
+    for d in digests:
+        h.update(d.encode("ascii"))
+    return h.hexdigest()
+
+
+class VisionCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, mem_max: int = MEM_MAX, disk_ttl: float = DISK_TTL_SEC,
+                 enabled: bool = True) -> None:
+        self.enabled = enabled   # False: 저장/조회 없이 싱글플라이트만 (부하 벤치용)
+        self.cache_dir = cache_dir
+        self.mem_max = mem_max
+        self.disk_ttl = disk_ttl
+        self._mem: "OrderedDict[str, Items]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Items]"] = {}
+        self.stats = {"mem_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+    # ---------- 메모리 ----------
+    def _mem_get(self, key: str) -> Optional[Items]:
+        v = self._mem.get(key)
+        if v is not None:
+            self._mem.move_to_end(key)
+        return v
+
+    def _mem_put(self, key: str, items: Items) -> None:
+        self._mem[key] = items
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_max:
+            self._mem.popitem(last=False)
+
+    # ---------- 디스크 ----------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[Items]:
+        path = self._path(key)
+        try:
+            if self.disk_ttl and time.time() - os.path.getmtime(path) > self.disk_ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            return obj if isinstance(obj, list) else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("vision cache read failed (%s): %s", key[:12], e)
+            return None
+
+    def _disk_put(self, key: str, items: Items) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(items, f, ensure_ascii=False)
+            os.replace(tmp, path)   # 원자적 교체 (동시 쓰기/중단 시 깨진 파일 방지)
+        except Exception as e:
+            log.warning("vision cache write failed (%s): %s", key[:12], e)
+
+    # ---------- 조회 + 싱글플라이트 ----------
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Items]]) -> Items:
+        hit = self._mem_get(key) if self.enabled else None
+        if hit is not None:
+            self.stats["mem_hits"] += 1
+            return list(hit)
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.stats["coalesced"] += 1
+            return list(await asyncio.shield(fut))
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            items = await asyncio.to_thread(self._disk_get, key) if self.enabled else None
+            if items is not None:
+                self.stats["disk_hits"] += 1
+                self._mem_put(key, items)
+            else:
+                self.stats["misses"] += 1
+                items = await compute()
+                if items and self.enabled and not isinstance(items, PartialItems):
+                    self._mem_put(key, items)
+                    await asyncio.to_thread(self._disk_put, key, items)
+            fut.set_result(items)
+            return list(items)
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()   # 대기자가 없을 때 "never retrieved" 경고 방지
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+
+_cache = VisionCache()
+
+
+def get_vision_cache() -> VisionCache:
+    return _cache
@@ -0,0 +1,121 @@
+# app/services/vision_local.py
+# 목적: 네트워크/과금 없는 결정적 Vision 프로바이더 (VISION_PROVIDER=local, 부하 테스트/로컬 개발용)
+# - 매핑 파일(VISION_LOCAL_MAP, JSON): { "<sha256 hex>" | "<파일명>": ["감자", {"name": "양파", "confidence": 0.7}, ...] }
+#   파일명 키는 매핑 파일 기준 상대 경로의 실제 이미지를 읽어 sha256으로 바꿔 둔다 (업로드 파일명은 보지 않음)
+# - 매핑에 없는 사진은 해시로 VISION_LOCAL_VOCAB 에서 2~5개를 결정적으로 고른다 (같은 사진 → 항상 같은 결과)
+# - 지연 주입: 호출 1회당 VISION_LOCAL_LATENCY_MS ± VISION_LOCAL_JITTER_MS (지터도 해시로 결정적)
+#   OpenAI 경로와 같은 세마포어(VISION_MAX_CONCURRENCY)를 잡아 업스트림 대기열까지 재현
+# - 모드: single/cascade 는 호출 1회, fanout 은 사진(묶음)별 병렬 호출 — 결과 병합은 OpenAI 경로와 동일
+#   stream 은 지연의 STREAM_FIRST 비율이 지난 뒤부터 남은 시간 동안 재료 항목을 고르게 흘려보낸다 (항목 앞머리에 이름)
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from typing import Any, Callable, Dict, List
+
+from app.core.config import settings
+from app.services.vision_openai import FANOUT_GROUP, FANOUT_MERGE, VisionProvider, _sem, merge_items
+
+log = logging.getLogger(__name__)
+
+MAP_PATH = str(getattr(settings, "VISION_LOCAL_MAP", "") or "")
+LATENCY_MS = float(getattr(settings, "VISION_LOCAL_LATENCY_MS", 800.0) or 0.0)
+JITTER_MS = float(getattr(settings, "VISION_LOCAL_JITTER_MS", 200.0) or 0.0)
+DEFAULT_VOCAB = (
+    "감자 양파 계란 두부 애호박 당근 대파 마늘 버섯 돼지고기 닭가슴살 소고기 "
+    "오이 고등어 김치 참치 토마토 브로콜리 양배추 파프리카 시금치 콩나물 무 베이컨"
+)
+STREAM_FIRST = 0.4   # stream: 첫 재료명이 나오기까지 걸리는 비율 (나머지는 생성 시간으로 분배)
+VOCAB = [w for w in str(getattr(settings, "VISION_LOCAL_VOCAB", "") or DEFAULT_VOCAB).replace(",", " ").split() if w]
+
+
+def _as_items(v: Any) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for x in v if isinstance(v, list) else []:
+        if isinstance(x, str) and x.strip():
+            out.append({"name": x.strip(), "confidence": 1.0})
+        elif isinstance(x, dict) and str(x.get("name") or "").strip():
+            out.append({**x, "name": str(x["name"]).strip()})
+    return out
+
+
+def load_mapping(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """매핑 JSON → {sha256: items}. 파일명 키는 해당 파일을 해시해서 변환."""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for k, v in (raw or {}).items():
+        key = str(k).strip().lower()
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            try:
+                with open(os.path.join(base, str(k)), "rb") as img:
+                    key = hashlib.sha256(img.read()).hexdigest()
+            except OSError as e:
+                log.warning("vision local: skip %s (%s)", k, e)
+                continue
+        out[key] = _as_items(v)
+    return out
+
+
+class LocalVisionProvider(VisionProvider):
+    name = "local"
+
+    def __init__(self, map_path: str = MAP_PATH, latency_ms: float = LATENCY_MS,
+                 jitter_ms: float = JITTER_MS, vocab: List[str] = VOCAB) -> None:
+        self.mapping = load_mapping(map_path)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.vocab = list(vocab)
+        # 매핑/어휘가 바뀌면 캐시 키도 바뀌도록 (지연 설정은 결과에 영향 없음)
+        self.version = hashlib.sha256(
+            json.dumps([sorted(self.mapping.items()), self.vocab], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        log.info("vision local: %d mapped images, vocab=%d, latency=%.0f±%.0f ms",
+                 len(self.mapping), len(self.vocab), latency_ms, jitter_ms)
+
+    def items_for(self, image: bytes) -> List[Dict[str, Any]]:
+        h = hashlib.sha256(image).hexdigest()
+        hit = self.mapping.get(h)
+        if hit is not None:
+            return [dict(it) for it in hit]
+        rng = random.Random(h)
+        k = min(len(self.vocab), rng.randint(2, 5))
+        return [{"name": w, "confidence": round(rng.uniform(0.5, 1.0), 2)} for w in rng.sample(self.vocab, k)]
+
+    def _delay(self, images: List[bytes]) -> float:
+        seed = hashlib.sha256(b"".join(hashlib.sha256(b).digest() for b in images)).hexdigest()
+        return max(0.0, self.latency_ms + random.Random(seed).uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    async def _call(self, images: List[bytes]) -> List[Dict[str, Any]]:
+        # 업스트림 호출 1회 흉내: 같은 동시성 상한 + 결정적 지연
+        delay = self._delay(images)
+        async with _sem:
+            await asyncio.sleep(delay)
+        return merge_items([self.items_for(b) for b in images], how="max")
+
+    async def stream(self, images: List[bytes], mode: str, on_name: Callable[[str], None]) -> List[Dict[str, Any]]:
+        if mode not in ("single", "stream"):
+            return await super().stream(images, mode, on_name)
+        delay = self._delay(images)
+        items = merge_items([self.items_for(b) for b in images], how="max")
+        step = delay * (1 - STREAM_FIRST) / max(1, len(items))
+        async with _sem:
+            await asyncio.sleep(delay * STREAM_FIRST)
+            for it in items:
+                on_name(it["name"])          # 항목은 name 부터 생성되고 amount/confidence 가 뒤따름
+                await asyncio.sleep(step)
+        return items
+
+    async def extract(self, images: List[bytes], mode: str) -> List[Dict[str, Any]]:
+        if mode != "fanout":
+            return await self._call(images)
+        groups = [images[i:i + FANOUT_GROUP] for i in range(0, len(images), FANOUT_GROUP)]
+        results = await asyncio.gather(*[self._call(g) for g in groups])
+        return merge_items(list(results), how=FANOUT_MERGE)
@@ -2,22 +2,38 @@
 # 사진에서 재료 추출 (OpenAI Vision)
 # - Chat Completions만 사용 (Responses API 경로 제거)
 # - JSON 파싱은 최대한 안전하게
+# - AsyncOpenAI 클라이언트 1개(커넥션 풀 공유)를 재사용 → 이벤트 루프를 막지 않음
+# - 세마포어로 동시 Vision 호출 수 제한, 호출마다 타임아웃
+# - 같은 이미지 집합은 vision_cache(메모리 LRU + 디스크, 싱글플라이트)에서 재사용
+# - 전송 전 image_prep 으로 축소/재인코딩/메타데이터 제거, data URL MIME은 실제 형식
+# - 모드: single(한 번에) / cascade(저해상도 우선) / fanout(사진별 병렬 호출 후 병합)
+#         / stream(single 과 같은 호출을 스트리밍으로 받아 재료명이 나오는 즉시 콜백 → 추천 조회와 겹치기)
+# - 백엔드는 VISION_PROVIDER 로 선택: openai(기본) | local(vision_local, 네트워크 없는 부하 테스트용)
+# - 서킷 브레이커: 연속 실패/타임아웃/느린 호출이 쌓이면 쿨다운 동안 호출 없이 VisionUnavailable (캐시 적중은 계속 응답)
+# - 호출 실패/타임아웃은 VisionCallFailed (라우터에서 503/504) — 정상 응답의 "재료 없음"(422)과 구분
 
 from __future__ import annotations
+import asyncio
 import base64
+import hashlib
 import json
 import os
 import logging
-from typing import List, Dict, Any
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
 
-from fastapi import UploadFile
 
 try:
-    from openai import OpenAI  # v1 SDK
+    from openai import AsyncOpenAI  # v1 SDK
 except Exception:
-    OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
 from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.image_prep import prepare_images
+from app.services.vision_cache import PartialItems, get_vision_cache, images_key
 
 log = logging.getLogger(__name__)
 
@@ -27,13 +43,57 @@ class VisionNotReady(Exception):
     pass
 
 
-def _client() -> "OpenAI":
-    if OpenAI is None:
+class VisionUnavailable(VisionNotReady):
+    # 서킷 브레이커 open: 프로바이더 장애로 잠시 호출 중단 (retry_after 초 뒤 재시도)
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"vision temporarily unavailable (retry after {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+class VisionCallFailed(Exception):
+    # 업스트림 호출 실패/타임아웃 (일시 장애 — "재료 없는 사진" 과 구분, timeout=True 면 504)
+    def __init__(self, msg: str, timeout: bool = False) -> None:
+        super().__init__(msg)
+        self.timeout = timeout
+
+
+_async_client: "AsyncOpenAI | None" = None
+_sem = asyncio.Semaphore(max(1, int(getattr(settings, "VISION_MAX_CONCURRENCY", 4) or 4)))
+VISION_TIMEOUT_SEC = float(getattr(settings, "VISION_TIMEOUT_SEC", 30.0) or 30.0)
+_breaker = CircuitBreaker(
+    "vision",
+    failures=int(getattr(settings, "VISION_BREAKER_FAILURES", 5) or 5),
+    cooldown=float(getattr(settings, "VISION_BREAKER_COOLDOWN_SEC", 30.0) or 30.0),
+    slow_sec=float(getattr(settings, "VISION_BREAKER_SLOW_SEC", 0) or 0) or None,
+)
+
+
+def get_vision_breaker() -> CircuitBreaker:
+    return _breaker
+
+
+def _client() -> "AsyncOpenAI":
+    # 프로세스당 1회 생성 — 내부 httpx 커넥션 풀을 모든 요청이 공유
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+    if AsyncOpenAI is None:
         raise VisionNotReady("openai SDK not installed")
     api_key = getattr(settings, "OPENAI_API_KEY", None) or os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise VisionNotReady("OPENAI_API_KEY not set")
-    return OpenAI(api_key=api_key)
+    _async_client = AsyncOpenAI(api_key=api_key, timeout=VISION_TIMEOUT_SEC, max_retries=1)
+    return _async_client
+
+
+async def close_client() -> None:
+    # 앱 종료 시 커넥션 풀 정리
+    global _async_client
+    if _async_client is not None:
+        try:
+            await _async_client.close()
+        finally:
+            _async_client = None
 
 
 def _b64(b: bytes) -> str:
@@ -71,16 +131,9 @@ PROMPT = (
     "- 감자/고구마/무/비트 등 비슷한 뿌리채소는 혼동하지 마세요. 모호하면 confidence를 낮게 두세요.\n"
 )
 
-async def extract_ingredients_from_files(files: List[UploadFile]) -> List[str]:
-    # 업로드 파일(List[UploadFile]) → 바이트 읽기 → Vision → 이름 리스트(중복 제거/정렬)
-    images: List[bytes] = []
-    for f in files:
-        if not f:
-            continue
-        data = await f.read()
-        if data:
-            images.append(data)
-
+async def extract_ingredient_names(images: List[bytes]) -> List[str]:
+    # 업로드 이미지 바이트(upload_stream.read_images 결과) → Vision → 이름 리스트(중복 제거/정렬)
+    images = [b for b in images if b]
     if not images:
         log.info("Vision skipped (no images)")
         return []
@@ -100,49 +153,469 @@ async def extract_ingredients_from_files(files: List[UploadFile]) -> List[str]:
     return uniq
 
 
-async def extract_ingredients_from_images(images: List[bytes]) -> List[Dict[str, Any]]:
+# 사진별 결과가 필요한 경로(캐스케이드 1단계)용 — 어느 사진에서 나온 재료인지 index로 구분
+PER_IMAGE_PROMPT = (
+    "사진 속 식재료를 한국어로 사진별로 추출하세요.\n"
+    "- 결과는 반드시 JSON 하나만 출력합니다.\n"
+    "- 스키마: { images: [{ index: number, ingredients: [{ name: string, amount?: string, confidence?: number }] }] }\n"
+    "- index는 첨부 순서(0부터), 재료가 안 보이는 사진도 빈 ingredients로 포함하세요.\n"
+    "- name만으로도 재료를 유추할 수 있게 일반명/대표명 사용(브랜드X).\n"
+    "- 확실하면 confidence 0.8 이상, 모호하면 0.5 이하로 두세요.\n"
+)
+
+VISION_MODEL = "gpt-4o"
+VISION_MODES = ("single", "cascade", "fanout", "stream")
+VISION_MODE = str(getattr(settings, "VISION_MODE", "single") or "single")
+LOW_DETAIL_EDGE = 512            # detail=low 는 512px 썸네일로 처리되므로 그 이상 보낼 필요 없음
+CASCADE_MIN_CONF = float(getattr(settings, "VISION_CASCADE_MIN_CONF", 0.6) or 0.6)
+FANOUT_GROUP = max(1, int(getattr(settings, "VISION_FANOUT_GROUP", 1) or 1))
+FANOUT_MERGE = str(getattr(settings, "VISION_FANOUT_MERGE", "max") or "max")
+TIMINGS_MAX = 200                # fanout 호출별 타이밍 보관 개수 (튜닝용)
+# 프롬프트/모델이 바뀌면 캐시 키도 바뀌도록
+_CACHE_VERSION = hashlib.sha256(f"{VISION_MODEL}\n{PROMPT}\n{PER_IMAGE_PROMPT}".encode("utf-8")).hexdigest()[:16]
+
+
+async def extract_ingredients_from_images(images: List[bytes], mode: str | None = None) -> List[Dict[str, Any]]:
     """
     이미지 바이트 배열 → [{'name': str, 'amount': str?, 'confidence': float?}, ...]
-    - OpenAI Chat Completions(gpt-4o) + data URL 만 사용
-    - JSON만 수신(response_format=json_object)
+    - mode: single(전 이미지 고해상도 1회) | cascade(저해상도 먼저, 모호한 사진만 고해상도 재호출)
+            | fanout(사진 FANOUT_GROUP장씩 병렬 호출, 재료명 기준 병합)
+    - 실제 추출은 VISION_PROVIDER 로 고른 프로바이더가 수행 (openai | local)
+    - 같은 이미지 집합(순서 무관)+프로바이더+모드는 캐시에서 반환, 동시 중복 요청은 1회만 계산
+    """
+    mode = mode or VISION_MODE
+    if mode not in VISION_MODES:
+        raise ValueError(f"unknown vision mode: {mode}")
+    return await _extract(images, mode, None)
+
+
+async def extract_ingredients_streaming(
+    images: List[bytes], on_name: Callable[[str], None], mode: str | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    extract_ingredients_from_images 와 같은 결과를 반환하되, 재료명이 확정되는 대로 on_name(name) 호출.
+    - 프로바이더가 스트리밍을 지원하면(openai single/stream) 생성 도중에, 아니면 결과가 나온 뒤 한꺼번에
+    - 캐시 적중/동시 중복 요청 합류 시에도 on_name 은 모든 재료에 대해 (한 번씩) 불린다
     """
-    client = _client()
+    mode = mode or "stream"
+    if mode not in VISION_MODES:
+        raise ValueError(f"unknown vision mode: {mode}")
+    seen: set = set()
+
+    def emit(name: str) -> None:
+        name = (name or "").strip()
+        if name and name not in seen:
+            seen.add(name)
+            on_name(name)
+
+    items = await _extract(images, mode, emit)
+    for it in items:
+        emit(str(it.get("name") or ""))
+    return items
+
+
+async def _extract(images: List[bytes], mode: str, on_name: Callable[[str], None] | None) -> List[Dict[str, Any]]:
+    provider = get_vision_provider()
+    provider.check()   # 키/SDK 미준비는 캐시 조회 전에 VisionNotReady로
+    # stream 은 single 과 같은 프롬프트/결과 → 캐시 공유
+    key = images_key(images, f"{provider.name}:{provider.version}:{'single' if mode == 'stream' else mode}")
+
+    async def guarded() -> List[Dict[str, Any]]:
+        # 캐시 미스일 때만 브레이커 확인 (open 이어도 캐시 적중은 그대로 응답)
+        if not _breaker.allow():
+            raise VisionUnavailable(_breaker.retry_after())
+        try:
+            if on_name is not None:
+                items = await provider.stream(images, mode, on_name)
+            else:
+                items = await provider.extract(images, mode)
+        except asyncio.CancelledError:
+            _breaker.release()
+            raise
+        except Exception:
+            # 호출마다 기록하는 프로바이더는 이미 실패를 셌다 (중복 집계 방지)
+            if provider.reports_health:
+                _breaker.release()
+            else:
+                _breaker.record(False)
+            raise
+        if not provider.reports_health:
+            _breaker.record(True)
+        _breaker.release()
+        return items
+
+    return await get_vision_cache().get_or_compute(key, guarded)
+
 
-    content: List[Dict[str, Any]] = [{"type": "text", "text": PROMPT}]
-    for b in images:
-        # MIME은 대부분 jpeg로 취급, png/webp도 문제 없음
+# ---------- 프로바이더 ----------
+class VisionProvider:
+    """
+    Vision 백엔드 인터페이스.
+    - name/version: 캐시 키에 포함 (프롬프트/매핑이 바뀌면 version도 바뀌어야 함)
+    - check(): 준비 안 됐으면 VisionNotReady
+    - extract(images, mode): 캐시 미스일 때만 호출됨
+    - reports_health: 업스트림 호출마다 직접 브레이커에 성공/실패를 기록하면 True
+    """
+    name = "base"
+    version = ""
+    reports_health = False
+
+    def check(self) -> None:
+        pass
+
+    async def extract(self, images: List[bytes], mode: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def stream(self, images: List[bytes], mode: str, on_name: Callable[[str], None]) -> List[Dict[str, Any]]:
+        # 기본: 스트리밍 미지원 → 전체 결과 후 한꺼번에 콜백
+        items = await self.extract(images, mode)
+        for it in items:
+            on_name(str(it.get("name") or ""))
+        return items
+
+    async def close(self) -> None:
+        pass
+
+
+class OpenAIVisionProvider(VisionProvider):
+    name = "openai"
+    version = _CACHE_VERSION
+    reports_health = True   # _chat_json 이 호출마다 기록
+
+    def check(self) -> None:
+        _client()
+
+    async def extract(self, images: List[bytes], mode: str) -> List[Dict[str, Any]]:
+        compute = {"cascade": _extract_cascade, "fanout": _extract_fanout}.get(mode, _extract_uncached)
+        return await compute(_client(), images)
+
+    async def stream(self, images: List[bytes], mode: str, on_name: Callable[[str], None]) -> List[Dict[str, Any]]:
+        if mode not in ("single", "stream"):
+            return await super().stream(images, mode, on_name)
+        return await _extract_streaming(_client(), images, on_name)
+
+    async def close(self) -> None:
+        await close_client()
+
+
+def _local_provider() -> VisionProvider:
+    from app.services.vision_local import LocalVisionProvider   # 순환 import 방지
+    return LocalVisionProvider()
+
+
+_PROVIDER_FACTORIES: Dict[str, Callable[[], VisionProvider]] = {
+    "openai": OpenAIVisionProvider,
+    "local": _local_provider,
+}
+VISION_PROVIDERS = tuple(_PROVIDER_FACTORIES)
+_providers: Dict[str, VisionProvider] = {}
+
+
+def register_vision_provider(name: str, factory: Callable[[], VisionProvider]) -> None:
+    _PROVIDER_FACTORIES[name] = factory
+    _providers.pop(name, None)
+
+
+def get_vision_provider(name: str | None = None) -> VisionProvider:
+    """설정(VISION_PROVIDER) 또는 이름으로 프로바이더 싱글턴."""
+    name = (name or getattr(settings, "VISION_PROVIDER", "openai") or "openai").strip().lower()
+    p = _providers.get(name)
+    if p is None:
+        factory = _PROVIDER_FACTORIES.get(name)
+        if factory is None:
+            raise VisionNotReady(f"unknown VISION_PROVIDER: {name}")
+        p = _providers[name] = factory()
+        log.info("vision provider: %s (version=%s)", name, p.version)
+    return p
+
+
+async def close_providers() -> None:
+    # 앱 종료 시 생성된 프로바이더 정리
+    for p in list(_providers.values()):
+        try:
+            await p.close()
+        except Exception:
+            pass
+    _providers.clear()
+
+
+def _content(prompt: str, prepped: List[Dict[str, Any]], detail: str = "auto") -> List[Dict[str, Any]]:
+    content: List[Dict[str, Any]] = [{"type": "text", "text": prompt}]
+    for p in prepped:
         content.append({
             "type": "image_url",
-            "image_url": {"url": f"data:image/jpeg;base64,{_b64(b)}"},
+            "image_url": {"url": f"data:{p['mime']};base64,{_b64(p['data'])}", "detail": detail},
         })
+    return content
 
+
+async def _chat_json(client: "AsyncOpenAI", content: List[Dict[str, Any]], n_images: int,
+                     max_tokens: int = 400) -> Dict[str, Any]:
+    """
+    OpenAI Chat Completions(gpt-4o) + data URL 만 사용
+    - JSON만 수신(response_format=json_object), 정상 응답이 비었거나 비JSON이면 빈 dict
+    - 타임아웃/업스트림 오류는 브레이커에 기록 후 VisionCallFailed (빈 사진으로 오인하지 않게)
+    """
+    t0 = 0.0
     try:
-        chat = client.chat.completions.create(
-            model="gpt-4o",
-            temperature=0.1,
-            messages=[{"role": "user", "content": content}],
-            # Chat Completions는 json_schema 미지원 → JSON만 받도록 강제
-            response_format={"type": "json_object"},
-            max_tokens=400,
-        )
+        # 동시 호출 상한 + 호출 단위 타임아웃 (대기 중에도 이벤트 루프는 다른 요청 처리)
+        async with _sem:
+            t0 = time.perf_counter()   # 세마포어 대기는 프로바이더 지연이 아니므로 제외
+            chat = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=VISION_MODEL,
+                    temperature=0.1,
+                    messages=[{"role": "user", "content": content}],
+                    # Chat Completions는 json_schema 미지원 → JSON만 받도록 강제
+                    response_format={"type": "json_object"},
+                    max_tokens=max_tokens,
+                ),
+                timeout=VISION_TIMEOUT_SEC,
+            )
+        _breaker.record(True, time.perf_counter() - t0)
 
         text = chat.choices[0].message.content if chat and chat.choices else ""
         if not text:
             log.warning("Chat Completions returned empty text")
-            return []
+            return {}
 
         try:
             obj = json.loads(text)
         except json.JSONDecodeError:
             log.warning("Chat Completions returned non-JSON content trimmed; ignoring")
-            return []
-
-        items = obj.get("ingredients", [])
-        return [it for it in items if isinstance(it, dict)]
+            return {}
+        return obj if isinstance(obj, dict) else {}
 
+    except asyncio.TimeoutError:
+        _breaker.record(False)
+        log.warning("Vision chat completion timed out (%.1fs, n_images=%d)", VISION_TIMEOUT_SEC, n_images)
+        raise VisionCallFailed(f"vision timed out after {VISION_TIMEOUT_SEC:.0f}s", timeout=True)
     except Exception as e:
+        _breaker.record(False)
         log.exception("Vision chat completion failed: %s", e)
-        return []
+        raise VisionCallFailed(f"vision call failed: {e}") from e
+
+
+def _items(obj: Any) -> List[Dict[str, Any]]:
+    items = obj.get("ingredients", []) if isinstance(obj, dict) else []
+    return [it for it in items if isinstance(it, dict) and str(it.get("name") or "").strip()]
+
+
+def _conf(item: Dict[str, Any]) -> float:
+    # confidence 누락/이상값은 "확실"로 취급 (모델이 생략하는 경우가 많음)
+    try:
+        return max(0.0, min(1.0, float(item.get("confidence", 1.0))))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def merge_items(groups: List[List[Dict[str, Any]]], how: str = "max") -> List[Dict[str, Any]]:
+    """
+    여러 호출 결과를 재료명 기준으로 병합 (confidence 내림차순).
+    - how="max": 가장 높은 confidence, how="mean": 등장한 결과들의 평균
+    - amount 등 나머지 필드는 confidence가 가장 높은 항목 것을 사용
+    """
+    best: Dict[str, Dict[str, Any]] = {}
+    confs: Dict[str, List[float]] = {}
+    for items in groups:
+        for it in items:
+            name = str(it.get("name") or "").strip()
+            if not name:
+                continue
+            k = name.lower()
+            c = _conf(it)
+            confs.setdefault(k, []).append(c)
+            if k not in best or c > _conf(best[k]):
+                best[k] = {**it, "name": name}
+    out = []
+    for k, it in best.items():
+        cs = confs[k]
+        out.append({**it, "confidence": round(max(cs) if how == "max" else sum(cs) / len(cs), 3)})
+    out.sort(key=lambda it: it["confidence"], reverse=True)
+    return out
+
+
+async def _extract_uncached(client: "AsyncOpenAI", images: List[bytes]) -> List[Dict[str, Any]]:
+    """전 이미지를 고해상도로 한 번에 보내는 기본 경로."""
+    prepped = await prepare_images(images)
+    obj = await _chat_json(client, _content(PROMPT, prepped), len(images))
+    return _items(obj)
+
+
+async def _extract_cascade(client: "AsyncOpenAI", images: List[bytes]) -> List[Dict[str, Any]]:
+    """
+    저해상도 우선 캐스케이드.
+    1) 전 이미지를 512px/detail=low 로 1회 호출, 사진별(index) 결과를 받는다
+    2) 결과가 비었거나 평균 confidence < VISION_CASCADE_MIN_CONF 인 사진만 고해상도(detail=high)로 재호출
+    3) 두 단계 결과를 재료명 기준 최대 confidence로 병합
+    """
+    low = await prepare_images(images, max_edge=LOW_DETAIL_EDGE)
+    low_err: Optional[VisionCallFailed] = None
+    try:
+        obj = await _chat_json(client, _content(PER_IMAGE_PROMPT, low, detail="low"), len(images))
+    except VisionCallFailed as e:
+        low_err, obj = e, {}   # 저해상도 실패 → 전 사진 고해상도로
+
+    per_image: Dict[int, List[Dict[str, Any]]] = {}
+    for entry in obj.get("images") or []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            idx = int(entry.get("index"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < len(images):
+            per_image.setdefault(idx, []).extend(_items(entry))
+    if not per_image and _items(obj):
+        # 사진별 구분 없이 답한 경우: 전체를 한 묶음으로 보고 판단
+        per_image = {i: _items(obj) for i in range(len(images))}
+
+    def _ambiguous(items: List[Dict[str, Any]]) -> bool:
+        return not items or sum(_conf(it) for it in items) / len(items) < CASCADE_MIN_CONF
+
+    escalate = [i for i in range(len(images)) if _ambiguous(per_image.get(i, []))]
+    log.info("vision cascade: %d images, %d escalated to high detail", len(images), len(escalate))
+
+    groups = [per_image[i] for i in sorted(per_image)]
+    answered = True
+    if escalate:
+        high = await prepare_images([images[i] for i in escalate])
+        try:
+            high_obj = await _chat_json(client, _content(PROMPT, high, detail="high"), len(escalate))
+        except VisionCallFailed:
+            if low_err is not None:
+                raise   # 두 단계 모두 실패: 부분 결과도 없음
+            high_obj = {}
+        answered = bool(high_obj)
+        groups.append(_items(high_obj))
+    merged = merge_items(groups, how="max")
+    # 고해상도 재호출이 실패하면 그 사진들은 저해상도 결과뿐 → 캐시하지 않도록 표시
+    return merged if answered else PartialItems(merged)
+
+
+# 스트리밍 중 완성된 "name": "..." 만 잡는다 (닫는 따옴표가 와야 매칭)
+_NAME_RE = re.compile(r'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+async def _extract_streaming(client: "AsyncOpenAI", images: List[bytes],
+                             on_name: Callable[[str], None]) -> List[Dict[str, Any]]:
+    """
+    single 과 같은 호출을 stream=True 로 받아, 누적 텍스트에서 재료명이 완성될 때마다 on_name.
+    끝나면 전체 JSON을 파싱해 항목 반환 (파싱 실패 시 스트림에서 본 이름만).
+    """
+    prepped = await prepare_images(images)
+    content = _content(PROMPT, prepped)
+    buf: List[str] = []
+    names: List[str] = []
+    t0 = 0.0
+
+    async def consume() -> None:
+        stream = await client.chat.completions.create(
+            model=VISION_MODEL,
+            temperature=0.1,
+            messages=[{"role": "user", "content": content}],
+            response_format={"type": "json_object"},
+            max_tokens=400,
+            stream=True,
+        )
+        text, pos = "", 0
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            buf.append(delta)
+            text += delta
+            for m in _NAME_RE.finditer(text, pos):
+                pos = m.end()
+                try:
+                    name = json.loads(f'"{m.group(1)}"')
+                except json.JSONDecodeError:
+                    name = m.group(1)
+                names.append(name)
+                on_name(name)
+
+    try:
+        async with _sem:
+            t0 = time.perf_counter()
+            await asyncio.wait_for(consume(), timeout=VISION_TIMEOUT_SEC)
+        _breaker.record(True, time.perf_counter() - t0)
+    except asyncio.TimeoutError:
+        _breaker.record(False)
+        log.warning("Vision stream timed out (%.1fs, n_images=%d, names so far=%d)",
+                    VISION_TIMEOUT_SEC, len(images), len(names))
+        raise VisionCallFailed(f"vision stream timed out after {VISION_TIMEOUT_SEC:.0f}s", timeout=True)
+    except Exception as e:
+        _breaker.record(False)
+        log.exception("Vision stream failed: %s", e)
+        raise VisionCallFailed(f"vision stream failed: {e}") from e
+
+    try:
+        obj = json.loads("".join(buf))
+    except json.JSONDecodeError:
+        log.warning("Vision stream returned non-JSON content; using streamed names only")
+        obj = {"ingredients": [{"name": n} for n in names]}
+    log.info("vision stream: %d names, %.0f ms", len(names), (time.perf_counter() - t0) * 1000)
+    return _items(obj)
+
+
+_timings: "deque[Dict[str, Any]]" = deque(maxlen=TIMINGS_MAX)
+
+
+def vision_timings() -> Dict[str, Any]:
+    """서킷 브레이커 상태 + 최근 fanout 호출별 타이밍 요약 (GET /recipes/recommend/vision 에서 노출)."""
+    recent = list(_timings)
+    ms = sorted(t["ms"] for t in recent)
+
+    def pct(q: float) -> float:
+        return round(ms[min(len(ms) - 1, int(q * len(ms)))], 1) if ms else 0.0
+
+    return {
+        "breaker": _breaker.snapshot(),
+        "group_size": FANOUT_GROUP, "merge": FANOUT_MERGE, "calls": len(recent),
+        "p50_ms": pct(0.5), "p95_ms": pct(0.95), "max_ms": round(ms[-1], 1) if ms else 0.0,
+        "failed": sum(1 for t in recent if not t["ok"]),
+        "recent": recent[-20:],
+    }
+
+
+async def _extract_fanout(client: "AsyncOpenAI", images: List[bytes]) -> List[Dict[str, Any]]:
+    """
+    사진별 병렬 호출 (fanout).
+    - FANOUT_GROUP장씩 묶어 각각 고해상도 호출, 동시 실행 수는 _sem 이 제한
+    - 전체 지연 = 가장 느린 작은 호출 1개, 한 장이 실패/타임아웃이어도 나머지 결과는 살린다
+    - 재료명 기준 병합 (VISION_FANOUT_MERGE: max | mean), 호출별 소요 시간은 vision_timings()로
+    """
+    prepped = await prepare_images(images)
+    groups = [list(range(i, min(i + FANOUT_GROUP, len(images)))) for i in range(0, len(images), FANOUT_GROUP)]
+
+    async def one(idx: List[int]) -> List[Dict[str, Any]]:
+        t0 = time.perf_counter()
+        try:
+            obj = await _chat_json(client, _content(PROMPT, [prepped[i] for i in idx]), len(idx))
+        except VisionCallFailed as e:
+            errors.append(e)
+            obj = {}
+        items = _items(obj)
+        timing = {
+            "images": idx, "ms": round((time.perf_counter() - t0) * 1000, 1),
+            "bytes": sum(prepped[i]["bytes_out"] for i in idx), "items": len(items), "ok": bool(obj),
+        }
+        _timings.append(timing)
+        per_call.append(timing)
+        return items
+
+    per_call: List[Dict[str, Any]] = []
+    errors: List[VisionCallFailed] = []
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*[one(idx) for idx in groups])
+    if errors and len(errors) == len(groups):
+        raise errors[0]   # 전부 실패: 빈 결과가 아니라 장애로 알림
+    log.info("vision fanout: %d images in %d calls, %.0f ms (per call: %s)",
+             len(images), len(groups), (time.perf_counter() - t0) * 1000,
+             {tuple(t["images"]): t["ms"] for t in per_call})
+    merged = merge_items(list(results), how=FANOUT_MERGE)
+    # 일부 호출 실패: 살린 결과는 응답하되 캐시에는 남기지 않는다 (한 번의 타임아웃이 TTL 동안 굳지 않게)
+    return PartialItems(merged) if any(not t["ok"] for t in per_call) else merged
 
 
 def _extract_text_safe(rsp: Any) -> str | None: